@@ -1,12 +1,32 @@
-from contextlib import asynccontextmanager
-from typing import Generator
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, replace
+from functools import partial
+from typing import Callable, Generator, Optional, Sequence
 
-from optuna import Trial
+import numpy as np
+from optuna import Trial, Study
+from optuna.trial import FixedTrial
 
+from cli.print_utils import print_info, print_warning
+from modules.algo import AlgoModule
+from modules.algo.hyperopt.batch import BatchBacktest, optimize_in_batches
+from modules.algo.hyperopt.engine_space import EngineSearchSpace
+from modules.algo.hyperopt.folds import get_fold_ranges, slice_signals, map_folds, aggregate, create_fold_pool
+from modules.algo.hyperopt.history import create_history_writer, METRICS_ATTR, get_headline_metrics, \
+    get_batch_metrics, mean_metrics
+from modules.algo.hyperopt.hyperopt_strategy import get_search_space, set_trial
+from modules.algo.hyperopt.parallel import optimize_in_pool
+from modules.algo.hyperopt.pruning import Checkpoints, create_pruner
+from modules.algo.hyperopt.samplers import create_sampler
+from modules.algo.hyperopt.shared_data import SharedFrames, SharedFramesDescriptor
+from modules.algo.hyperopt.study import optimize, load_or_create_study, resolve_storage_url
+from modules.algo.hyperopt.worker import get_data_fingerprint, check_data_fingerprint, FINGERPRINT_ATTRIBUTE
 from modules.output import OutputModule
 from modules.setup import ConfigModule, DataModule, SetupModule
+from modules.setup.config.load_strategy import load_strategy_from_config
 from modules.stats.stats import StatsModule
 from modules.stats.tradingmodule import TradingModule
+from modules.stats.stats_config import StatsConfig
 from modules.stats.tradingmodule_config import create_trading_module_config
 
 
@@ -19,22 +39,295 @@ class BacktestRunner:
         self.algo_module = algo_module
         self.df = df
         self.strategy = strategy
+        self.engine_space = EngineSearchSpace(config.hyperopt_engine_space)
+        self.signals = None  # strategy parameter values and the signals populated with them
+        self.fold_signals = None  # signals and their slices per hyperopt fold
+        self.fold_pool = None  # processes that evaluate the hyperopt folds of the running study
 
-    def run_backtest(self):
-        pair_dicts, dict_with_signals = self.algo_module.run()
-        trading_module = TradingModule(self.trading_module_config)
-        stats_module = StatsModule(self.stats_config, dict_with_signals, trading_module, pair_dicts)
-        return stats_module.analyze()
+    def run_backtest(self, trial: Optional[Trial] = None):
+        """
+        :param trial: hyperopt trial that sets the strategy and engine parameters, and receives intermediate losses
+        when a pruner is configured
+        """
+        pair_dicts, dict_with_signals = self.populate_signals(trial)
+        trading_module_config, stats_config = self.get_engine_configs(trial)
+        trading_module = TradingModule(trading_module_config)
+        stats_module = StatsModule(stats_config, dict_with_signals, trading_module, pair_dicts)
+        checkpoints = self.create_checkpoints(trial, trading_module)
+        if checkpoints is None:
+            return stats_module.analyze()
+        checkpoints.start(stats_module.tick_times())
+        return stats_module.analyze(checkpoints.after_row)
+
+    def populate_signals(self, trial: Optional[Trial]) -> tuple:
+        """
+        Signals only depend on the strategy parameters. While hyperopt trials keep the same strategy parameters
+        (e.g. when only engine settings are searched) the signals of the previous trial are reused.
+        """
+        if trial is None:
+            return self.algo_module.run()
+        if self.signals is None or self.signals[0] != self.strategy.parameters:
+            self.signals = self.strategy.parameters, self.algo_module.run()
+        return self.signals[1]
+
+    def get_engine_configs(self, trial: Optional[Trial]) -> tuple:
+        """
+        :return: trading module and stats configs with the engine settings of the trial
+        """
+        if trial is None or not self.engine_space:
+            return self.trading_module_config, self.stats_config
+        return self.engine_space.apply(self.engine_space.suggest(trial), self.trading_module_config,
+                                       self.stats_config)
+
+    def get_search_space(self) -> dict:
+        """
+        :return: optuna distribution of every strategy and engine parameter, by parameter name
+        """
+        return {**get_search_space(self.strategy), **self.engine_space.distributions}
+
+    def create_checkpoints(self, trial: Optional[Trial], trading_module: TradingModule) -> Optional[Checkpoints]:
+        # optuna only prunes single-objective studies
+        if trial is None or self.module.hyperopt_pruner == "none" or len(self.module.hyperopt_directions) > 1:
+            return None
+
+        # intermediate_loss is lower-is-better, a maximizing study keeps the trials with the highest values
+        sign = -1. if self.module.hyperopt_directions[0] == "maximize" else 1.
+
+        def intermediate_loss() -> float:
+            return sign * self.strategy.intermediate_loss(trading_module.capital_per_timestamp,
+                                                          float(self.trading_module_config.starting_capital))
+
+        return Checkpoints(trial, self.module.hyperopt_checkpoint, intermediate_loss)
 
     def run_hyperopt_iteration(self, trial: Trial) -> float:
-        self.strategy.trial = trial
-        stats = self.run_backtest()
+        set_trial(self.strategy, trial)
+        if self.module.hyperopt_folds > 1:
+            return self.run_cross_validated_iteration(trial)
+        stats = self.run_backtest(trial)
+        trial.set_user_attr(METRICS_ATTR, get_headline_metrics(stats))
         return self.strategy.loss_function(stats)
 
+    def run_cross_validated_iteration(self, trial: Trial):
+        """
+        Evaluates the trial on every fold of the backtesting period, on the processes of the fold pool when the
+        study has one, otherwise one fold after another in this process.
+        :return: objective aggregated over the folds, the trial's headline metrics are the means over the folds
+        """
+        if self.fold_pool is None:
+            evaluate = partial(self.evaluate_fold, trial)
+        else:
+            evaluate = partial(run_hyperopt_worker_fold, trial.params)
+        values, metrics = zip(*map_folds(evaluate, self.module.hyperopt_folds, self.fold_pool))
+        trial.set_user_attr(METRICS_ATTR, mean_metrics(list(metrics)))
+        return aggregate(values, self.module.hyperopt_fold_aggregation, self.module.hyperopt_directions)
+
+    def evaluate_fold(self, trial: Trial, fold: int) -> tuple:
+        """
+        The signals are populated once for the whole period and sliced per fold, so the other folds of the
+        trial reuse them
+        :return: objective and headline metrics of the trial on the fold
+        """
+        pair_dicts, dict_with_signals = self.populate_signals(trial)
+        trading_module_config, stats_config = self.get_engine_configs(trial)
+        (first, last), (fold_pair_dicts, fold_dict_with_signals) = \
+            self.get_fold_signals(pair_dicts, dict_with_signals)[fold]
+        fold_stats_config = replace(stats_config, backtesting_from=first, backtesting_to=last)
+        stats_module = StatsModule(fold_stats_config, fold_dict_with_signals, TradingModule(trading_module_config),
+                                   fold_pair_dicts)
+        stats = stats_module.analyze()
+        return self.strategy.loss_function(stats), get_headline_metrics(stats)
+
+    def get_fold_signals(self, pair_dicts: dict, dict_with_signals: dict) -> list:
+        """
+        :return: range and sliced signals of every fold, kept while the signals are reused
+        """
+        if self.fold_signals is None or self.fold_signals[0] is not dict_with_signals:
+            times = next(iter(pair_dicts.values())).index.to_numpy() if pair_dicts else np.array([])
+            folds = get_fold_ranges(np.sort(times), self.module.hyperopt_folds, self.module.hyperopt_fold_type,
+                                    self.module.hyperopt_fold_purge)
+            self.fold_signals = dict_with_signals, [((first, last), slice_signals(pair_dicts, dict_with_signals,
+                                                                                   first, last))
+                                                    for first, last in folds]
+        return self.fold_signals[1]
+
     def run_outputted_backtest(self):
         stats = self.run_backtest()
         OutputModule(self.stats_config).output(stats)
 
+    def data_fingerprint(self) -> str:
+        frames = {("pairs", pair): frame for pair, frame in self.df.items()}
+        frames.update({("additional", pair): frame for pair, frame in
+                       self.algo_module.additional_ohlcv_pair_frames.items()})
+        return get_data_fingerprint(frames)
+
+    def load_study(self, study_name: str) -> Study:
+        """
+        Loads or creates the study in hyperopt-storage with the configured sampler, pruner and directions,
+        and checks that the study was run on the same data
+        """
+        config = self.module
+        sampler = create_sampler(config.hyperopt_sampler, self.get_search_space(),
+                                 len(config.hyperopt_directions), config.hyperopt_seed)
+        storage_url = resolve_storage_url(config.hyperopt_storage, config.hyperopt_study)
+        fingerprint = self.data_fingerprint()
+        study = load_or_create_study(study_name, storage_url, {FINGERPRINT_ATTRIBUTE: fingerprint}, sampler=sampler,
+                                     pruner=create_pruner(config.hyperopt_pruner),
+                                     directions=config.hyperopt_directions)
+        check_data_fingerprint(study, fingerprint)
+        return study
+
+    def run_hyperopt(self, study: Study) -> None:
+        """
+        Adds hyperopt-trials trials to the study within hyperopt-timeout, on hyperopt-workers processes when
+        more than one is configured. Otherwise the hyperopt-folds of every trial are evaluated on a fold pool
+        that is started once for the study. With hyperopt-history, every finished trial is written to the trial
+        history.
+        """
+        n_trials, timeout, n_workers = self.module.hyperopt_trials, self.module.hyperopt_timeout, \
+            self.module.hyperopt_workers
+        history = create_history_writer(study, self.get_search_space()) if self.module.hyperopt_history else None
+        callbacks = [history] if history is not None else []
+        try:
+            batch_size = self.get_hyperopt_batch_size()
+            if batch_size > 1:
+                self.run_batched_hyperopt(study, n_trials, batch_size, timeout, callbacks)
+            elif n_workers > 1:
+                self.run_parallel_hyperopt(study, n_trials, n_workers, timeout, callbacks)
+            else:
+                with self.start_fold_pool():
+                    optimize(study, self.get_search_space(), n_trials, self.run_hyperopt_iteration, timeout,
+                             callbacks)
+        finally:
+            if history is not None:
+                history.close()
+                print_info(f"Trial history written to {history.path}")
+
+    def get_hyperopt_batch_size(self) -> int:
+        batch_size = self.module.hyperopt_batch_size
+        if batch_size > 1 and self.module.hyperopt_folds > 1:
+            print_warning("hyperopt-batch-size is ignored, batches do not evaluate hyperopt-folds.")
+            return 1
+        if batch_size > 1 and self.engine_space:
+            print_warning("hyperopt-batch-size is ignored, batches do not search hyperopt-engine-space.")
+            return 1
+        if batch_size > 1 and self.module.stoploss_type != "standard":
+            print_warning(f"hyperopt-batch-size is ignored, batches do not support the "
+                          f"{self.module.stoploss_type} stoploss.")
+            return 1
+        return batch_size
+
+    def run_batched_hyperopt(self, study: Study, n_trials: int, batch_size: int,
+                             timeout: Optional[float] = None, callbacks: Sequence[Callable] = ()) -> None:
+        """
+        Evaluates batch_size trials at once: the indicators are populated once with the default parameters,
+        after which every batch only evaluates the strategy's batch_signals and a BatchTradingModule pass
+        """
+        set_trial(self.strategy, None)
+        batch_backtest = BatchBacktest(self.strategy, self.algo_module.ohlcv_pair_frames,
+                                       self.algo_module.populate_indicators(), self.trading_module_config)
+        search_space = get_search_space(self.strategy)
+
+        def evaluate_batch(params: list) -> tuple:
+            parameters = {name: np.array([trial_params[name] for trial_params in params]) for name in search_space}
+            results = batch_backtest.run(parameters)
+            return self.strategy.batch_loss_function(results), [{METRICS_ATTR: metrics}
+                                                                for metrics in get_batch_metrics(results)]
+
+        optimize_in_batches(study, search_space, n_trials, batch_size, evaluate_batch, timeout, callbacks)
+
+    def run_parallel_hyperopt(self, study: Study, n_trials: int, n_workers: int,
+                              timeout: Optional[float] = None, callbacks: Sequence[Callable] = ()) -> None:
+        """
+        Evaluates the trials of the study on n_workers processes. The candles are placed in shared memory once,
+        every worker builds its own BacktestRunner on top of them.
+        """
+        with self.share_worker_context() as context:
+            optimize_in_pool(study, self.get_search_space(), n_trials, n_workers,
+                             init_hyperopt_worker, (context,), run_hyperopt_worker_trial, timeout, callbacks)
+
+    @contextmanager
+    def start_fold_pool(self):
+        """
+        Starts the processes that evaluate the hyperopt-folds, when more than one fold is configured. They are
+        spawned once and reused by every trial until the context exits.
+        """
+        if self.module.hyperopt_folds < 2:
+            yield
+            return
+        with self.share_worker_context() as context, \
+                create_fold_pool(self.module.hyperopt_folds, init_hyperopt_worker, (context,)) as pool:
+            self.fold_pool = pool
+            try:
+                yield
+            finally:
+                self.fold_pool = None
+
+    @contextmanager
+    def share_worker_context(self):
+        """
+        Places the candles in shared memory once, until the context exits
+        :return: context from which every worker process builds its own BacktestRunner on top of them
+        """
+        frames = SharedFrames.create(self.df)
+        additional_frames = SharedFrames.create(self.algo_module.additional_ohlcv_pair_frames)
+        try:
+            yield HyperoptWorkerContext(self.module.detached(), self.stats_config, frames.descriptor,
+                                        additional_frames.descriptor)
+        finally:
+            frames.unlink()
+            additional_frames.unlink()
+
+
+@dataclass
+class HyperoptWorkerContext:
+    """
+    Everything a worker process needs to build a BacktestRunner, without the data itself
+    """
+    config: ConfigModule
+    stats_config: StatsConfig
+    frames: SharedFramesDescriptor
+    additional_frames: SharedFramesDescriptor
+
+    def create_runner(self) -> BacktestRunner:
+        frames = attach_frames(self.frames)
+        additional_frames = attach_frames(self.additional_frames)
+        strategy = load_strategy_from_config(self.config.strategy_definition)
+        strategy.timeframe = self.config.timeframe
+        algo_module = AlgoModule(self.config, frames, strategy, additional_frames)
+        return BacktestRunner(self.config, None, algo_module, frames, strategy, self.stats_config)
+
+
+def attach_frames(descriptor: SharedFramesDescriptor) -> dict:
+    """
+    :return: frames that are views on the shared memory block, which stays attached for the lifetime of the
+    worker process
+    """
+    shared_frames = SharedFrames.attach(descriptor)
+    worker_shared_frames.append(shared_frames)
+    return shared_frames.frames()
+
+
+# BacktestRunner of a hyperopt worker process, created once by init_hyperopt_worker
+worker_runner: Optional[BacktestRunner] = None
+# Shared memory blocks the frames of the worker process are views on
+worker_shared_frames: list = []
+
+
+def init_hyperopt_worker(context: HyperoptWorkerContext) -> None:
+    global worker_runner
+    worker_runner = context.create_runner()
+
+
+def run_hyperopt_worker_trial(params: dict) -> tuple:
+    trial = FixedTrial(params)
+    return worker_runner.run_hyperopt_iteration(trial), trial.user_attrs
+
+
+def run_hyperopt_worker_fold(params: dict, fold: int) -> tuple:
+    trial = FixedTrial(params)
+    set_trial(worker_runner.strategy, trial)
+    return worker_runner.evaluate_fold(trial, fold)
+
 
 @asynccontextmanager
 async def create_backtest_runner(args: object) -> Generator[BacktestRunner, None, None]:
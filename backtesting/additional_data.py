@@ -0,0 +1,89 @@
+# Libraries
+import hashlib
+from typing import Optional, Sequence
+
+import numpy as np
+from pandas import DataFrame
+
+# Files
+from utils.utils import parse_timeframe
+
+# ======================================================================
+# AdditionalDataJoiner is responsible for joining candles of additional
+# pairs (with an equal or slower timeframe) onto the strategy's dataframe.
+#
+# © 2021 DemaTrading.ai
+# ======================================================================
+
+
+class TimeframeMapping:
+    """
+    Maps every base candle to the index of the last additional candle that has closed at that moment.
+    """
+
+    def __init__(self, base_times: np.ndarray, additional_times: np.ndarray, offset: int):
+        merge_times = additional_times + offset
+        positions = np.searchsorted(merge_times, base_times, side='right') - 1
+        self.valid = positions >= 0
+        self.positions = np.where(self.valid, positions, 0)
+        self.exact = self.valid & (merge_times[self.positions] == base_times)
+
+
+def get_time_key(times: np.ndarray) -> bytes:
+    """
+    :return: digest of every timestamp, base frames are dropna()'d per pair, so time grids with the same length
+    and end points can still have gaps in different places
+    """
+    return hashlib.sha1(np.ascontiguousarray(times, dtype=np.int64).tobytes()).digest()
+
+
+class AdditionalDataJoiner:
+    """
+    Joins additional pair data using a position mapping (searchsorted of the base timestamps into the
+    close times of the additional candles). The mapping is built once per (additional pair, timeframe)
+    and reused for every pair that shares the same time grid. Time grids are identified by a digest of all
+    of their timestamps.
+    """
+
+    def __init__(self):
+        self.mappings = {}
+
+    def join(self, dataframe: DataFrame, additional_pair: DataFrame, original_timeframe: str,
+             timeframe_additional: str, ffill: bool = True, columns: Optional[Sequence[str]] = None) -> DataFrame:
+        pair = additional_pair['pair'].unique()[0]
+
+        timeframe_ms = parse_timeframe(original_timeframe)
+        timeframe_ms_additional = parse_timeframe(timeframe_additional)
+        if timeframe_ms > timeframe_ms_additional:
+            raise ValueError("[Additional Data] Cannot join faster timeframe to slower timeframe")
+
+        mapping = self.get_mapping(pair, timeframe_additional, original_timeframe,
+                                   dataframe['time'].to_numpy(dtype=np.int64),
+                                   additional_pair['time'].to_numpy(dtype=np.int64),
+                                   timeframe_ms_additional - timeframe_ms)
+
+        # A candle is only visible from the moment it has closed, afterwards it is forward filled if requested
+        mask = mapping.valid if ffill else mapping.exact
+        joined = {}
+        for col in columns if columns is not None else additional_pair.columns:
+            source = additional_pair[col]
+            if ffill:
+                source = source.ffill()
+            values = source.to_numpy()[mapping.positions]
+            if not values.dtype.kind == 'O' and not values.dtype.kind == 'f':
+                values = values.astype(np.float64)
+            values[~mask] = np.nan
+            joined[f"{col}_{pair}_{timeframe_additional}"] = values
+
+        # The caller's dataframe is left untouched, a new frame with the joined columns is returned
+        return dataframe.assign(**joined)
+
+    def get_mapping(self, pair: str, timeframe_additional: str, original_timeframe: str, base_times: np.ndarray,
+                    additional_times: np.ndarray, offset: int) -> TimeframeMapping:
+        key = (pair, timeframe_additional, original_timeframe, get_time_key(base_times),
+               get_time_key(additional_times))
+        mapping = self.mappings.get(key)
+        if mapping is None:
+            mapping = TimeframeMapping(base_times, additional_times, offset)
+            self.mappings[key] = mapping
+        return mapping
@@ -1,17 +1,18 @@
 # Libraries
 import abc
+from typing import Mapping
 
+import numpy as np
 from optuna import Trial
 from pandas import DataFrame
-import pandas as pd
 
+from backtesting.additional_data import AdditionalDataJoiner
 from modules.public.trading_stats import TradingStats
 # ======================================================================
 # Strategy-class is responsible for populating indicators / signals
 #
 # © 2021 DemaTrading.ai
 # ======================================================================
-from utils.utils import parse_timeframe
 
 """
 ATTENTION: 
@@ -24,8 +25,25 @@ class Strategy(abc.ABC):
     """
     This module defines the abstract base class (abc) that every strategy must inherit from.
     Methods defined in strategies/*.py will overwrite these methods.
+
+    Indicators can optionally be registered as lazy columns with the `indicator` decorator from
+    modules.public.indicator. These are only computed when buy_signal, sell_signal, stoploss or
+    the plots read them, e.g.:
+
+        @indicator(cached=True)
+        def ema5(self, dataframe):
+            return ta.EMA(dataframe, timeperiod=5)
+
+        @indicator("ema5", "ema21")
+        def ema_spread(self, dataframe):
+            return dataframe["ema5"] - dataframe["ema21"]
+
+    Indicators that do not read hyperopt parameters can be marked cached=True, so that hyperopt computes them
+    once per pair for all trials.
     """
     trial: Trial = None
+    # Values of the hyperopt parameters for the current trial, see modules.algo.hyperopt.hyperopt_strategy.set_trial
+    parameters: Mapping = None
     timeframe: str
 
     @abc.abstractmethod
@@ -40,6 +58,19 @@ class Strategy(abc.ABC):
         """
         return
 
+    def generate_panel_indicators(self, panel) -> dict:
+        """
+        Optional batched counterpart of generate_indicators. Override this method to compute indicators for all
+        pairs at once on 2-D (time x pair) arrays, e.g. panel.close or panel["volume"]. The returned columns are
+        added to every pair dataframe before generate_indicators is called.
+
+        :param panel: OHLCV data of all pairs stacked on a shared time axis
+        :type panel: OHLCVPanel
+        :return: dict of column name to (time x pair) array, or DataFrame with pairs as columns
+        :rtype: dict
+        """
+        return {}
+
     def buy_signal(self, dataframe: DataFrame) -> DataFrame:
         """
         :param dataframe: Dataframe filled with indicators from generate_indicators
@@ -74,42 +105,92 @@ class Strategy(abc.ABC):
         """
         return
 
-    def join_additional_data(self, dataframe, additional_pair, original_timeframe, timeframe_additional, ffill=True):
+    def join_additional_data(self, dataframe, additional_pair, original_timeframe, timeframe_additional, ffill=True,
+                             columns=None):
         """
         This function is responsible for joining the additional data to the original dataframe. This is only possible
         if the additional timeframe is larger than the original timeframe. Furthermore some precautions have been taken
         such that candles are matched together without a looking in the future bias.
+        The original dataframe is not modified, a new dataframe is returned with the joined columns in the following
+        format: ['<column>_<pair>_<timeframe>']
         :param dataframe: original Dataframe
         :param additional_pair: Dataframe of the additional pair
         :param original_timeframe: timeframe of original dataframe
         :param timeframe_additional: timeframe of additional dataframe
-        :param ffill: Whether to forward fill the joined dataframe (recommended)
+        :param ffill: Whether to forward fill the joined columns (recommended)
+        :param columns: Columns of the additional pair to join, defaults to all columns
+        """
+        joiner = getattr(self, "_additional_data_joiner", None)
+        if joiner is None:
+            joiner = self._additional_data_joiner = AdditionalDataJoiner()
+        return joiner.join(dataframe, additional_pair, original_timeframe, timeframe_additional, ffill, columns)
+
+    def loss_function(self, stats: TradingStats) -> float:
+        """
+        Objective that hyperopt minimizes. Besides the main results, stats.risk_metrics offers e.g. sharpe,
+        sortino, calmar, profit_factor and expectancy, which are only computed when read:
+
+            return -stats.risk_metrics.sortino
+
+        With several hyperopt-directions the loss function returns one value per direction, and hyperopt
+        searches the Pareto front, e.g. profit against drawdown (a negative percentage) with
+        ["maximize", "maximize"]:
+
+            return stats.main_results.overall_profit_percentage, stats.main_results.max_seen_drawdown
+
+        :param stats: results of the backtest
+        :type stats: TradingStats
+        :return: loss value, lower is better, or a tuple of values in the order of hyperopt-directions
+        :rtype: float
         """
-        add_df = additional_pair.copy()
-        pair = add_df['pair'].unique()[0]
+        raise Exception("loss_function not implemented")
 
-        timeframe_ms = parse_timeframe(original_timeframe)
-        timeframe_ms_additional = parse_timeframe(timeframe_additional)
+    def intermediate_loss(self, capital_per_timestamp: dict, starting_capital: float) -> float:
+        """
+        Loss reported at the checkpoints of a hyperopt trial, the pruner compares it with the losses of other
+        trials at the same checkpoint to stop unpromising trials early. Defaults to the negative profit ratio.
+        The loss is lower-is-better for every hyperopt-direction, it is negated before it is reported to a
+        maximizing study.
+        :param capital_per_timestamp: capital (including open trades) per timestamp until the checkpoint
+        :type capital_per_timestamp: dict
+        :param starting_capital: capital at the start of the backtest
+        :type starting_capital: float
+        :return: loss value, lower is better
+        :rtype: float
+        """
+        return 1 - next(reversed(capital_per_timestamp.values())) / starting_capital
 
-        if timeframe_ms == timeframe_ms_additional:
-            add_df['date_merge'] = add_df["time"]
-        elif timeframe_ms < timeframe_ms_additional:
-            add_df['date_merge'] = (
-                    add_df["time"] + pd.to_timedelta(timeframe_ms_additional, 'ms').seconds * 1000 - pd.to_timedelta(timeframe_ms, 'ms').seconds * 1000
-            )
-        else:
-            raise ValueError("[Additional Data] Cannot join faster timeframe to slower timeframe")
+    def batch_signals(self, dataframe: DataFrame, parameters: dict) -> tuple:
+        """
+        Optional batched counterpart of buy_signal and sell_signal for hyperopt-batch-size. Override this method
+        to evaluate K candidate parameter sets at once, e.g. for a threshold parameter:
 
-        add_df.columns = [f"{col}_{pair}_{timeframe_additional}" for col in add_df.columns]
+            rsi = dataframe["rsi"].to_numpy()[:, None]
+            return rsi < parameters["buy_rsi"], rsi > parameters["sell_rsi"]
 
-        dataframe = pd.merge(dataframe, add_df, left_on='time',
-                             right_on=f'date_merge_{pair}_{timeframe_additional}', how='left')
-        dataframe = dataframe.drop(f'date_merge_{pair}_{timeframe_additional}', axis=1)
+        generate_indicators is only called once for all batches, with the default parameter values, so only
+        signal thresholds (not indicator settings) can be searched in batches. A hyperopt-batch-size above 1
+        is refused when the strategy is loaded if this method is not overridden. The default gives no signals.
 
-        if ffill:
-            dataframe = dataframe.ffill()
+        :param dataframe: Dataframe filled with indicators from generate_indicators
+        :type dataframe: DataFrame
+        :param parameters: (K,) array of candidate values per hyperopt parameter name
+        :type parameters: dict
+        :return: (time x K) boolean buy and sell signals
+        :rtype: tuple
+        """
+        n_candidates = len(next(iter(parameters.values()), ()))
+        no_signals = np.zeros((len(dataframe), n_candidates), dtype=bool)
+        return no_signals, no_signals.copy()
 
-        return dataframe
+    def batch_loss_function(self, results) -> np.ndarray:
+        """
+        Objective of the candidates of a hyperopt batch, lower is better. Defaults to the negative profit ratio,
+        results also offers the (time x K) capital, max_drawdown_ratio and n_trades.
 
-    def loss_function(self, stats: TradingStats) -> float:
-        raise Exception("loss_function not implemented")
+        :param results: capital of the K candidates over time
+        :type results: BatchResults
+        :return: (K,) loss values, or (K x objectives) with several hyperopt-directions
+        :rtype: np.ndarray
+        """
+        return -results.profit_ratio
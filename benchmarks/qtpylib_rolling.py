@@ -0,0 +1,106 @@
+# Benchmark of the O(n) qtpylib rolling kernels against the previous per-window implementations.
+#
+# Usage: python -m benchmarks.qtpylib_rolling [--candles 1000000] [--windows 14 50 200]
+
+import argparse
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+from tabulate import tabulate
+
+from modules.setup.config import qtpylib_methods as qtpylib
+
+
+def previous_rolling_mean(data, window):
+    return np.mean(qtpylib.numpy_rolling_window(data, window), axis=-1)
+
+
+def previous_rolling_std(data, window):
+    return np.std(qtpylib.numpy_rolling_window(data, window), axis=-1, ddof=1)
+
+
+def previous_true_range(bars):
+    return pd.DataFrame({
+        "hl": bars['high'] - bars['low'],
+        "hc": abs(bars['high'] - bars['close'].shift(1)),
+        "lc": abs(bars['low'] - bars['close'].shift(1))
+    }).max(axis=1)
+
+
+def previous_rolling_vwap(bars, window):
+    typical = ((bars['high'] + bars['low'] + bars['close']) / 3)
+    volume = bars['volume']
+    left = (volume * typical).rolling(window=window, min_periods=window).sum()
+    right = volume.rolling(window=window, min_periods=window).sum()
+    return pd.Series(index=bars.index, data=(left / right)).replace([np.inf, -np.inf], float('NaN')).ffill()
+
+
+def previous_zscore(bars, window):
+    std = np.concatenate((np.full(window - 1, np.nan), previous_rolling_std(bars['close'].values, window)))
+    mean = np.concatenate((np.full(window - 1, np.nan), previous_rolling_mean(bars['close'].values, window)))
+    return (bars['close'] - mean) / std
+
+
+def previous_chopiness(bars, window):
+    atrsum = previous_true_range(bars).rolling(window).sum()
+    highs = bars['high'].rolling(window).max()
+    lows = bars['low'].rolling(window).min()
+    return 100 * np.log10(atrsum / (highs - lows)) / np.log10(window)
+
+
+def create_bars(candles: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.001, candles)))
+    return pd.DataFrame({
+        'high': close * (1 + rng.uniform(0, 0.005, candles)),
+        'low': close * (1 - rng.uniform(0, 0.005, candles)),
+        'close': close,
+        'volume': rng.uniform(1, 100, candles)
+    })
+
+
+def measure(func, *args):
+    start = perf_counter()
+    result = func(*args)
+    return perf_counter() - start, np.asarray(result, dtype=np.float64)
+
+
+def run(candles: int, windows: list) -> list:
+    bars = create_bars(candles)
+    close = bars['close'].values
+    cases = [
+        ("numpy_rolling_mean", lambda w: previous_rolling_mean(close, w),
+         lambda w: qtpylib.numpy_rolling_mean(close, w)[w - 1:]),
+        ("numpy_rolling_std", lambda w: previous_rolling_std(close, w),
+         lambda w: qtpylib.numpy_rolling_std(close, w)[w - 1:]),
+        ("rolling_vwap", lambda w: previous_rolling_vwap(bars, w), lambda w: qtpylib.rolling_vwap(bars, w)),
+        ("zscore", lambda w: previous_zscore(bars, w), lambda w: qtpylib.zscore(bars, w)),
+        ("chopiness", lambda w: previous_chopiness(bars, w), lambda w: qtpylib.chopiness(bars, w)),
+    ]
+
+    rows = []
+    for name, previous, current in cases:
+        for window in windows:
+            previous_time, expected = measure(previous, window)
+            current_time, result = measure(current, window)
+            scale = np.nanmax(np.abs(expected)) or 1.
+            max_error = np.nanmax(np.abs(result - expected)) / scale
+            rows.append([name, window, candles, f"{previous_time:.4f}", f"{current_time:.4f}",
+                         f"{previous_time / current_time:.1f}x", f"{max_error:.1e}"])
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark qtpylib rolling indicators")
+    parser.add_argument("--candles", type=int, default=1_000_000)
+    parser.add_argument("--windows", type=int, nargs="+", default=[14, 50, 200])
+    args = parser.parse_args()
+
+    rows = run(args.candles, args.windows)
+    print(tabulate(rows, headers=["Indicator", "Window", "Candles", "Previous (s)", "Current (s)", "Speedup",
+                                  "Max. rel. error"]))
+
+
+if __name__ == "__main__":
+    main()
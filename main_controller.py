@@ -1,10 +1,9 @@
 # Files
 
-import optuna
-from optuna import Trial
-
 from backtest_runner import create_backtest_runner
 from cli.print_utils import print_info
+from modules.algo.hyperopt.study import get_study_name, export_best_trials, print_best_trials
+from modules.algo.hyperopt.worker import get_worker_study_name
 
 
 class MainController:
@@ -13,13 +12,16 @@ class MainController:
     async def run(args) -> None:
         async with create_backtest_runner(args) as runner:
 
-            if args.alpha_hyperopt:
-                study = optuna.create_study()
-
-                def objective(trial: Trial):
-                    return runner.run_hyperopt_iteration(trial)
-
-                study.optimize(objective, n_trials=100)
-                print_info(f"Best results {study.best_params}")
+            config = runner.module
+
+            if config.hyperopt_worker:
+                study = runner.load_study(get_worker_study_name(config.hyperopt_study))
+                runner.run_hyperopt(study)
+            elif args.alpha_hyperopt:
+                study = runner.load_study(get_study_name(config.hyperopt_study,
+                                                         config.strategy_definition.strategy_name))
+                runner.run_hyperopt(study)
+                print_best_trials(study)
+                print_info(f"Best trials exported to {export_best_trials(study)}")
             else:
                 runner.run_outputted_backtest()
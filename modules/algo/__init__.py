@@ -1,4 +1,6 @@
 from modules.algo.backtesting import BackTesting
+from modules.algo.indicators.lazy_resolver import LazyIndicatorResolver
+from modules.algo.indicators.panel import OHLCVPanel, has_panel_hook
 from modules.setup.config import ConfigModule
 
 
@@ -8,8 +10,18 @@ class AlgoModule(object):
         self.strategy = strategy
         self.additional_ohlcv_pair_frames = additional_ohlcv_pair_frames
         self.config_module = config_module
+        self.indicator_resolver = LazyIndicatorResolver(strategy)
+        self.ohlcv_panel = None
 
     def run(self):
-        backtesting_module = BackTesting(self.ohlcv_pair_frames, self.config_module, self.strategy,
-                                         self.additional_ohlcv_pair_frames)
-        return backtesting_module.start_backtesting()
+        return self.create_backtesting().start_backtesting()
+
+    def populate_indicators(self) -> dict:
+        return self.create_backtesting().populate_indicators()
+
+    def create_backtesting(self) -> BackTesting:
+        # The panel only depends on the OHLCV data, so it is stacked once and reused for every (hyperopt) run
+        if self.ohlcv_panel is None and has_panel_hook(self.strategy):
+            self.ohlcv_panel = OHLCVPanel.from_pair_frames(self.ohlcv_pair_frames)
+        return BackTesting(self.ohlcv_pair_frames, self.config_module, self.strategy,
+                           self.additional_ohlcv_pair_frames, self.indicator_resolver, self.ohlcv_panel)
@@ -1,7 +1,11 @@
 # Files
-from typing import Tuple
+from typing import Dict, Tuple
+
+from pandas import DataFrame
 
 from backtesting.strategy import Strategy
+from modules.algo.indicators.lazy_resolver import LazyIndicatorResolver
+from modules.algo.indicators.panel import OHLCVPanel
 from modules.public.pairs_data import PairsData
 from modules.setup.config import ConfigModule
 from cli.print_utils import print_info, print_warning
@@ -20,7 +24,8 @@ from cli.print_utils import print_info, print_warning
 
 class BackTesting:
 
-    def __init__(self, data: dict, config_module: ConfigModule, strategy: Strategy, additional_pairs_data):
+    def __init__(self, data: dict, config_module: ConfigModule, strategy: Strategy, additional_pairs_data,
+                 indicator_resolver: LazyIndicatorResolver = None, ohlcv_panel: OHLCVPanel = None):
         self.data = {}
         self.buypoints = {}
         self.sellpoints = {}
@@ -33,6 +38,8 @@ class BackTesting:
         self.additional_pairs_data = additional_pairs_data
         self.backtesting_from = config_module.backtesting_from
         self.backtesting_to = config_module.backtesting_to
+        self.indicator_resolver = indicator_resolver or LazyIndicatorResolver(strategy)
+        self.ohlcv_panel = ohlcv_panel
 
     def start_backtesting(self) -> Tuple[dict, dict]:
         print_info('Starting backtest...')
@@ -53,23 +60,17 @@ class BackTesting:
         notify = False
         notify_reason = ""
         stoploss_type = self.config.stoploss_type
+        resolver = self.indicator_resolver
 
         print_info("Populating Indicators")
-        for pair in self.data.keys():
-            df = self.data[pair].copy()
-            cleandf = df.dropna().copy()
-
-            try:
-                indicators = self.strategy.generate_indicators(cleandf, self.additional_pairs_data)
-            except TypeError:
-                indicators = self.strategy.generate_indicators(cleandf)
-
-            indicators = self.strategy.buy_signal(indicators)
-            indicators = self.strategy.sell_signal(indicators)
+        for pair, indicators in self.populate_indicators().items():
+            df = self.data[pair]
+            indicators = resolver.call(pair, self.strategy.buy_signal, indicators)
+            indicators = resolver.call(pair, self.strategy.sell_signal, indicators)
             indicators = indicators.append(df.loc[df["close"].isnull()]).sort_index()
             self.df[pair] = indicators.copy()
             if stoploss_type == "dynamic":
-                stoploss = self.strategy.stoploss(indicators)
+                stoploss = resolver.call(pair, self.strategy.stoploss, indicators)
                 if stoploss is None:  # stoploss not configured
                     notify = True
                     notify_reason = "not configured"
@@ -83,3 +84,43 @@ class BackTesting:
             print_warning(f"Dynamic stoploss {notify_reason}. Using standard stoploss of "
                           f"{self.config.stoploss}%.")
         return data_dict
+
+    def populate_indicators(self) -> Dict[str, DataFrame]:
+        """
+        Populates the indicators of every pair, without signals
+        :return: dict containing the candles without missing ticks plus indicators per pair
+        """
+        indicators_per_pair = {}
+        resolver = self.indicator_resolver
+        plot_indicators = self.get_plot_indicators()
+        panel_indicators = self.populate_panel_indicators()
+        for pair in self.data.keys():
+            cleandf = self.data[pair].dropna().copy()
+            if pair in panel_indicators:
+                pair_indicators = panel_indicators[pair]
+                cleandf[pair_indicators.columns] = pair_indicators.loc[cleandf.index]
+
+            try:
+                indicators = self.strategy.generate_indicators(cleandf, self.additional_pairs_data)
+            except TypeError:
+                indicators = self.strategy.generate_indicators(cleandf)
+
+            indicators_per_pair[pair] = resolver.prepare(pair, indicators, plot_indicators)
+        return indicators_per_pair
+
+    def populate_panel_indicators(self) -> dict:
+        """
+        Calls the batched strategy hook once for all pairs and scatters the (time x pair) results
+        :return: dict containing a dataframe of panel indicator columns per pair
+        """
+        if self.ohlcv_panel is None:
+            return {}
+        indicators = self.strategy.generate_panel_indicators(self.ohlcv_panel)
+        if not indicators:
+            return {}
+        return self.ohlcv_panel.scatter(indicators)
+
+    def get_plot_indicators(self) -> list:
+        if not self.config.plots:
+            return []
+        return (self.config.mainplot_indicators or []) + (self.config.subplot_indicators or [])
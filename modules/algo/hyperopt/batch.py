@@ -0,0 +1,112 @@
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from optuna import Study
+from optuna.trial import TrialState
+from pandas import DataFrame
+
+from cli.print_utils import print_info
+from modules.algo.hyperopt.study import Budget, CompletedTrials, Heartbeat, ask_new_trial, tell_trial
+from modules.stats.batch_tradingmodule import BatchTradingModule, BatchResults
+from modules.stats.tradingmodule_config import TradingModuleConfig
+
+BATCH_HOOK = "batch_signals"
+
+
+def has_batch_signals_hook(strategy) -> bool:
+    """
+    The batch hook is opt-in: it is only used when the strategy overrides the default of the base Strategy.
+    """
+    from backtesting.strategy import Strategy
+    hook = getattr(type(strategy), BATCH_HOOK, None)
+    return hook is not None and hook is not getattr(Strategy, BATCH_HOOK)
+
+
+class BatchBacktest:
+    """
+    Candles and indicators of every pair on a shared time axis, prepared once, on which batches of candidate
+    signal parameters are simulated with a BatchTradingModule
+    """
+
+    def __init__(self, strategy, pair_frames: Dict[str, DataFrame], indicators: Dict[str, DataFrame],
+                 config: TradingModuleConfig):
+        """
+        :param pair_frames: OHLCV frame per pair, including the missing (NaN) ticks
+        :param indicators: frame per pair from populate_indicators, without the missing ticks
+        """
+        self.strategy = strategy
+        self.indicators = indicators
+        self.trading_module = BatchTradingModule(config)
+        frames = {pair: frame.sort_index() for pair, frame in pair_frames.items()}
+        first_frame = next(iter(frames.values()))
+        if not all(frame.index.equals(first_frame.index) for frame in frames.values()):
+            raise ValueError("Batched backtests need pair frames with equal backtesting periods")
+        self.times = first_frame.index.to_numpy(dtype=np.int64)
+        self.candles = {pair: {column: frame[column].to_numpy(dtype=np.float64)
+                               for column in ("open", "high", "low", "close")} for pair, frame in frames.items()}
+        self.rows = {pair: np.searchsorted(self.times, frame.index.to_numpy(dtype=np.int64))
+                     for pair, frame in indicators.items()}
+
+    def signals(self, parameters: Dict[str, np.ndarray]) -> tuple:
+        """
+        :return: (time x K) buy and sell signals per pair, without signals on missing ticks
+        """
+        n_candidates = len(next(iter(parameters.values()))) if parameters else 1
+        buy, sell = {}, {}
+        for pair, rows in self.rows.items():
+            pair_buy, pair_sell = self.strategy.batch_signals(self.indicators[pair], parameters)
+            buy[pair] = np.zeros((len(self.times), n_candidates), dtype=bool)
+            sell[pair] = np.zeros((len(self.times), n_candidates), dtype=bool)
+            buy[pair][rows] = np.asarray(pair_buy, dtype=bool).reshape(len(rows), -1)
+            sell[pair][rows] = np.asarray(pair_sell, dtype=bool).reshape(len(rows), -1)
+        return buy, sell
+
+    def run(self, parameters: Dict[str, np.ndarray]) -> BatchResults:
+        buy, sell = self.signals(parameters)
+        return self.trading_module.simulate(self.times, self.candles, buy, sell)
+
+
+def optimize_in_batches(study: Study, search_space: dict, n_trials: int, batch_size: int,
+                        evaluate_batch: Callable[[List[dict]], tuple], timeout: Optional[float] = None,
+                        callbacks: Sequence[Callable] = ()) -> None:
+    """
+    Asks batch_size trials at once, evaluates their parameters in a single call and tells all values back.
+    Parameter sets that were already evaluated are not evaluated again.
+    :param evaluate_batch: from a list of parameter dicts to (K,) or (K x objectives) values and the user
+    attributes of every trial
+    :param callbacks: called with the study and every finished trial
+    """
+    print_info(f"Running {n_trials} hyperopt trials in batches of {batch_size}...")
+    completed = CompletedTrials(study)
+    budget = Budget(study, n_trials, timeout)
+    with Heartbeat(study) as heartbeat:
+        asking = True
+        while asking:
+            trials = []
+            while len(trials) < batch_size:
+                asking = budget.ask()
+                if not asking:
+                    break
+                trial = ask_new_trial(study, search_space, completed, callbacks)
+                if trial is not None:
+                    heartbeat.add(trial)
+                    trials.append(trial)
+            if not trials:
+                continue
+
+            try:
+                values, user_attrs = evaluate_batch([trial.params for trial in trials])
+                values = np.asarray(values, dtype=np.float64)
+            except Exception:
+                for trial in trials:
+                    tell_trial(study, trial, state=TrialState.FAIL, callbacks=callbacks)
+                raise
+            finally:
+                for trial in trials:
+                    heartbeat.remove(trial)
+            for trial, value, trial_user_attrs in zip(trials, values, user_attrs):
+                value = value.tolist() if value.ndim else float(value)
+                for key, user_attr in trial_user_attrs.items():
+                    trial.set_user_attr(key, user_attr)
+                tell_trial(study, trial, value, callbacks=callbacks)
+                completed.add(trial, value if isinstance(value, list) else [value])
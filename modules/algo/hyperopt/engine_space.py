@@ -0,0 +1,95 @@
+from dataclasses import replace
+from typing import Optional, Tuple
+
+from optuna import Trial
+from optuna.distributions import BaseDistribution, CategoricalDistribution, DiscreteUniformDistribution, \
+    IntUniformDistribution, UniformDistribution
+
+from modules.stats.stats_config import StatsConfig
+from modules.stats.tradingmodule_config import TradingModuleConfig
+
+ENGINE_PREFIX = "engine-"
+ENGINE_SETTINGS = ("stoploss", "stoploss-type", "max-open-trades", "roi")
+# The dynamic stoploss is populated together with the signals, so it cannot vary per trial
+STOPLOSS_TYPES = ("standard", "trailing")
+
+
+def create_distribution(setting: str, space: dict, integer: bool = False) -> BaseDistribution:
+    """
+    :param space: {"options": [...]} or {"low": ..., "high": ..., "step": ...} where the step is optional
+    """
+    if "options" in space:
+        return CategoricalDistribution(space["options"])
+    if "low" not in space or "high" not in space:
+        raise ValueError(f"The search space of '{setting}' needs options, or a low and a high value")
+    if integer:
+        return IntUniformDistribution(int(space["low"]), int(space["high"]), int(space.get("step", 1)))
+    if space.get("step") is not None:
+        return DiscreteUniformDistribution(float(space["low"]), float(space["high"]), float(space["step"]))
+    return UniformDistribution(float(space["low"]), float(space["high"]))
+
+
+def suggest(trial: Trial, name: str, distribution: BaseDistribution):
+    if isinstance(distribution, CategoricalDistribution):
+        return trial.suggest_categorical(name, distribution.choices)
+    if isinstance(distribution, IntUniformDistribution):
+        return trial.suggest_int(name, distribution.low, distribution.high, step=distribution.step)
+    if isinstance(distribution, DiscreteUniformDistribution):
+        return trial.suggest_float(name, distribution.low, distribution.high, step=distribution.q)
+    return trial.suggest_float(name, distribution.low, distribution.high)
+
+
+class EngineSearchSpace:
+    """
+    Search space of the engine settings from the hyperopt-engine-space config, e.g.:
+
+        "hyperopt-engine-space": {
+            "stoploss": {"low": 2, "high": 20, "step": 0.5},
+            "max-open-trades": {"low": 1, "high": 5},
+            "roi": {"0": {"low": 2, "high": 10}, "60": {"low": 1, "high": 5}}
+        }
+
+    Engine settings only change the trading simulation, not the signals of the strategy. Their parameters are
+    named engine-<setting>, or engine-roi-<minutes> for the ROI table.
+    """
+
+    def __init__(self, config: Optional[dict] = None):
+        self.distributions = {}
+        for setting, space in (config or {}).items():
+            if setting not in ENGINE_SETTINGS:
+                raise ValueError(f"'{setting}' is not an engine setting, choose from {ENGINE_SETTINGS}")
+            if setting == "roi":
+                for minutes, roi_space in space.items():
+                    self.distributions[f"{ENGINE_PREFIX}roi-{int(minutes)}"] = create_distribution(
+                        f"roi {minutes}", roi_space)
+                continue
+            distribution = create_distribution(setting, space, integer=setting == "max-open-trades")
+            if setting == "stoploss-type" and not (isinstance(distribution, CategoricalDistribution) and
+                                                   set(distribution.choices) <= set(STOPLOSS_TYPES)):
+                raise ValueError(f"The stoploss-type can be searched over the options {STOPLOSS_TYPES}")
+            self.distributions[ENGINE_PREFIX + setting] = distribution
+
+    def __len__(self) -> int:
+        return len(self.distributions)
+
+    def suggest(self, trial: Trial) -> dict:
+        """
+        :return: value of every engine parameter for the trial
+        """
+        return {name: suggest(trial, name, distribution) for name, distribution in self.distributions.items()}
+
+    def apply(self, values: dict, trading_module_config: TradingModuleConfig,
+              stats_config: StatsConfig) -> Tuple[TradingModuleConfig, StatsConfig]:
+        """
+        :param values: engine parameters from suggest
+        :return: copies of the configs with the engine settings of the trial
+        """
+        settings = {}
+        roi = dict(trading_module_config.roi)
+        for name, value in values.items():
+            setting = name[len(ENGINE_PREFIX):]
+            if setting.startswith("roi-"):
+                roi[setting[len("roi-"):]] = value
+            else:
+                settings[setting.replace("-", "_")] = value
+        return replace(trading_module_config, roi=roi, **settings), replace(stats_config, **settings)
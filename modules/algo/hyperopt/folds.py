@@ -0,0 +1,95 @@
+from concurrent.futures import Executor, ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pandas import DataFrame
+
+FOLD_TYPES = ("walk-forward", "purged")
+AGGREGATIONS = ("mean", "median", "worst")
+
+
+def get_fold_ranges(times_ms: np.ndarray, n_folds: int, fold_type: str = "walk-forward",
+                    purge: int = 0) -> List[Tuple[int, int]]:
+    """
+    Splits the candles in n_folds blocks of (almost) equal length.
+    walk-forward: fold k runs from the first candle until the end of block k, so every fold extends the
+    previous one with the next period, like anchored walk-forward testing.
+    purged: fold k is block k, without the `purge` candles on both sides of the boundaries between blocks,
+    so trades around a boundary do not carry over to the neighbouring fold.
+    :return: (first, last) timestamp of every fold, both inclusive
+    """
+    times_ms = np.asarray(times_ms, dtype=np.int64)
+    if fold_type not in FOLD_TYPES:
+        raise ValueError(f"Unknown fold type '{fold_type}', expected one of {FOLD_TYPES}")
+    if n_folds < 1 or len(times_ms) < n_folds:
+        raise ValueError(f"{len(times_ms)} candles cannot be split in {n_folds} folds")
+
+    bounds = np.linspace(0, len(times_ms), n_folds + 1).round().astype(int)
+    folds = []
+    for k in range(n_folds):
+        start, end = bounds[k], bounds[k + 1]
+        if fold_type == "walk-forward":
+            start = 0
+        else:
+            start = start + purge if k > 0 else start
+            end = end - purge if k < n_folds - 1 else end
+        if end <= start:
+            raise ValueError(f"A purge of {purge} candles leaves no candles in fold {k + 1}")
+        folds.append((int(times_ms[start]), int(times_ms[end - 1])))
+    return folds
+
+
+def slice_signals(pair_frames: Dict[str, DataFrame], frame_with_signals: dict, first: int, last: int) -> tuple:
+    """
+    :return: pair frames and frame_with_signals with only the ticks from first until last (inclusive)
+    """
+    sliced_frames = {pair: frame.loc[(frame.index >= first) & (frame.index <= last)]
+                     for pair, frame in pair_frames.items()}
+    sliced_signals = {pair: {tick: row for tick, row in ticks.items() if first <= tick <= last}
+                      for pair, ticks in frame_with_signals.items()}
+    return sliced_frames, sliced_signals
+
+
+def aggregate(values: Sequence, aggregation: str = "mean", directions: Optional[Sequence[str]] = None):
+    """
+    Combines the objective values of the folds into the value of the trial
+    :param values: value, or tuple of values (one per direction), of every fold
+    :param aggregation: mean, median or worst (the highest loss when minimizing, the lowest when maximizing)
+    :return: float, or tuple for multiple objectives
+    """
+    matrix = np.asarray(values, dtype=np.float64).reshape(len(values), -1)
+    directions = list(directions or ["minimize"] * matrix.shape[1])
+    if aggregation == "mean":
+        result = matrix.mean(axis=0)
+    elif aggregation == "median":
+        result = np.median(matrix, axis=0)
+    elif aggregation == "worst":
+        result = np.array([matrix[:, i].max() if direction == "minimize" else matrix[:, i].min()
+                           for i, direction in enumerate(directions)])
+    else:
+        raise ValueError(f"Unknown fold aggregation '{aggregation}', expected one of {AGGREGATIONS}")
+    return float(result[0]) if len(result) == 1 and np.ndim(values[0]) == 0 else tuple(result.tolist())
+
+
+def create_fold_pool(n_folds: int, initializer: Optional[Callable] = None,
+                     initargs: tuple = ()) -> ProcessPoolExecutor:
+    """
+    Pool that evaluates the folds of the trials of a study. Its processes are spawned once, prepared with
+    initializer(*initargs) (e.g. to build a BacktestRunner), and reused by every trial of the study.
+    """
+    return ProcessPoolExecutor(max_workers=n_folds, mp_context=get_context("spawn"), initializer=initializer,
+                               initargs=initargs)
+
+
+def map_folds(evaluate: Callable[[int], object], n_folds: int, pool: Optional[Executor] = None) -> list:
+    """
+    :param evaluate: evaluation of a fold, picklable (e.g. a partial of a module level function) when a pool is
+    given
+    :param pool: pool of the study, e.g. from create_fold_pool; without a pool the folds are evaluated in this
+    process one after another
+    :return: evaluate(fold) of every fold
+    """
+    if pool is None or n_folds < 2:
+        return [evaluate(fold) for fold in range(n_folds)]
+    return list(pool.map(evaluate, range(n_folds)))
@@ -0,0 +1,209 @@
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from optuna import Study
+from optuna.distributions import CategoricalDistribution, IntUniformDistribution, IntLogUniformDistribution
+from optuna.trial import FrozenTrial, TrialState
+
+from cli.print_utils import print_warning
+from modules.algo.hyperopt.study import STUDIES_DIRECTORY
+
+METRICS_ATTR = "metrics"
+HEADLINE_METRICS = ("end_capital", "overall_profit_percentage", "max_seen_drawdown", "max_realised_drawdown",
+                    "n_trades", "n_trades_with_loss", "win_weeks", "loss_weeks")
+PARAMS_PREFIX = "params_"
+
+
+def get_headline_metrics(stats) -> Dict[str, float]:
+    """
+    :param stats: TradingStats of the backtest of a trial
+    :return: the main results that are kept in the trial history, by name
+    """
+    return {name: float(getattr(stats.main_results, name)) for name in HEADLINE_METRICS}
+
+
+def get_batch_metrics(results) -> List[Dict[str, float]]:
+    """
+    :param results: BatchResults of K candidates
+    :return: the headline metrics a batched simulation offers, for every candidate
+    """
+    return [{"end_capital": float(end_capital), "overall_profit_percentage": float(profit_ratio * 100),
+             "max_seen_drawdown": float((drawdown_ratio - 1) * 100), "n_trades": float(n_trades)}
+            for end_capital, profit_ratio, drawdown_ratio, n_trades in
+            zip(results.end_capital, results.profit_ratio, results.max_drawdown_ratio, results.n_trades)]
+
+
+def mean_metrics(metrics: List[Dict[str, float]]) -> Dict[str, float]:
+    """
+    :return: mean of every metric, e.g. over the folds of a trial
+    """
+    return {name: float(np.mean([fold_metrics[name] for fold_metrics in metrics])) for name in metrics[0]} \
+        if metrics else {}
+
+
+def get_value_columns(n_objectives: int) -> List[str]:
+    # Same column names as optuna's study.trials_dataframe()
+    return ["value"] if n_objectives == 1 else [f"values_{i}" for i in range(n_objectives)]
+
+
+def get_param_kind(distribution) -> str:
+    if isinstance(distribution, CategoricalDistribution):
+        return "string"
+    if isinstance(distribution, (IntUniformDistribution, IntLogUniformDistribution)):
+        return "int"
+    return "float"
+
+
+def trial_to_row(trial: FrozenTrial, value_columns: List[str], param_kinds: Dict[str, str]) -> dict:
+    """
+    :return: column values of the trial in the history, parameters of categorical distributions as text
+    """
+    values = trial.values or [None] * len(value_columns)
+    row = {"number": trial.number, "state": trial.state.name}
+    row.update(zip(value_columns, values))
+    for name, kind in param_kinds.items():
+        value = trial.params.get(name)
+        if value is not None:
+            value = str(value) if kind == "string" else int(value) if kind == "int" else float(value)
+        row[PARAMS_PREFIX + name] = value
+    metrics = trial.user_attrs.get(METRICS_ATTR, {})
+    row.update({name: metrics.get(name) for name in HEADLINE_METRICS})
+    row["duplicate_of"] = trial.user_attrs.get("duplicate_of")
+    row["datetime_start"] = trial.datetime_start
+    row["duration"] = trial.duration.total_seconds() if trial.duration is not None else None
+    return row
+
+
+def get_history_directory(study_name: str, directory: str = STUDIES_DIRECTORY) -> str:
+    return os.path.join(directory, f"{study_name}-trials")
+
+
+class HistoryWriter:
+    """
+    Callback of the hyperopt loops that writes every finished trial (number, state, values, parameters, headline
+    metrics and timing) to Parquet while the study runs. Every run of a study writes its own part file in
+    <directory>/<study name>-trials/, so resumed studies and hyperopt-worker processes never write to the same
+    file. Rows are buffered and written as a row group every flush_every trials, and when the writer is closed.
+    """
+
+    def __init__(self, study: Study, search_space: dict, directory: str = STUDIES_DIRECTORY,
+                 flush_every: int = 1000):
+        import pyarrow as pa
+
+        self.value_columns = get_value_columns(len(study.directions))
+        self.param_kinds = {name: get_param_kind(distribution) for name, distribution in search_space.items()}
+        types = {"string": pa.string(), "int": pa.int64(), "float": pa.float64()}
+        self.schema = pa.schema([("number", pa.int64()), ("state", pa.string())] +
+                                [(column, pa.float64()) for column in self.value_columns] +
+                                [(PARAMS_PREFIX + name, types[kind]) for name, kind in self.param_kinds.items()] +
+                                [(name, pa.float64()) for name in HEADLINE_METRICS] +
+                                [("duplicate_of", pa.int64()), ("datetime_start", pa.timestamp("us")),
+                                 ("duration", pa.float64())])
+        self.path = os.path.join(get_history_directory(study.study_name, directory),
+                                 f"part-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.parquet")
+        self.flush_every = flush_every
+        self.rows = []
+        self.writer = None
+
+    def __call__(self, study: Study, trial: FrozenTrial) -> None:
+        self.rows.append(trial_to_row(trial, self.value_columns, self.param_kinds))
+        if len(self.rows) >= self.flush_every:
+            self.flush()
+
+    def __enter__(self) -> 'HistoryWriter':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def flush(self) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not self.rows:
+            return
+        if self.writer is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.writer = pq.ParquetWriter(self.path, self.schema)
+        columns = {field.name: [row[field.name] for row in self.rows] for field in self.schema}
+        self.writer.write_table(pa.Table.from_pydict(columns, schema=self.schema))
+        self.rows = []
+
+    def close(self) -> None:
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+def create_history_writer(study: Study, search_space: dict,
+                          directory: str = STUDIES_DIRECTORY) -> Optional[HistoryWriter]:
+    """
+    :return: a HistoryWriter, or None with a warning when pyarrow cannot be imported
+    """
+    try:
+        return HistoryWriter(study, search_space, directory)
+    except ImportError as e:
+        print_warning(f"hyperopt-history is disabled, pyarrow could not be imported: {e}")
+        return None
+
+
+def load_history(path: str) -> pd.DataFrame:
+    """
+    :param path: history directory of a study (or a single part file)
+    :return: one row per trial, ordered by trial number
+    """
+    history = pd.read_parquet(path)
+    return history.drop_duplicates("number", keep="last").sort_values("number").reset_index(drop=True)
+
+
+def get_completed(history: pd.DataFrame, objective: str) -> pd.DataFrame:
+    completed = history[history["state"] == TrialState.COMPLETE.name]
+    return completed[completed[objective].notna()]
+
+
+def get_parameter_column(parameter: str) -> str:
+    return parameter if parameter.startswith(PARAMS_PREFIX) else PARAMS_PREFIX + parameter
+
+
+def get_bins(values: pd.Series, bins: int) -> pd.Series:
+    """
+    :return: quantile bin of every value for numeric parameters with more than `bins` distinct values,
+    the value itself otherwise
+    """
+    if pd.api.types.is_numeric_dtype(values) and values.nunique() > bins:
+        return pd.qcut(values, bins, duplicates="drop")
+    return values
+
+
+def parameter_importance(history: pd.DataFrame, objective: str = "value", bins: int = 10) -> pd.Series:
+    """
+    Correlation ratio (eta squared) of every parameter with the objective over the completed trials: the share
+    of the variance of the objective that is explained by the (binned) value of the parameter, between 0 and 1
+    :param objective: value column, e.g. value, values_0 or a headline metric like overall_profit_percentage
+    :return: importance by parameter name, most important first
+    """
+    completed = get_completed(history, objective)
+    y = completed[objective].astype(np.float64)
+    total = ((y - y.mean()) ** 2).sum()
+    importance = {}
+    for column in [column for column in completed.columns if column.startswith(PARAMS_PREFIX)]:
+        groups = y.groupby(get_bins(completed[column], bins), observed=True)
+        between = (groups.count() * (groups.mean() - y.mean()) ** 2).sum()
+        importance[column[len(PARAMS_PREFIX):]] = between / total if total > 0 else 0.
+    return pd.Series(importance, name=objective, dtype=np.float64).sort_values(ascending=False)
+
+
+def sensitivity(history: pd.DataFrame, parameter: str, objective: str = "value",
+                bins: Optional[int] = 10) -> pd.DataFrame:
+    """
+    :return: count, mean, median, min and max of the objective over the completed trials, per (binned) value
+    of the parameter
+    """
+    completed = get_completed(history, objective)
+    values = completed[get_parameter_column(parameter)]
+    return completed[objective].groupby(get_bins(values, bins) if bins else values, observed=True) \
+        .agg(["count", "mean", "median", "min", "max"])
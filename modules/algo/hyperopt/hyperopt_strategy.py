@@ -1,10 +1,11 @@
 import functools
 import inspect
+from typing import Optional
+
+from optuna import Trial
+
+from modules.algo.hyperopt.parameter_snapshot import resolve_parameters
 from modules.algo.hyperopt.parameter_symbol import ParameterSymbol
-from modules.algo.hyperopt.parameters.category_parameter import CategoricalParameter
-from modules.public.hyperopt_parameter import categorical_parameter
-from modules.algo.hyperopt.parameters.float_parameter import FloatParameter, float_property
-from modules.algo.hyperopt.parameters.integer_parameter import IntegerParameter, int_property
 
 
 def flip_params(func):
@@ -17,18 +18,36 @@ def flip_params(func):
 
 is_parameter = functools.partial(flip_params(isinstance), ParameterSymbol)
 
-params = {
-    IntegerParameter: int_property,
-    FloatParameter: float_property,
-    CategoricalParameter: categorical_parameter
-}
-
-
-def inject_hyperopt_parameters(strategy):
-    strategy_class = type(strategy)
-    hyperopt_parameters = [(name, property_value) for name, property_value in inspect.getmembers(strategy_class) if
-                           is_parameter(property_value)]
-    for name, property_value in hyperopt_parameters:
-        property_implementation = params[type(property_value)](property_value, name)
-        pro = property(property_implementation)
-        setattr(strategy_class, name, pro)
+
+def get_hyperopt_parameters(strategy_class: type) -> dict:
+    """
+    :return: ParameterSymbol of every hyperopt parameter declared on the strategy class, by name
+    """
+    return {name: property_value for name, property_value in inspect.getmembers(strategy_class)
+            if is_parameter(property_value)}
+
+
+def inject_hyperopt_parameters(strategy) -> None:
+    """
+    Gives the strategy instance the default values of its hyperopt parameters. The strategy class is not changed,
+    its parameter declarations stay available for get_search_space.
+    """
+    set_trial(strategy, None)
+
+
+def set_trial(strategy, trial: Optional[Trial]) -> None:
+    """
+    Resolves the hyperopt parameters of the strategy once for the trial (the defaults without a trial) into an
+    immutable strategy.parameters snapshot. Reading a parameter, e.g. self.buy_rsi, returns its value from the
+    snapshot, so the instance keeps no copies that could outlive the trial.
+    """
+    strategy.trial = trial
+    strategy.parameters = resolve_parameters(get_hyperopt_parameters(type(strategy)), trial)
+
+
+def get_search_space(strategy) -> dict:
+    """
+    :return: optuna distribution of every hyperopt parameter of the strategy, by parameter name
+    """
+    parameters = get_hyperopt_parameters(type(strategy))
+    return {name: parameter.distribution() for name, parameter in parameters.items()}
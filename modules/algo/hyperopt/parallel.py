@@ -0,0 +1,58 @@
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from multiprocessing import get_context
+from typing import Callable, Optional, Sequence
+
+import optuna
+from optuna import Study
+
+from cli.print_utils import print_info, print_warning
+from modules.algo.hyperopt.study import Budget, CompletedTrials, Heartbeat, ask_new_trial, tell_trial
+
+
+def optimize_in_pool(study: Study, search_space: dict, n_trials: int, n_workers: int,
+                     initializer: Callable, initargs: tuple, evaluate: Callable,
+                     timeout: Optional[float] = None, callbacks: Sequence[Callable] = ()) -> None:
+    """
+    Runs the trials of a study on a pool of worker processes. The study stays in this process: trials are
+    asked with the full search space, their parameters are evaluated by a worker and the values are told back.
+    Keeping one trial in flight per worker lets the sampler use every finished trial for the next ask.
+    Parameter sets that were already evaluated are not sent to a worker again.
+    :param search_space: optuna distribution per parameter name
+    :param initializer: called once per worker with initargs, e.g. to build a BacktestRunner
+    :param evaluate: module level function from a parameter dict to the objective value and the user attributes
+    of the trial, e.g. its headline metrics
+    :param timeout: seconds after which no new trials are asked, running trials are finished
+    :param callbacks: called with the study and every finished trial
+    """
+    print_info(f"Running {n_trials} hyperopt trials on {n_workers} workers...")
+    completed = CompletedTrials(study)
+    budget = Budget(study, n_trials, timeout)
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=get_context("spawn"),
+                             initializer=initializer, initargs=initargs) as pool, Heartbeat(study) as heartbeat:
+        running = {}
+        asking = True
+        while asking or running:
+            while len(running) < n_workers:
+                asking = budget.ask()
+                if not asking:
+                    break
+                trial = ask_new_trial(study, search_space, completed, callbacks)
+                if trial is not None:
+                    heartbeat.add(trial)
+                    running[pool.submit(evaluate, trial.params)] = trial
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                trial = running.pop(future)
+                heartbeat.remove(trial)
+                try:
+                    value, user_attrs = future.result()
+                    for key, user_attr in user_attrs.items():
+                        trial.set_user_attr(key, user_attr)
+                    tell_trial(study, trial, value, callbacks=callbacks)
+                    completed.add(trial, value if isinstance(value, (tuple, list)) else [value])
+                except Exception as e:  # a failing trial should not stop the other workers
+                    print_warning(f"Trial {trial.number} failed: {e}")
+                    tell_trial(study, trial, state=optuna.trial.TrialState.FAIL, callbacks=callbacks)
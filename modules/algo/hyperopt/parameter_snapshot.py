@@ -0,0 +1,56 @@
+from typing import Iterator, Mapping, Optional
+
+from optuna import Trial
+
+
+class ParameterSnapshot(Mapping):
+    """
+    Immutable values of the hyperopt parameters of one strategy instance for one trial. Snapshots with the same
+    values are equal and hash alike, so they can key indicator and result caches, and they pickle to worker
+    processes like a dict.
+    """
+    __slots__ = ("_values", "_hash")
+
+    def __init__(self, values: Optional[dict] = None):
+        values = dict(values or {})
+        object.__setattr__(self, "_values", values)
+        object.__setattr__(self, "_hash", hash(tuple(sorted(values.items(), key=lambda item: item[0]))))
+
+    def __getitem__(self, name: str):
+        return self._values[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ParameterSnapshot):
+            return self._hash == other._hash and self._values == other._values
+        return isinstance(other, Mapping) and self._values == dict(other)
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError("ParameterSnapshot is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("ParameterSnapshot is immutable")
+
+    def __reduce__(self) -> tuple:
+        return ParameterSnapshot, (self._values,)
+
+    def __repr__(self) -> str:
+        return f"ParameterSnapshot({self._values!r})"
+
+
+def resolve_parameters(parameters: dict, trial: Optional[Trial] = None) -> ParameterSnapshot:
+    """
+    Suggests every parameter once with the trial, or takes the defaults without a trial
+    :param parameters: ParameterSymbol (e.g. an IntegerParameter) of every hyperopt parameter, by name
+    """
+    if trial is None:
+        return ParameterSnapshot({name: parameter.default for name, parameter in parameters.items()})
+    return ParameterSnapshot({name: parameter.suggest(trial, name) for name, parameter in parameters.items()})
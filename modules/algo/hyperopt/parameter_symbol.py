@@ -1,2 +1,18 @@
 class ParameterSymbol:
-    pass
+    """
+    Hyperopt parameter declared on a strategy class. Read on the class it is the declaration itself, read on a
+    strategy instance it is the value in the instance's parameters snapshot (see set_trial), or the default
+    when no value was resolved yet. The instance itself never stores the values.
+    """
+    default = None
+
+    def __set_name__(self, owner, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        parameters = getattr(instance, "parameters", None)
+        if parameters is not None and self.name in parameters:
+            return parameters[self.name]
+        return self.default
@@ -1,8 +1,8 @@
 from typing import Sequence
 
-from optuna.distributions import CategoricalChoiceType
+from optuna import Trial
+from optuna.distributions import CategoricalChoiceType, CategoricalDistribution
 
-from backtesting.strategy import Strategy
 from modules.algo.hyperopt.parameter_symbol import ParameterSymbol
 
 
@@ -12,12 +12,8 @@ class CategoricalParameter(ParameterSymbol):
         self.options = options
         self.default = default
 
+    def distribution(self) -> CategoricalDistribution:
+        return CategoricalDistribution(self.options)
 
-def categorical_property(float_param: CategoricalParameter, name: str):
-    def get_value(strategy: Strategy) -> float:
-        if not strategy.trial:
-            return float_param.default
-
-        return strategy.trial.suggest_categorical(name, float_param.options)
-
-    return get_value
+    def suggest(self, trial: Trial, name: str) -> CategoricalChoiceType:
+        return trial.suggest_categorical(name, self.options)
@@ -1,4 +1,6 @@
-from backtesting.strategy import Strategy
+from optuna import Trial
+from optuna.distributions import BaseDistribution, DiscreteUniformDistribution, UniformDistribution
+
 from modules.algo.hyperopt.parameter_symbol import ParameterSymbol
 
 
@@ -10,12 +12,10 @@ class FloatParameter(ParameterSymbol):
         self.low = low
         self.default = default
 
+    def distribution(self) -> BaseDistribution:
+        if self.step is None:
+            return UniformDistribution(self.low, self.high)
+        return DiscreteUniformDistribution(self.low, self.high, self.step)
 
-def float_property(float_param: FloatParameter, name: str):
-    def get_value(strategy: Strategy) -> float:
-        if not strategy.trial:
-            return float_param.default
-
-        return strategy.trial.suggest_float(name, float_param.low, float_param.high, step=float_param.step)
-
-    return get_value
+    def suggest(self, trial: Trial, name: str) -> float:
+        return trial.suggest_float(name, self.low, self.high, step=self.step)
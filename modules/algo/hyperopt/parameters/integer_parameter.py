@@ -1,4 +1,6 @@
-from backtesting.strategy import Strategy
+from optuna import Trial
+from optuna.distributions import IntUniformDistribution
+
 from modules.algo.hyperopt.parameter_symbol import ParameterSymbol
 
 
@@ -10,11 +12,8 @@ class IntegerParameter(ParameterSymbol):
         self.high = high
         self.step = step
 
+    def distribution(self) -> IntUniformDistribution:
+        return IntUniformDistribution(self.low, self.high, self.step)
 
-def int_property(int_param: IntegerParameter, name: str):
-    def get_value(first: Strategy) -> int:
-        if not first.trial:
-            return int_param.default
-
-        return first.trial.suggest_int(name, int_param.low, int_param.high, int_param.step)
-    return get_value
+    def suggest(self, trial: Trial, name: str) -> int:
+        return trial.suggest_int(name, self.low, self.high, self.step)
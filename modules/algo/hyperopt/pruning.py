@@ -0,0 +1,76 @@
+from typing import Callable
+
+import numpy as np
+import optuna
+from optuna import Trial
+from optuna.pruners import BasePruner
+
+from modules.stats.metrics.calendar import CalendarIndex
+
+PRUNERS = ("none", "median", "successive-halving", "hyperband")
+MONTHLY_CHECKPOINTS = "month"
+
+
+def create_pruner(name: str) -> BasePruner:
+    """
+    Pruners compare the loss a trial reports at a checkpoint with the losses of earlier trials at the same
+    checkpoint, the step of a checkpoint is its number (the first checkpoint is step 1).
+    """
+    if name == "none":
+        return optuna.pruners.NopPruner()
+    if name == "median":
+        return optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=1)
+    if name == "successive-halving":
+        return optuna.pruners.SuccessiveHalvingPruner(min_resource=1)
+    if name == "hyperband":
+        return optuna.pruners.HyperbandPruner(min_resource=1)
+    raise ValueError(f"Unknown pruner '{name}', expected one of {PRUNERS}")
+
+
+def get_checkpoint_rows(times_ms: np.ndarray, interval: str) -> np.ndarray:
+    """
+    :param interval: 'month' for the last candle of every calendar month, or a number of candles
+    :return: rows of the time grid after which a checkpoint is reported, the last row is never a checkpoint
+    as the trial is finished there
+    """
+    n_rows = len(times_ms)
+    if interval == MONTHLY_CHECKPOINTS:
+        rows = CalendarIndex(times_ms, 'M').ends - 1 if n_rows else np.array([], dtype=np.int64)
+    else:
+        candles = int(interval)
+        if candles < 1:
+            raise ValueError(f"A checkpoint interval of {interval} candles is not possible")
+        rows = np.arange(candles - 1, n_rows, candles)
+    return rows[rows < n_rows - 1]
+
+
+class Checkpoints:
+    """
+    Reports an intermediate loss of a running backtest to its trial and stops the backtest when the pruner
+    of the study rejects the trial. Trials without a pruner (like the FixedTrial of pool workers) never prune.
+    """
+
+    def __init__(self, trial: Trial, interval: str, intermediate_loss: Callable[[], float]):
+        """
+        :param intermediate_loss: loss of the backtest so far
+        """
+        self.trial = trial
+        self.interval = interval
+        self.intermediate_loss = intermediate_loss
+        self.steps = {}
+
+    def start(self, times_ms: np.ndarray) -> None:
+        self.steps = {int(row): step for step, row in enumerate(get_checkpoint_rows(times_ms, self.interval), 1)}
+
+    def after_row(self, row: int) -> None:
+        """
+        Reports the loss when the row is a checkpoint
+        :raises optuna.TrialPruned: when the trial should stop
+        """
+        step = self.steps.get(row)
+        if step is None:
+            return
+        loss = self.intermediate_loss()
+        self.trial.report(loss, step)
+        if self.trial.should_prune():
+            raise optuna.TrialPruned(f"Pruned at checkpoint {step} with loss {loss}")
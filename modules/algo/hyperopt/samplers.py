@@ -0,0 +1,145 @@
+import math
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import optuna
+from optuna import Study
+from optuna.distributions import BaseDistribution, CategoricalDistribution, DiscreteUniformDistribution, \
+    IntUniformDistribution, IntLogUniformDistribution, LogUniformDistribution
+from optuna.samplers import BaseSampler, GridSampler, RandomSampler
+from optuna.trial import FrozenTrial, TrialState
+
+SAMPLERS = ("tpe", "cmaes", "random", "grid", "qmc", "nsga2")
+
+
+class ExhaustibleGridSampler(GridSampler):
+    """
+    GridSampler stops the study from after_trial once every grid point was asked, which optuna only allows
+    inside study.optimize. The ask/tell loops of the engine check is_exhausted instead.
+    """
+
+    def after_trial(self, study: Study, trial: FrozenTrial, state: TrialState,
+                    values: Optional[Sequence[float]]) -> None:
+        pass
+
+    def is_exhausted(self, study: Study) -> bool:
+        return len(self._get_unvisited_grid_ids(study)) == 0
+
+
+def get_primes(n: int) -> list:
+    primes = []
+    candidate = 2
+    while len(primes) < n:
+        if all(candidate % prime for prime in primes):
+            primes.append(candidate)
+        candidate += 1
+    return primes
+
+
+def radical_inverse(index: int, base: int) -> float:
+    """
+    :return: the digits of index in the base, mirrored behind the decimal point, e.g. 6 = 110 in base 2 -> 0.011
+    """
+    result, fraction = 0., 1. / base
+    while index > 0:
+        index, digit = divmod(index, base)
+        result += digit * fraction
+        fraction /= base
+    return result
+
+
+def from_unit_interval(u: float, distribution: BaseDistribution):
+    """
+    :param u: value in [0, 1)
+    :return: the value of the distribution at quantile u, spread uniformly (in log space for log distributions)
+    """
+    if isinstance(distribution, CategoricalDistribution):
+        return distribution.choices[min(int(u * len(distribution.choices)), len(distribution.choices) - 1)]
+    if isinstance(distribution, IntLogUniformDistribution):
+        value = math.exp(math.log(distribution.low) + u * (math.log(distribution.high) - math.log(distribution.low)))
+        return min(max(int(round(value)), distribution.low), distribution.high)
+    if isinstance(distribution, IntUniformDistribution):
+        n_values = (distribution.high - distribution.low) // distribution.step + 1
+        return distribution.low + min(int(u * n_values), n_values - 1) * distribution.step
+    if isinstance(distribution, DiscreteUniformDistribution):
+        n_values = int(round((distribution.high - distribution.low) / distribution.q)) + 1
+        return min(distribution.low + min(int(u * n_values), n_values - 1) * distribution.q, distribution.high)
+    if isinstance(distribution, LogUniformDistribution):
+        return math.exp(math.log(distribution.low) + u * (math.log(distribution.high) - math.log(distribution.low)))
+    return distribution.low + u * (distribution.high - distribution.low)
+
+
+class HaltonSampler(BaseSampler):
+    """
+    Quasi-random sampler that covers the search space more evenly than random sampling, with one dimension of
+    a randomly shifted Halton sequence per parameter. Trial n takes point n + 1 of the sequence, so a resumed
+    study with the same seed continues the sequence. optuna 2.x has no QMCSampler, this is its counterpart.
+    """
+
+    def __init__(self, search_space: Dict[str, BaseDistribution], seed: Optional[int] = None):
+        self.search_space = dict(search_space)
+        self.bases = dict(zip(self.search_space, get_primes(len(self.search_space))))
+        rng = np.random.RandomState(seed)
+        self.shifts = {name: rng.random_sample() for name in self.search_space}
+        self.independent_sampler = RandomSampler(seed=seed)
+
+    def reseed_rng(self) -> None:
+        self.independent_sampler.reseed_rng()
+
+    def infer_relative_search_space(self, study: Study, trial: FrozenTrial) -> Dict[str, BaseDistribution]:
+        return self.search_space
+
+    def sample_relative(self, study: Study, trial: FrozenTrial,
+                        search_space: Dict[str, BaseDistribution]) -> Dict[str, Any]:
+        return {name: from_unit_interval((radical_inverse(trial.number + 1, self.bases[name]) + self.shifts[name])
+                                         % 1., distribution) for name, distribution in search_space.items()}
+
+    def sample_independent(self, study: Study, trial: FrozenTrial, param_name: str,
+                           param_distribution: BaseDistribution) -> Any:
+        return self.independent_sampler.sample_independent(study, trial, param_name, param_distribution)
+
+
+def get_grid(distribution: BaseDistribution) -> list:
+    if isinstance(distribution, CategoricalDistribution):
+        return list(distribution.choices)
+    if isinstance(distribution, (IntUniformDistribution, IntLogUniformDistribution)):
+        return list(range(distribution.low, distribution.high + 1, getattr(distribution, "step", 1)))
+    if isinstance(distribution, DiscreteUniformDistribution):
+        n_steps = int(round((distribution.high - distribution.low) / distribution.q))
+        return [float(value) for value in distribution.low + np.arange(n_steps + 1) * distribution.q]
+    raise ValueError(f"The grid sampler needs stepped parameters, {distribution} has no grid. "
+                     f"Add a step to the parameter or choose another sampler.")
+
+
+def create_sampler(name: str, search_space: dict, n_objectives: int = 1, seed: Optional[int] = None) -> BaseSampler:
+    """
+    tpe adapts to any search space and is the default. cmaes converges faster on spaces of (mostly)
+    continuous parameters, random, grid and qmc are for exploration, nsga2 is a genetic multi-objective sampler.
+    :param search_space: optuna distribution per parameter name, used by the grid and qmc samplers
+    :param n_objectives: number of values the loss function returns
+    """
+    if name == "tpe":
+        if n_objectives > 1:
+            return optuna.samplers.MOTPESampler(seed=seed)
+        return optuna.samplers.TPESampler(seed=seed)
+    if name == "cmaes":
+        if n_objectives > 1:
+            raise ValueError("The cmaes sampler does not support multiple objectives, choose tpe or nsga2")
+        return optuna.samplers.CmaEsSampler(seed=seed, warn_independent_sampling=False)
+    if name == "random":
+        return optuna.samplers.RandomSampler(seed=seed)
+    if name == "grid":
+        return ExhaustibleGridSampler({parameter: get_grid(distribution)
+                                       for parameter, distribution in search_space.items()})
+    if name == "qmc":
+        return HaltonSampler(search_space, seed=seed)
+    if name == "nsga2":
+        return optuna.samplers.NSGAIISampler(seed=seed)
+    raise ValueError(f"Unknown sampler '{name}', expected one of {SAMPLERS}")
+
+
+def is_exhausted(study: Study) -> bool:
+    """
+    :return: whether the sampler of the study has no new parameter sets left
+    """
+    return isinstance(study.sampler, ExhaustibleGridSampler) and study.sampler.is_exhausted(study)
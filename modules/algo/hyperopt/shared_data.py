@@ -0,0 +1,141 @@
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+from pandas.core.internals import BlockManager, make_block
+
+ALIGNMENT = 8
+
+
+@dataclass(frozen=True)
+class SharedBlock:
+    """
+    All numeric columns of one dtype, stored as a (rows x columns) array inside the shared memory block
+    """
+    offset: int
+    columns: tuple
+    dtype: str
+
+
+@dataclass(frozen=True)
+class SharedFrameLayout:
+    """
+    Location of one frame inside the shared memory block: its int64 index and a SharedBlock per dtype of its
+    numeric columns.
+    """
+    n_rows: int
+    index_offset: int
+    blocks: tuple
+    constant_columns: dict  # column -> value, e.g. the pair name
+    column_order: tuple
+    index_name: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class SharedFramesDescriptor:
+    """
+    Picklable description of SharedFrames, passed to worker processes instead of the data itself
+    """
+    name: str
+    layouts: Dict[Hashable, SharedFrameLayout]
+
+
+def align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+class SharedFrames:
+    """
+    Candle frames of all pairs placed once in a single multiprocessing.shared_memory block. Worker processes
+    attach to the block by its descriptor and get frames whose numeric columns and index are read-only views
+    on the shared buffer, so the candles are neither reloaded, pickled nor copied per worker. Columns with a
+    single value (like "pair") are stored in the descriptor and filled per worker, other non-numeric columns
+    are not supported.
+    The frames are only valid while the block is attached: drop them before close(). The creating process
+    owns the block and must call unlink() when the workers are done.
+    """
+
+    def __init__(self, memory: shared_memory.SharedMemory, descriptor: SharedFramesDescriptor, owner: bool):
+        self.memory = memory
+        self.descriptor = descriptor
+        self.owner = owner
+
+    @classmethod
+    def create(cls, frames: Dict[Hashable, DataFrame]) -> 'SharedFrames':
+        layouts = {}
+        offset = 0
+        for key, frame in frames.items():
+            index_offset = offset
+            offset = align(offset + len(frame) * 8)
+            numeric_columns = frame.select_dtypes(include=[np.number, bool]).columns
+            blocks = []
+            for dtype in dict.fromkeys(str(frame[column].dtype) for column in numeric_columns):
+                columns = tuple(column for column in numeric_columns if str(frame[column].dtype) == dtype)
+                blocks.append(SharedBlock(offset, columns, dtype))
+                offset = align(offset + len(frame) * len(columns) * np.dtype(dtype).itemsize)
+            constant_columns = {}
+            for column in frame.columns.difference(numeric_columns):
+                values = frame[column].unique()
+                if len(values) > 1:
+                    raise ValueError(f"Column '{column}' of {key} is not numeric and cannot be shared")
+                constant_columns[column] = values[0] if len(values) else None
+            layouts[key] = SharedFrameLayout(n_rows=len(frame), index_offset=index_offset, blocks=tuple(blocks),
+                                             constant_columns=constant_columns, column_order=tuple(frame.columns),
+                                             index_name=frame.index.name)
+
+        memory = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        shared = cls(memory, SharedFramesDescriptor(memory.name, layouts), owner=True)
+        for key, frame in frames.items():
+            layout = layouts[key]
+            shared.index_array(layout)[:] = frame.index.to_numpy(dtype=np.int64)
+            for block in layout.blocks:
+                shared.block_array(layout, block)[:] = frame[list(block.columns)].to_numpy(dtype=block.dtype)
+        return shared
+
+    @classmethod
+    def attach(cls, descriptor: SharedFramesDescriptor) -> 'SharedFrames':
+        return cls(shared_memory.SharedMemory(name=descriptor.name), descriptor, owner=False)
+
+    def index_array(self, layout: SharedFrameLayout) -> np.ndarray:
+        return np.ndarray(layout.n_rows, dtype=np.int64, buffer=self.memory.buf, offset=layout.index_offset)
+
+    def block_array(self, layout: SharedFrameLayout, block: SharedBlock) -> np.ndarray:
+        return np.ndarray((layout.n_rows, len(block.columns)), dtype=block.dtype, buffer=self.memory.buf,
+                          offset=block.offset)
+
+    def frame(self, key: Hashable) -> DataFrame:
+        """
+        :return: the frame as it was shared, with its original column order and dtypes. The numeric columns
+        and the index are read-only views on the shared buffer, constant columns are filled in this process.
+        """
+        layout = self.descriptor.layouts[key]
+        index_values = self.index_array(layout)
+        index_values.flags.writeable = False
+        locations = {column: location for location, column in enumerate(layout.column_order)}
+        # The frame is assembled from one block per dtype, as the DataFrame constructors would copy the
+        # columns into new consolidated blocks
+        blocks = []
+        for block in layout.blocks:
+            values = self.block_array(layout, block)
+            values.flags.writeable = False
+            blocks.append(make_block(values.T, placement=[locations[column] for column in block.columns]))
+        if layout.constant_columns:
+            constants = np.empty((len(layout.constant_columns), layout.n_rows), dtype=object)
+            constants[:] = np.array(list(layout.constant_columns.values()), dtype=object)[:, None]
+            blocks.append(make_block(constants, placement=[locations[column] for column in layout.constant_columns]))
+        axes = [pd.Index(layout.column_order), pd.Index(index_values, name=layout.index_name, copy=False)]
+        return DataFrame(BlockManager(blocks, axes))
+
+    def frames(self) -> Dict[Hashable, DataFrame]:
+        return {key: self.frame(key) for key in self.descriptor.layouts}
+
+    def close(self) -> None:
+        self.memory.close()
+
+    def unlink(self) -> None:
+        self.close()
+        if self.owner:
+            self.memory.unlink()
@@ -0,0 +1,267 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Optional, Sequence
+
+import optuna
+from optuna import Study
+from optuna.exceptions import DuplicatedStudyError
+from optuna.storages import RDBStorage
+from optuna.trial import TrialState, Trial
+
+from cli.print_utils import print_info, print_warning
+from modules.algo.hyperopt.samplers import is_exhausted
+
+STUDIES_DIRECTORY = os.path.join("data", "hyperopt")
+STUDIES_DATABASE = "studies.db"
+
+
+def get_storage_url(directory: str = STUDIES_DIRECTORY) -> str:
+    os.makedirs(directory, exist_ok=True)
+    return f"sqlite:///{os.path.join(directory, STUDIES_DATABASE)}"
+
+
+def create_storage(storage_url: str) -> RDBStorage:
+    """
+    Trials of killed processes keep the RUNNING state, the heartbeat lets a resumed study mark them as failed
+    """
+    return RDBStorage(storage_url, heartbeat_interval=60, grace_period=180)
+
+
+def resolve_storage_url(storage_url: str, study_name: str) -> str:
+    """
+    :return: the configured storage, the default database when a study is named to be resumed, or an empty URL
+    for an in-memory study
+    """
+    if storage_url:
+        return storage_url
+    return get_storage_url() if study_name else ""
+
+
+def get_study_name(study_name: str, strategy_name: str) -> str:
+    """
+    :return: the configured name, which resumes the study when it exists, or a new name for the strategy
+    """
+    return study_name or f"{strategy_name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+
+
+def load_or_create_study(study_name: str, storage_url: str, user_attrs: Optional[dict] = None,
+                         **study_arguments) -> Study:
+    """
+    :param storage_url: optuna storage URL, an empty URL keeps the study in memory for this run only
+    :param user_attrs: recorded on the study by the process that creates it, before any other process can
+    load it, and left untouched when the study already exists
+    """
+    if not storage_url:
+        study = optuna.create_study(study_name=study_name, **study_arguments)
+        set_user_attrs(study, user_attrs)
+        print_info(f"Created in-memory hyperopt study '{study_name}'.")
+        return study
+    storage = create_storage(storage_url)
+    try:
+        study = optuna.create_study(study_name=study_name, storage=storage, **study_arguments)
+        set_user_attrs(study, user_attrs)
+    except DuplicatedStudyError:
+        study = optuna.load_study(study_name=study_name, storage=storage, sampler=study_arguments.get("sampler"),
+                                  pruner=study_arguments.get("pruner"))
+    optuna.storages.fail_stale_trials(study)
+    n_completed = len(study.get_trials(deepcopy=False, states=(TrialState.COMPLETE,)))
+    if n_completed:
+        print_info(f"Resuming hyperopt study '{study_name}' with {n_completed} completed trials.")
+    else:
+        print_info(f"Created hyperopt study '{study_name}' in {storage_url}.")
+    return study
+
+
+def set_user_attrs(study: Study, user_attrs: Optional[dict]) -> None:
+    for key, value in (user_attrs or {}).items():
+        study.set_user_attr(key, value)
+
+
+class Heartbeat:
+    """
+    Records a heartbeat for the trials this process is running, so that other processes resuming the same
+    study can tell them apart from the trials of killed processes. Does nothing for in-memory studies.
+    """
+
+    def __init__(self, study: Study):
+        storage = study._storage
+        self.storage = storage if isinstance(storage, RDBStorage) and storage.is_heartbeat_enabled() else None
+        self.running = set()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def __enter__(self) -> 'Heartbeat':
+        if self.storage is not None:
+            self.thread = threading.Thread(target=self.beat, daemon=True)
+            self.thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def beat(self) -> None:
+        while not self.stopped.wait(self.storage.heartbeat_interval):
+            for trial_id in list(self.running):
+                self.storage.record_heartbeat(trial_id)
+
+    def add(self, trial: Trial) -> None:
+        if self.storage is not None:
+            self.running.add(trial._trial_id)
+            self.storage.record_heartbeat(trial._trial_id)
+
+    def remove(self, trial: Trial) -> None:
+        self.running.discard(trial._trial_id)
+
+
+def params_key(params: dict) -> tuple:
+    return tuple(sorted(params.items()))
+
+
+class CompletedTrials:
+    """
+    Values of the completed trials of a study by parameter set, so that a parameter set that was already
+    simulated (e.g. on a coarse grid of stepped parameters) is not simulated again
+    """
+
+    def __init__(self, study: Study):
+        self.values = {}
+        for trial in study.get_trials(deepcopy=False, states=(TrialState.COMPLETE,)):
+            self.values.setdefault(params_key(trial.params), (trial.number, trial.values))
+
+    def get(self, params: dict) -> Optional[tuple]:
+        """
+        :return: number and values of the first completed trial with these parameters, or None
+        """
+        return self.values.get(params_key(params))
+
+    def add(self, trial: Trial, values) -> None:
+        self.values.setdefault(params_key(trial.params), (trial.number, values))
+
+
+def tell_trial(study: Study, trial: Trial, values=None, state: TrialState = TrialState.COMPLETE,
+               callbacks: Sequence[Callable] = ()) -> None:
+    """
+    Tells the values or state of the trial and calls every callback with the study and the finished trial,
+    like the callbacks of optuna's study.optimize
+    """
+    study.tell(trial, values, state=state)
+    if callbacks:
+        frozen_trial = study._storage.get_trial(trial._trial_id)
+        for callback in callbacks:
+            callback(study, frozen_trial)
+
+
+def ask_new_trial(study: Study, search_space: dict, completed: CompletedTrials,
+                  callbacks: Sequence[Callable] = ()) -> Optional[Trial]:
+    """
+    Asks a trial with the search space. When its parameters were already evaluated, the earlier result is told
+    right away (marked with the user attribute 'duplicate_of') and None is returned.
+    """
+    trial = study.ask(search_space)
+    duplicate = completed.get(trial.params)
+    if duplicate is None:
+        return trial
+    number, values = duplicate
+    trial.set_user_attr("duplicate_of", number)
+    tell_trial(study, trial, values if len(values) > 1 else values[0], callbacks=callbacks)
+    return None
+
+
+class Budget:
+    """
+    Number of trials and wall-clock time (in seconds, None for no limit) that a run may spend on a study
+    """
+
+    def __init__(self, study: Study, n_trials: int, timeout: Optional[float] = None):
+        self.study = study
+        self.n_trials = n_trials
+        self.deadline = None if not timeout else time.monotonic() + timeout
+        self.asked = 0
+
+    def ask(self) -> bool:
+        """
+        :return: whether another trial may be asked, counting it when it may
+        """
+        if self.asked >= self.n_trials or is_exhausted(self.study):
+            return False
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            print_info(f"Hyperopt timeout reached after {self.asked} trials.")
+            self.n_trials = self.asked
+            return False
+        self.asked += 1
+        return True
+
+
+def optimize(study: Study, search_space: dict, n_trials: int, objective: Callable[[Trial], float],
+             timeout: Optional[float] = None, callbacks: Sequence[Callable] = ()) -> None:
+    """
+    Runs n_trials more trials of the study in this process, skipping the simulation of duplicate parameter sets.
+    Stops early after timeout seconds or when the sampler has no new parameter sets left.
+    :param callbacks: called with the study and every finished trial, e.g. a HistoryWriter
+    """
+    completed = CompletedTrials(study)
+    budget = Budget(study, n_trials, timeout)
+    with Heartbeat(study) as heartbeat:
+        while budget.ask():
+            trial = ask_new_trial(study, search_space, completed, callbacks)
+            if trial is None:
+                continue
+            heartbeat.add(trial)
+            try:
+                value = objective(trial)
+            except optuna.TrialPruned:
+                tell_trial(study, trial, state=TrialState.PRUNED, callbacks=callbacks)
+                continue
+            except Exception:
+                tell_trial(study, trial, state=TrialState.FAIL, callbacks=callbacks)
+                raise
+            finally:
+                heartbeat.remove(trial)
+            tell_trial(study, trial, value, callbacks=callbacks)
+            completed.add(trial, value if isinstance(value, (tuple, list)) else [value])
+
+
+def get_best_trials(study: Study) -> list:
+    """
+    :return: the best trial, or the trials on the Pareto front of a multi-objective study. Empty when no trial
+    completed, e.g. when every trial was pruned or failed
+    """
+    if not any(trial.state == TrialState.COMPLETE for trial in study.trials):
+        return []
+    if len(study.directions) > 1:
+        return sorted(study.best_trials, key=lambda trial: trial.values)
+    return [study.best_trial]
+
+
+def print_best_trials(study: Study) -> None:
+    best_trials = get_best_trials(study)
+    if not best_trials:
+        print_warning(f"Study {study.study_name} has no completed trials.")
+        return
+    if len(study.directions) > 1:
+        directions = ", ".join(direction.name.lower() for direction in study.directions)
+        print_info(f"Pareto front of {len(best_trials)} trials ({directions}):")
+    for trial in best_trials:
+        print_info(f"Trial {trial.number}: values {trial.values}, params {trial.params}")
+
+
+def export_best_trials(study: Study, directory: str = STUDIES_DIRECTORY) -> str:
+    """
+    Writes the number, values and parameters of the best trial, or of every trial on the Pareto front of a
+    multi-objective study, to <directory>/<study name>-best.json
+    :return: path of the written file
+    """
+    path = os.path.join(directory, f"{study.study_name}-best.json")
+    os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"study": study.study_name,
+                   "directions": [direction.name.lower() for direction in study.directions],
+                   "best_trials": [{"number": trial.number, "values": trial.values, "params": trial.params}
+                                   for trial in get_best_trials(study)],
+                   "n_trials": len(study.trials)}, f, indent=4, default=str)
+    return path
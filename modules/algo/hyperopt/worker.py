@@ -0,0 +1,60 @@
+import hashlib
+import time
+from typing import Dict, Hashable
+
+import numpy as np
+from optuna import Study
+from pandas import DataFrame
+
+from cli.print_utils import print_info
+
+FINGERPRINT_ATTRIBUTE = "data_fingerprint"
+FINGERPRINT_COLUMNS = ("open", "high", "low", "close", "volume")
+FINGERPRINT_TIMEOUT = 10.
+FINGERPRINT_POLL_INTERVAL = .1
+
+
+def get_data_fingerprint(frames: Dict[Hashable, DataFrame]) -> str:
+    """
+    Hash of the candles a backtest runs on: the pairs, their timestamps and OHLCV values. Strategy columns
+    are left out, so the fingerprint is the same before and after populating indicators.
+    """
+    digest = hashlib.sha256()
+    for key in sorted(frames, key=repr):
+        frame = frames[key]
+        digest.update(repr(key).encode())
+        digest.update(np.ascontiguousarray(frame.index.to_numpy(dtype=np.int64)).tobytes())
+        columns = [column for column in FINGERPRINT_COLUMNS if column in frame.columns]
+        digest.update(np.ascontiguousarray(frame[columns].to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+
+def check_data_fingerprint(study: Study, fingerprint: str, timeout: float = FINGERPRINT_TIMEOUT) -> None:
+    """
+    Every process that adds trials to a shared study must backtest on the same data. The process that creates
+    the study records its fingerprint (see load_or_create_study), the others only read it and refuse to start
+    when their data cache differs. Between the creation of a study and the recording of its fingerprint, the
+    fingerprint is awaited for at most timeout seconds.
+    """
+    expected = study.user_attrs.get(FINGERPRINT_ATTRIBUTE)
+    deadline = time.monotonic() + timeout
+    while expected is None and time.monotonic() < deadline:
+        time.sleep(FINGERPRINT_POLL_INTERVAL)
+        expected = study.user_attrs.get(FINGERPRINT_ATTRIBUTE)
+    if expected is None:
+        raise Exception(f"[ERROR] Study '{study.study_name}' has no data fingerprint, it was created without "
+                        f"one. Start a new study to run it on several processes.")
+    if expected != fingerprint:
+        raise Exception(f"[ERROR] The data cache of this worker does not match the data of study "
+                        f"'{study.study_name}' ({fingerprint[:12]} instead of {expected[:12]}). "
+                        f"Check the pairs, timeframe and backtesting period, or remove the outdated datafiles.")
+    print_info(f"Data fingerprint {fingerprint[:12]} matches study '{study.study_name}'.")
+
+
+def get_worker_study_name(study_name: str) -> str:
+    """
+    Workers on different machines can only meet in a study when it is named explicitly
+    """
+    if not study_name:
+        raise Exception("[ERROR] A hyperopt worker needs the name of the shared study, set hyperopt-study.")
+    return study_name
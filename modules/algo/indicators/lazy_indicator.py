@@ -0,0 +1,17 @@
+from typing import Callable, Sequence
+
+
+class LazyIndicator:
+    """
+    Named column producer registered on a strategy with the public `indicator` decorator.
+    The column is only computed when a signal, the stoploss or a plot actually reads it.
+    """
+
+    def __init__(self, func: Callable, name: str, depends_on: Sequence[str], cached: bool):
+        self.func = func
+        self.name = name
+        self.depends_on = tuple(depends_on)
+        self.cached = cached
+
+    def compute(self, strategy, dataframe):
+        return self.func(strategy, dataframe)
@@ -0,0 +1,96 @@
+import inspect
+from typing import Callable, Iterable, Optional
+
+from pandas import DataFrame
+
+from modules.algo.indicators.lazy_indicator import LazyIndicator
+
+
+def collect_lazy_indicators(strategy) -> dict:
+    producers = {}
+    for _, value in inspect.getmembers(type(strategy)):
+        if isinstance(value, LazyIndicator):
+            producers[value.name] = value
+    return producers
+
+
+class LazyIndicatorResolver:
+    """
+    Computes only the lazy indicators that are consumed by the strategy.
+
+    Consumed columns are discovered the first time a signal method reads a column that does not exist yet
+    (pandas raises a KeyError), after which the producer and its dependencies are computed and the method
+    is called again. Only KeyErrors of registered lazy columns are retried, any other KeyError is raised.
+    Discovered columns are remembered, so every following pair and backtest run computes them up front.
+    Values of producers that are marked cached (and only depend on cached producers) are kept per pair across
+    runs (e.g. hyperopt trials), all other producers are computed again in every run.
+    """
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+        self.producers = collect_lazy_indicators(strategy)
+        self.consumed = []
+        self.cache = {}
+        self.cacheable = {name: self.is_cacheable(name, set()) for name in self.producers}
+
+    @property
+    def enabled(self) -> bool:
+        return len(self.producers) > 0
+
+    def is_cacheable(self, name: str, visiting: set) -> bool:
+        if name in visiting:
+            raise ValueError(f"[Lazy indicators] Circular dependency detected at '{name}'")
+        producer = self.producers.get(name)
+        if producer is None:
+            return True
+        visiting.add(name)
+        cacheable = producer.cached and all(self.is_cacheable(dependency, visiting)
+                                            for dependency in producer.depends_on)
+        visiting.discard(name)
+        return cacheable
+
+    def prepare(self, pair: str, dataframe: DataFrame, columns: Optional[Iterable[str]] = None) -> DataFrame:
+        """
+        Computes the already known consumed columns, plus any requested (e.g. plotted) columns
+        that are registered as lazy indicators.
+        """
+        if not self.enabled:
+            return dataframe
+        for name in self.consumed:
+            self.resolve(pair, name, dataframe)
+        for name in columns or []:
+            if name in self.producers:
+                self.resolve(pair, name, dataframe)
+        return dataframe
+
+    def call(self, pair: str, method: Callable[[DataFrame], DataFrame], dataframe: DataFrame):
+        """
+        Calls a strategy method with the dataframe, computing lazy indicators on demand.
+        """
+        if not self.enabled:
+            return method(dataframe)
+        while True:
+            try:
+                return method(dataframe)
+            except KeyError as error:
+                name = error.args[0] if error.args else None
+                if not isinstance(name, str) or name not in self.producers or name in dataframe.columns:
+                    raise
+                self.resolve(pair, name, dataframe)
+                self.consumed.append(name)
+
+    def resolve(self, pair: str, name: str, dataframe: DataFrame) -> None:
+        if name in dataframe.columns or name not in self.producers:
+            return
+        producer = self.producers[name]
+        for dependency in producer.depends_on:
+            self.resolve(pair, dependency, dataframe)
+
+        pair_cache = self.cache.setdefault(pair, {})
+        if name in pair_cache:
+            dataframe[name] = pair_cache[name]
+            return
+
+        dataframe[name] = producer.compute(self.strategy, dataframe)
+        if self.cacheable[name]:
+            pair_cache[name] = dataframe[name]
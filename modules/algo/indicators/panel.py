@@ -0,0 +1,116 @@
+# Libraries
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+# ======================================================================
+# OHLCVPanel stacks the aligned pair frames into 2-D (time x pair)
+# arrays, so that strategies can compute indicators for all pairs in a
+# single vectorized call.
+#
+# © 2021 DemaTrading.ai
+# ======================================================================
+
+PANEL_HOOK = "generate_panel_indicators"
+OHLCV_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+def has_panel_hook(strategy) -> bool:
+    """
+    The panel hook is opt-in: it is only used when the strategy overrides the default of the base Strategy.
+    """
+    from backtesting.strategy import Strategy
+    hook = getattr(type(strategy), PANEL_HOOK, None)
+    return hook is not None and hook is not getattr(Strategy, PANEL_HOOK)
+
+
+class OHLCVPanel:
+    """
+    Read-only (time x pair) arrays of OHLCV data. Rows follow the union of all pair indexes (timestamps),
+    columns follow `pairs`. Candles that are missing for a pair (e.g. before it was listed) are NaN.
+    """
+
+    def __init__(self, index: np.ndarray, pairs: List[str], arrays: Dict[str, np.ndarray], positions: dict):
+        self.index = index
+        self.pairs = pairs
+        self.arrays = arrays
+        self.positions = positions
+
+    @classmethod
+    def from_pair_frames(cls, pair_frames: dict) -> 'OHLCVPanel':
+        pairs = list(pair_frames.keys())
+        frames = [pair_frames[pair] for pair in pairs]
+        if frames and all(frame.index.equals(frames[0].index) for frame in frames[1:]):
+            index = frames[0].index.to_numpy()
+            positions = {pair: None for pair in pairs}
+        else:
+            index = np.unique(np.concatenate([frame.index.to_numpy() for frame in frames])) if frames \
+                else np.array([], dtype=np.int64)
+            positions = {pair: np.searchsorted(index, frame.index.to_numpy())
+                         for pair, frame in zip(pairs, frames)}
+
+        arrays = {}
+        for column in OHLCV_COLUMNS:
+            values = np.full((len(index), len(pairs)), np.nan)
+            for i, (pair, frame) in enumerate(zip(pairs, frames)):
+                if column not in frame.columns:
+                    continue
+                rows = positions[pair]
+                values[slice(None) if rows is None else rows, i] = frame[column].to_numpy(dtype=np.float64)
+            values.flags.writeable = False
+            arrays[column] = values
+        return cls(index, pairs, arrays, positions)
+
+    @property
+    def shape(self) -> tuple:
+        return len(self.index), len(self.pairs)
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.arrays[column]
+
+    @property
+    def open(self) -> np.ndarray:
+        return self.arrays["open"]
+
+    @property
+    def high(self) -> np.ndarray:
+        return self.arrays["high"]
+
+    @property
+    def low(self) -> np.ndarray:
+        return self.arrays["low"]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.arrays["close"]
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self.arrays["volume"]
+
+    def scatter(self, indicators: dict) -> Dict[str, pd.DataFrame]:
+        """
+        Splits (time x pair) indicator arrays back into one dataframe of indicator columns per pair,
+        indexed like the original pair frames.
+        :param indicators: Mapping of column name to a (time x pair) array or DataFrame with pairs as columns
+        :return: dict containing a dataframe of indicator columns per pair
+        """
+        columns = {}
+        for name, values in indicators.items():
+            if isinstance(values, pd.DataFrame):
+                values = values.reindex(columns=self.pairs).to_numpy()
+            values = np.asarray(values)
+            if values.shape != self.shape:
+                raise ValueError(f"Panel indicator '{name}' has shape {values.shape}, "
+                                 f"expected (time x pair) shape {self.shape}")
+            columns[name] = values
+
+        per_pair = {}
+        for i, pair in enumerate(self.pairs):
+            rows = self.positions[pair]
+            index = self.index if rows is None else self.index[rows]
+            per_pair[pair] = pd.DataFrame(
+                {name: values[:, i] if rows is None else values[rows, i] for name, values in columns.items()},
+                index=index)
+        return per_pair
@@ -0,0 +1,406 @@
+# Libraries
+import abc
+import math
+from collections import deque, namedtuple
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# ======================================================================
+# Streaming indicators are the bar-by-bar counterparts of the batch
+# indicators in qtpylib_methods. They can be seeded from history and are
+# then updated in O(1) per candle.
+#
+# © 2021 DemaTrading.ai
+# ======================================================================
+
+MACDValue = namedtuple("MACDValue", "macd signal histogram")
+BandsValue = namedtuple("BandsValue", "upper mid lower")
+StochValue = namedtuple("StochValue", "k d")
+
+
+class StreamingIndicator(abc.ABC):
+    """
+    Base class of all streaming indicators. `update` consumes one candle and returns the current value,
+    which is NaN (or a tuple of NaN) until enough candles have been seen.
+    """
+
+    @abc.abstractmethod
+    def update(self, *args):
+        pass
+
+    @property
+    @abc.abstractmethod
+    def value(self):
+        pass
+
+
+class PriceIndicator(StreamingIndicator, abc.ABC):
+    """
+    Streaming indicator over a single price series, e.g. the close.
+    """
+
+    @abc.abstractmethod
+    def update(self, price: float):
+        pass
+
+    def seed(self, history) -> 'PriceIndicator':
+        for price in np.asarray(history, dtype=np.float64):
+            self.update(price)
+        return self
+
+
+class BarIndicator(StreamingIndicator, abc.ABC):
+    """
+    Streaming indicator over OHLCV candles.
+    """
+    columns = ('high', 'low', 'close')
+
+    @abc.abstractmethod
+    def update(self, *args):
+        pass
+
+    def update_candle(self, ohlcv: dict):
+        return self.update(*(ohlcv[column] for column in self.columns))
+
+    def seed(self, history: pd.DataFrame) -> 'BarIndicator':
+        for row in zip(*(history[column].to_numpy(dtype=np.float64) for column in self.columns)):
+            self.update(*row)
+        return self
+
+
+class RollingMoments:
+    """
+    Mean and variance of the valid values in a sliding window, using Welford's add/remove updates.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.count = 0
+        self.nan_count = 0
+        self.mean = 0.
+        self.m2 = 0.
+
+    def add(self, value: float) -> None:
+        self.values.append(value)
+        if math.isnan(value):
+            self.nan_count += 1
+        else:
+            self.count += 1
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (value - self.mean)
+        if len(self.values) > self.window:
+            self.remove(self.values.popleft())
+
+    def remove(self, value: float) -> None:
+        if math.isnan(value):
+            self.nan_count -= 1
+            return
+        self.count -= 1
+        if self.count == 0:
+            self.mean = self.m2 = 0.
+            return
+        delta = value - self.mean
+        self.mean -= delta / self.count
+        self.m2 -= delta * (value - self.mean)
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.window and self.nan_count == 0
+
+    @property
+    def std(self) -> float:
+        if self.count < 2:
+            return math.nan
+        return math.sqrt(max(self.m2, 0.) / (self.count - 1))
+
+
+class EMA(PriceIndicator):
+    """
+    Exponential moving average, equal to qtpylib's wma / rolling_weighted_mean (pandas ewm with adjust=True).
+    """
+
+    def __init__(self, window: float = 200, min_periods: Optional[int] = None):
+        self.decay = 1 - 2 / (window + 1)
+        self.min_periods = window if min_periods is None else min_periods
+        self.weighted_sum = 0.
+        self.weights = 0.
+        self.count = 0
+
+    def update(self, price: float) -> float:
+        if not math.isnan(price):
+            self.weighted_sum = price + self.decay * self.weighted_sum
+            self.weights = 1 + self.decay * self.weights
+            self.count += 1
+        else:
+            self.weighted_sum *= self.decay
+            self.weights *= self.decay
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if self.count < max(self.min_periods, 1):
+            return math.nan
+        return self.weighted_sum / self.weights
+
+
+class SMA(PriceIndicator):
+    """
+    Simple moving average, equal to qtpylib's sma / rolling_mean.
+    """
+
+    def __init__(self, window: int = 200):
+        self.moments = RollingMoments(window)
+
+    def update(self, price: float) -> float:
+        self.moments.add(price)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if not self.moments.full:
+            return math.nan
+        return self.moments.mean
+
+
+class RSI(PriceIndicator):
+    """
+    Relative strength index with Wilder smoothing, equal to qtpylib's rsi once `window + 2` prices are seen.
+    """
+
+    def __init__(self, window: int = 14):
+        self.window = window
+        self.history = []
+        self.previous = math.nan
+        self.ups = math.nan
+        self.downs = math.nan
+
+    def update(self, price: float) -> float:
+        if math.isnan(self.ups):
+            self.history.append(price)
+            if len(self.history) == self.window + 2:
+                self.initialize()
+        else:
+            self.smooth(price - self.previous)
+        self.previous = price
+        return self.value
+
+    def initialize(self) -> None:
+        # Seed like the batch version: the first window + 1 deltas, after which the
+        # last two of these deltas are smoothed in once more
+        deltas = np.diff(self.history)
+        self.ups = deltas[deltas > 0].sum() / self.window
+        self.downs = -deltas[deltas < 0].sum() / self.window
+        self.smooth(deltas[-2])
+        self.smooth(deltas[-1])
+        self.history = []
+
+    def smooth(self, delta: float) -> None:
+        upval = delta if delta > 0 else 0.
+        downval = -delta if delta <= 0 else 0.
+        self.ups = (self.ups * (self.window - 1) + upval) / self.window
+        self.downs = (self.downs * (self.window - 1.) + downval) / self.window
+
+    @property
+    def value(self) -> float:
+        if math.isnan(self.ups):
+            return math.nan
+        if self.downs == 0:
+            return 100. if self.ups > 0 else math.nan
+        return 100. - 100. / (1. + self.ups / self.downs)
+
+
+class ATR(BarIndicator):
+    """
+    Average true range, equal to qtpylib's atr (simple or exponential average of the true range).
+    """
+
+    def __init__(self, window: int = 14, exp: bool = False):
+        self.average = EMA(window) if exp else SMA(window)
+        self.previous_close = math.nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        true_range = np.fmax.reduce([high - low, abs(high - self.previous_close), abs(low - self.previous_close)])
+        self.previous_close = close
+        return self.average.update(float(true_range))
+
+    @property
+    def value(self) -> float:
+        return self.average.value
+
+
+class MACD(PriceIndicator):
+    """
+    Moving average convergence/divergence, equal to qtpylib's macd.
+    """
+
+    def __init__(self, fast: int = 3, slow: int = 10, smooth: int = 16):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(smooth)
+
+    def update(self, price: float) -> MACDValue:
+        self.fast.update(price)
+        self.slow.update(price)
+        macd_line = self.macd_line
+        if not math.isnan(macd_line):
+            self.signal.update(macd_line)
+        return self.value
+
+    @property
+    def macd_line(self) -> float:
+        return self.fast.value - self.slow.value
+
+    @property
+    def value(self) -> MACDValue:
+        macd_line = self.macd_line
+        signal = self.signal.value if not math.isnan(macd_line) else math.nan
+        return MACDValue(macd_line, signal, macd_line - signal)
+
+
+class BollingerBands(PriceIndicator):
+    """
+    Bollinger bands, equal to qtpylib's bollinger_bands (partial windows are used at the start).
+    """
+
+    def __init__(self, window: int = 20, stds: float = 2):
+        self.moments = RollingMoments(window)
+        self.stds = stds
+
+    def update(self, price: float) -> BandsValue:
+        self.moments.add(price)
+        return self.value
+
+    @property
+    def value(self) -> BandsValue:
+        if self.moments.count == 0:
+            return BandsValue(math.nan, math.nan, math.nan)
+        mid = self.moments.mean
+        std = self.moments.std
+        return BandsValue(mid + std * self.stds, mid, mid - std * self.stds)
+
+
+class VWAP(BarIndicator):
+    """
+    Volume weighted average price of the entire series, equal to qtpylib's vwap.
+    """
+    columns = ('high', 'low', 'close', 'volume')
+
+    def __init__(self):
+        self.price_volume = 0.
+        self.volume = 0.
+
+    def update(self, high: float, low: float, close: float, volume: float) -> float:
+        self.price_volume += volume * (high + low + close) / 3
+        self.volume += volume
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if self.volume == 0:
+            return math.nan
+        return self.price_volume / self.volume
+
+
+class MonotonicWindow:
+    """
+    Sliding window maximum (or minimum) with amortized O(1) updates.
+    """
+
+    def __init__(self, window: int, maximum: bool = True):
+        self.window = window
+        self.sign = 1 if maximum else -1
+        self.candidates = deque()
+        self.index = -1
+
+    def add(self, value: float) -> None:
+        self.index += 1
+        while self.candidates and self.candidates[-1][1] * self.sign <= value * self.sign:
+            self.candidates.pop()
+        self.candidates.append((self.index, value))
+        if self.candidates[0][0] <= self.index - self.window:
+            self.candidates.popleft()
+
+    @property
+    def value(self) -> float:
+        if self.index < self.window - 1:
+            return math.nan
+        return self.candidates[0][1]
+
+
+class WindowMean:
+    """
+    Mean of the last `window` values, NaN when any of them is NaN (like pandas' rolling mean). Keeps a running
+    sum of the finite values and counts the NaN and infinite ones, so every update is O(1).
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.total = 0.
+        self.nan_count = 0
+        self.inf_counts = {1.: 0, -1.: 0}
+
+    def add(self, value: float) -> float:
+        self.values.append(value)
+        self.count(value, 1)
+        if len(self.values) > self.window:
+            self.count(self.values.popleft(), -1)
+        return self.value
+
+    def count(self, value: float, sign: int) -> None:
+        if math.isnan(value):
+            self.nan_count += sign
+        elif math.isinf(value):
+            self.inf_counts[math.copysign(1., value)] += sign
+        else:
+            self.total += sign * value
+
+    @property
+    def value(self) -> float:
+        if len(self.values) < self.window or self.nan_count or (self.inf_counts[1.] and self.inf_counts[-1.]):
+            return math.nan
+        if self.inf_counts[1.] or self.inf_counts[-1.]:
+            return math.inf if self.inf_counts[1.] else -math.inf
+        return self.total / self.window
+
+
+class Stochastic(BarIndicator):
+    """
+    Stochastic oscillator, equal to qtpylib's stoch. Returns (fast_k, fast_d) when `fast`, else (slow_k, slow_d).
+    """
+
+    def __init__(self, window: int = 14, d: int = 3, k: int = 3, fast: bool = False):
+        self.highs = MonotonicWindow(window, maximum=True)
+        self.lows = MonotonicWindow(window, maximum=False)
+        self.fast = fast
+        self.fast_d = WindowMean(d)
+        self.slow_k = WindowMean(k)
+        self.slow_d = WindowMean(d)
+        self.current = StochValue(math.nan, math.nan)
+
+    def update(self, high: float, low: float, close: float) -> StochValue:
+        self.highs.add(high)
+        self.lows.add(low)
+        highest, lowest = self.highs.value, self.lows.value
+        if highest - lowest != 0:
+            fast_k = 100 * (close - lowest) / (highest - lowest)
+        elif close - lowest != 0:
+            fast_k = math.copysign(math.inf, close - lowest)
+        else:
+            fast_k = math.nan
+
+        fast_d = self.fast_d.add(fast_k)
+        if self.fast:
+            self.current = StochValue(fast_k, fast_d)
+        else:
+            slow_k = self.slow_k.add(fast_k)
+            self.current = StochValue(slow_k, self.slow_d.add(slow_k))
+        return self.current
+
+    @property
+    def value(self) -> StochValue:
+        return self.current
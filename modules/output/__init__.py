@@ -1,9 +1,10 @@
 import json
 import os
+from pathlib import Path
 
 from cli.print_utils import print_warning, print_error, print_info
 from modules.output.plots_per_coin import plot_per_coin
-from modules.output.equity_plot import equity_plot
+from modules.output.equity_plot import equity_plot, rolling_metrics_plot
 from modules.output.results import show_signature, CoinInsights, LeftOpenTradeResult, show_mainresults
 from modules.public.trading_stats import TradingStats
 from modules.stats.stats_config import StatsConfig
@@ -38,12 +39,17 @@ class OutputModule(object):
 
         print_info("Logging trades to " + FONT_BOLD + "data/backtesting-data/trades_log.json" + FONT_RESET + "...")
         log_trades(stats)
+        if self.config.export_rolling_metrics:
+            print_info("Exporting rolling metrics to " + FONT_BOLD + "data/backtesting-data/rolling-metrics"
+                       + FONT_RESET + "...")
+            export_rolling_metrics(stats)
 
         # plot graphs
         if self.config.plots:
             print_info("Creating plots in " + FONT_BOLD + "data/backtesting-data/plots" + FONT_RESET + "...")
             plot_per_coin(stats, config=self.config)
             equity_plot(stats.capital_per_timestamp)
+            rolling_metrics_plot(stats.rolling_metrics['all'])
         print_info("Backtest finished!")
 
         show_signature()
@@ -62,7 +68,8 @@ def show_trade_anomalies(stats: TradingStats):
 
 def log_trades(stats: TradingStats):
     trades_dict = {}
-    for trade in stats.trades:
+    excursions = stats.trade_excursions
+    for trade, excursion in zip(stats.trades, excursions.itertuples()):
         trade_dict = {'status': trade.status,
                       'opened_at': trade.opened_at,
                       'closed_at': trade.closed_at,
@@ -72,7 +79,10 @@ def log_trades(stats: TradingStats):
                       'starting_amount': trade.starting_amount,
                       'capital': trade.capital,
                       'currency_amount': trade.currency_amount,
-                      'sell_reason': trade.sell_reason}
+                      'sell_reason': trade.sell_reason,
+                      'mae_ratio': excursion.mae,
+                      'mfe_ratio': excursion.mfe,
+                      'max_seen_drawdown': excursion.max_seen_drawdown}
         trades_dict[str(trade.opened_at)] = trade_dict
 
     trades_dict = dict(sorted(trades_dict.items()))
@@ -81,3 +91,13 @@ def log_trades(stats: TradingStats):
 
     with open('./data/backtesting-data/trades_log.json', 'w', encoding='utf-8') as f:
         f.write(trades_json)
+
+
+def export_rolling_metrics(stats: TradingStats):
+    """
+    Writes the rolling metrics of the portfolio and of every traded coin to a csv file per pair
+    """
+    Path("data/backtesting-data/rolling-metrics").mkdir(parents=True, exist_ok=True)
+    for pair, rolling_frame in stats.rolling_metrics.items():
+        rolling_frame.to_csv("data/backtesting-data/rolling-metrics/%s.csv" % pair.replace("/", ""),
+                             index_label="time")
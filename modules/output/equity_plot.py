@@ -3,6 +3,7 @@ from pathlib import Path
 import pandas as pd
 
 from plotly import graph_objects as go
+from plotly.subplots import make_subplots
 
 def equity_plot(capital_dict):
     Path("data/backtesting-data/plots/equity").mkdir(parents=True, exist_ok=True)
@@ -23,3 +24,19 @@ def equity_plot(capital_dict):
     fig.add_trace(go.Scatter(x=dates, y=df[1], fill='tozeroy'))  # fill down to xaxis
     fig.update_yaxes(range=[min_value, max_value])
     fig.write_html("data/backtesting-data/plots/equity/equityplot.html", auto_open=False)
+
+
+def rolling_metrics_plot(rolling_frame: pd.DataFrame):
+    """
+    Plots every rolling metric (see modules.stats.metrics.rolling) in its own row, one line per window
+    """
+    Path("data/backtesting-data/plots/equity").mkdir(parents=True, exist_ok=True)
+    dates = [datetime.fromtimestamp(time / 1000) for time in rolling_frame.index]
+    metrics = list(dict.fromkeys(column.rsplit('_', 1)[0] for column in rolling_frame.columns))
+
+    fig = make_subplots(rows=len(metrics), cols=1, vertical_spacing=0.03, shared_xaxes=True, subplot_titles=metrics)
+    for row, metric in enumerate(metrics, start=1):
+        for column in rolling_frame.columns:
+            if column.rsplit('_', 1)[0] == metric:
+                fig.add_trace(go.Scatter(x=dates, y=rolling_frame[column], name=column), row=row, col=1)
+    fig.write_html("data/backtesting-data/plots/equity/rollingmetrics.html", auto_open=False)
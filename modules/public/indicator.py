@@ -0,0 +1,21 @@
+from typing import Callable, Optional
+
+from modules.algo.indicators.lazy_indicator import LazyIndicator
+
+
+def indicator(*depends_on: str, name: Optional[str] = None, cached: bool = False) -> Callable:
+    """
+    Registers a strategy method as a lazily computed indicator column.
+    The column (named after the method unless `name` is given) is only computed when it is read by
+    buy_signal, sell_signal, stoploss or configured as plot indicator.
+    :param depends_on: names of lazy indicator columns this indicator reads
+    :param name: column name, defaults to the method name
+    :param cached: reuse the computed column for a pair across backtest runs (e.g. hyperopt trials). Only set
+    this to True when the indicator (and everything it depends on) does not read hyperopt parameters, as cached
+    values are not recomputed when the parameters change.
+    """
+    def decorator(func) -> LazyIndicator:
+        # noinspection PyTypeChecker
+        return LazyIndicator(func, name or func.__name__, depends_on, cached)
+
+    return decorator
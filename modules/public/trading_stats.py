@@ -1,9 +1,13 @@
 from dataclasses import dataclass
 from datetime import timedelta, datetime
+from functools import cached_property
+from typing import Optional
 
 from pandas import DataFrame
 
 from modules.public.pairs_data import PairsData
+from modules.stats.drawdown.drawdown import DrawdownEpisodes
+from modules.stats.metrics.risk import RiskMetrics
 
 
 @dataclass
@@ -44,14 +48,79 @@ class MainResults:
     total_fee_amount: float
 
 
-@dataclass
+class LazyField:
+    """
+    Field of TradingStats that may be given as a zero-argument loader, which is evaluated on first access.
+    The loader is dropped as soon as it is evaluated (or the field is set), so that it no longer keeps the
+    module it is bound to alive.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        loaders = instance.__dict__['_loaders']
+        loader = loaders.pop(self.name, None)
+        if loader is not None:
+            instance.__dict__[self.name] = loader()
+        return instance.__dict__[self.name]
+
+    def __set__(self, instance, value):
+        instance.__dict__['_loaders'].pop(self.name, None)
+        instance.__dict__[self.name] = value
+
+
 class TradingStats:
-    main_results: MainResults
-    coin_results: list
-    open_trade_results: list
-    frame_with_signals: PairsData
-    buypoints: dict
-    sellpoints: dict
-    df: DataFrame
-    trades: list
-    capital_per_timestamp: dict
+    """
+    Results of a backtest. The raw ledgers (frame_with_signals, df, trades, capital_per_timestamp) are always
+    available. The derived results are tiered and can be passed as loaders (zero-argument callables), so that
+    e.g. a hyperopt loss function that only reads main_results never computes the coin results or plot data.
+    """
+    main_results: MainResults = LazyField()
+    coin_results: list = LazyField()
+    open_trade_results: list = LazyField()
+    buypoints: dict = LazyField()
+    sellpoints: dict = LazyField()
+    drawdown_episodes: Optional[DrawdownEpisodes] = LazyField()
+    calendar_performance: Optional[dict] = LazyField()
+    rolling_metrics: Optional[dict] = LazyField()
+    trade_excursions: Optional[DataFrame] = LazyField()
+
+    def __init__(self, main_results, coin_results, open_trade_results, frame_with_signals: PairsData,
+                 buypoints, sellpoints, df: DataFrame, trades: list, capital_per_timestamp: dict,
+                 drawdown_episodes=None, calendar_performance=None, rolling_metrics=None,
+                 trade_excursions=None):
+        self.__dict__['_loaders'] = {}
+        self.frame_with_signals = frame_with_signals
+        self.df = df
+        self.trades = trades
+        self.capital_per_timestamp = capital_per_timestamp
+        for name, value in [('main_results', main_results), ('coin_results', coin_results),
+                            ('open_trade_results', open_trade_results), ('buypoints', buypoints),
+                            ('sellpoints', sellpoints), ('drawdown_episodes', drawdown_episodes),
+                            ('calendar_performance', calendar_performance), ('rolling_metrics', rolling_metrics),
+                            ('trade_excursions', trade_excursions)]:
+            if callable(value):
+                self._loaders[name] = value
+            else:
+                setattr(self, name, value)
+
+    def is_loaded(self, name: str) -> bool:
+        return name not in self._loaders
+
+    def __getstate__(self):
+        # Loaders are bound to the stats module, resolve them before pickling (e.g. for plotting processes)
+        for name in list(self._loaders):
+            getattr(self, name)
+        state = self.__dict__.copy()
+        state.pop('risk_metrics', None)
+        return state
+
+    @cached_property
+    def risk_metrics(self) -> RiskMetrics:
+        """
+        Sharpe, Sortino, Calmar, profit factor, expectancy etc., computed on first access
+        """
+        return RiskMetrics.from_ledgers(self.capital_per_timestamp, self.trades)
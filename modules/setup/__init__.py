@@ -1,9 +1,9 @@
 from typing import Tuple
 
 from backtesting.strategy import Strategy
-from modules.algo import AlgoModule
+import modules.algo as algo
 from modules.setup.config import print_pairs, get_additional_pairs, ConfigModule
-from modules.setup.config.load_strategy import load_strategy_from_config
+from modules.setup.config.load_strategy import load_strategy_from_config, check_hyperopt_batch_size
 from modules.setup.datamodule import DataModule
 from modules.stats.stats_config import StatsConfig
 from modules.stats.get_stats_config import get_stats_config
@@ -16,11 +16,12 @@ class SetupModule(object):
         self.data_module = data_module
         self.config = config_module
 
-    async def setup(self) -> Tuple[AlgoModule, dict, Strategy, StatsConfig]:
+    async def setup(self) -> Tuple['algo.AlgoModule', dict, Strategy, StatsConfig]:
         print_pairs(self.config.raw_config)  # TODO fix mixed level of abstraction
         ohlcv_pair_frames = await self.data_module.load_historical_data(self.config.pairs)
 
         strategy = load_strategy_from_config(self.config.strategy_definition)
+        check_hyperopt_batch_size(strategy, self.config.hyperopt_batch_size)
 
         strategy.timeframe = self.config.timeframe
 
@@ -34,8 +35,8 @@ class SetupModule(object):
         stats_config = get_stats_config(self.config, await self.data_module.load_btc_marketchange(),
                                         await self.data_module.load_btc_drawdown(ohlcv_pair_frames))
 
-        return AlgoModule(self.config, ohlcv_pair_frames, strategy,
-                          additional_ohlcv_pair_frames), \
+        return algo.AlgoModule(self.config, ohlcv_pair_frames, strategy,
+                               additional_ohlcv_pair_frames), \
                ohlcv_pair_frames, \
                strategy, \
                stats_config
@@ -2,6 +2,7 @@
 # file, like validation and currency support
 
 # Libraries
+import copy
 import json
 import re
 import sys
@@ -34,6 +35,7 @@ class ConfigModule(object):
         self.currency_symbol = None
         self.starting_capital = None
         self.plots = None
+        self.export_rolling_metrics = False
         self.backtesting_from = None
         self.backtesting_to = None
         self.max_open_trades = None
@@ -42,6 +44,24 @@ class ConfigModule(object):
         self.fee = None
         self.strategy_definition = None
         self.exchange = None
+        self.hyperopt_workers = 1
+        self.hyperopt_batch_size = 1
+        self.hyperopt_engine_space = {}
+        self.hyperopt_folds = 1
+        self.hyperopt_fold_type = "walk-forward"
+        self.hyperopt_fold_purge = 0
+        self.hyperopt_fold_aggregation = "mean"
+        self.hyperopt_study = ""
+        self.hyperopt_storage = ""
+        self.hyperopt_worker = False
+        self.hyperopt_history = False
+        self.hyperopt_pruner = "none"
+        self.hyperopt_checkpoint = "month"
+        self.hyperopt_trials = 100
+        self.hyperopt_timeout = 0
+        self.hyperopt_sampler = "tpe"
+        self.hyperopt_seed = None
+        self.hyperopt_directions = ["minimize"]
 
     @staticmethod
     async def create(args):
@@ -73,10 +93,37 @@ class ConfigModule(object):
         config_module.stoploss_type = config["stoploss-type"]
         config_module.max_open_trades = config["max-open-trades"]
         config_module.plots = config["plots"]
+        config_module.export_rolling_metrics = config["export-rolling-metrics"]
         config_module.roi = config["roi"]
+        config_module.hyperopt_workers = config["hyperopt-workers"]
+        config_module.hyperopt_batch_size = config["hyperopt-batch-size"]
+        config_module.hyperopt_engine_space = config["hyperopt-engine-space"]
+        config_module.hyperopt_folds = config["hyperopt-folds"]
+        config_module.hyperopt_fold_type = config["hyperopt-fold-type"]
+        config_module.hyperopt_fold_purge = config["hyperopt-fold-purge"]
+        config_module.hyperopt_fold_aggregation = config["hyperopt-fold-aggregation"]
+        config_module.hyperopt_study = config["hyperopt-study"]
+        config_module.hyperopt_storage = config["hyperopt-storage"]
+        config_module.hyperopt_worker = config["hyperopt-worker"]
+        config_module.hyperopt_history = config["hyperopt-history"]
+        config_module.hyperopt_pruner = config["hyperopt-pruner"]
+        config_module.hyperopt_checkpoint = str(config["hyperopt-checkpoint"])
+        config_module.hyperopt_trials = config["hyperopt-trials"]
+        config_module.hyperopt_timeout = config["hyperopt-timeout"]
+        config_module.hyperopt_sampler = config["hyperopt-sampler"]
+        config_module.hyperopt_seed = config["hyperopt-seed"] if config["hyperopt-seed"] >= 0 else None
+        config_module.hyperopt_directions = config["hyperopt-directions"]
         config_module.currency_symbol = get_currency_symbol(config_module.raw_config)
         return config_module
 
+    def detached(self) -> 'ConfigModule':
+        """
+        :return: copy without the exchange connection, that can be pickled to worker processes
+        """
+        config_module = copy.copy(self)
+        config_module.exchange = None
+        return config_module
+
     async def close(self):
         await self.exchange.close()
 
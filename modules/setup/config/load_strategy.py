@@ -4,6 +4,7 @@ import sys
 
 # Files
 from backtesting.strategy import Strategy
+from modules.algo.hyperopt.batch import has_batch_signals_hook
 from modules.algo.hyperopt.hyperopt_strategy import inject_hyperopt_parameters
 from modules.setup.config import StrategyDefinition
 from cli.print_utils import print_error
@@ -52,3 +53,11 @@ def check_if_subclass_of_strategy(type_: type):
     if not issubclass(type_, Strategy):
         print_error("Your custom made strategy must be a subclass of Strategy.")
         raise SystemExit
+
+
+def check_hyperopt_batch_size(strategy: Strategy, hyperopt_batch_size: int):
+    if hyperopt_batch_size > 1 and not has_batch_signals_hook(strategy):
+        print_error(f"hyperopt-batch-size is set to {hyperopt_batch_size}, "
+                    f"but the strategy does not implement batch_signals.")
+        print_error("Override batch_signals in your strategy or set hyperopt-batch-size to 1.")
+        raise SystemExit
@@ -45,6 +45,87 @@ def numpy_rolling_window(data, window):
     return np.lib.stride_tricks.as_strided(data, shape=shape, strides=strides)
 
 
+def numpy_rolling_window_sums(data, window, block_size=1024):
+    """
+    O(n) sums of (value - reference) and (value - reference)^2 for every full window.
+    Cumulative sums restart every block (of at least 8 windows) relative to the block
+    mean, such that precision does not degrade on long series or high prices.
+    Windows containing NaN are NaN.
+    :return: sums, squared sums and the reference value of every window
+    """
+    values = np.asarray(data, dtype=np.float64)
+    length = len(values)
+    if length < window:
+        return np.empty(0), np.empty(0), np.empty(0)
+    block = max(8 * window, block_size)
+    n_blocks = -(-length // block)
+    nan_mask = np.isnan(values)
+    has_nan = nan_mask.any()
+
+    blocks = np.full(n_blocks * block, np.nan)
+    blocks[:length] = values
+    blocks = blocks.reshape(n_blocks, block)
+    references = np.nanmean(blocks, axis=1)
+    references[np.isnan(references)] = 0.
+
+    deviations = blocks - references[:, None]
+    deviations[np.isnan(deviations)] = 0.
+    squares = deviations * deviations
+    prefix = np.cumsum(deviations, axis=1).ravel()
+    prefix_sq = np.cumsum(squares, axis=1).ravel()
+    deviations = deviations.ravel()
+    squares = squares.ravel()
+
+    # inclusive sums of values[start:start + window] within a block, for every full window
+    n_windows = length - window + 1
+    sums = prefix[window - 1:length] - prefix[:n_windows] + deviations[:n_windows]
+    sums_sq = prefix_sq[window - 1:length] - prefix_sq[:n_windows] + squares[:n_windows]
+
+    # windows spanning two blocks: tail of the previous block plus head of the next block,
+    # the head is shifted to the reference of the previous block
+    if window > 1 and n_blocks > 1:
+        boundaries = np.arange(1, n_blocks) * block
+        cross = (boundaries[:, None] + np.arange(1 - window, 0)[None, :]).ravel()
+        cross = cross[cross < n_windows]
+        cross_blocks = cross // block
+        block_ends = (cross_blocks + 1) * block - 1
+        cross_ends = cross + window - 1
+        tail = prefix[block_ends] - prefix[cross] + deviations[cross]
+        tail_sq = prefix_sq[block_ends] - prefix_sq[cross] + squares[cross]
+        head = prefix[cross_ends]
+        head_length = cross_ends - block_ends
+        delta = references[cross_blocks + 1] - references[cross_blocks]
+        sums[cross] = tail + head + head_length * delta
+        sums_sq[cross] = tail_sq + prefix_sq[cross_ends] + 2 * delta * head + head_length * delta * delta
+
+    if has_nan:
+        nan_counts = np.concatenate(([0], np.cumsum(nan_mask)))
+        window_has_nan = (nan_counts[window:] - nan_counts[:n_windows]) > 0
+        sums[window_has_nan] = np.nan
+        sums_sq[window_has_nan] = np.nan
+
+    return sums, sums_sq, np.repeat(references, block)[:n_windows]
+
+
+def numpy_rolling_sum(data, window, min_periods=None):
+    """
+    O(n) rolling sum with the semantics of pandas' rolling sum: NaN values are skipped
+    and windows with less than `min_periods` valid values are NaN.
+    """
+    min_periods = window if min_periods is None else min_periods
+    values = np.asarray(data, dtype=np.float64)
+    valid = ~np.isnan(values)
+
+    sums = np.cumsum(np.where(valid, values, 0.))
+    result = sums.copy()
+    result[window:] -= sums[:-window]
+
+    counts = np.cumsum(valid)
+    counts[window:] -= counts[:-window].copy()
+    result[counts < min_periods] = np.nan
+    return result
+
+
 def numpy_rolling_series(func):
     def func_wrapper(data, window, as_source=False):
         series = data.values if isinstance(data, pd.Series) else data
@@ -63,12 +144,28 @@ def numpy_rolling_series(func):
 
 @numpy_rolling_series
 def numpy_rolling_mean(data, window):
-    return np.mean(numpy_rolling_window(data, window), axis=-1)
+    values = np.asarray(data, dtype=np.float64)
+    nan_mask = np.isnan(values)
+    reference = np.nanmean(values) if not nan_mask.all() else 0.
+
+    # cumulative sum of deviations from the series mean keeps the window sums precise
+    sums = np.cumsum(np.where(nan_mask, 0., values - reference))
+    means = sums[window - 1:].copy()
+    means[1:] -= sums[:-window]
+    means = reference + means / window
+
+    if nan_mask.any():
+        nan_counts = np.concatenate(([0], np.cumsum(nan_mask)))
+        means[(nan_counts[window:] - nan_counts[:-window]) > 0] = np.nan
+    return means
 
 
 @numpy_rolling_series
 def numpy_rolling_std(data, window):
-    return np.std(numpy_rolling_window(data, window), axis=-1, ddof=1)
+    sums, sums_sq, _ = numpy_rolling_window_sums(data, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        variance = (sums_sq - sums * sums / window) / (window - 1)
+    return np.sqrt(np.where(variance < 0, 0., variance))
 
 
 # ---------------------------------------------
@@ -197,11 +294,11 @@ def ibs(bars):
 # ---------------------------------------------
 
 def true_range(bars):
-    return pd.DataFrame({
-        "hl": bars['high'] - bars['low'],
-        "hc": abs(bars['high'] - bars['close'].shift(1)),
-        "lc": abs(bars['low'] - bars['close'].shift(1))
-    }).max(axis=1)
+    high = bars['high'].values
+    low = bars['low'].values
+    prev_close = np.concatenate(([np.nan], bars['close'].values[:-1]))
+    res = np.fmax.reduce([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+    return pd.Series(index=bars.index, data=res)
 
 
 # ---------------------------------------------
@@ -301,7 +398,7 @@ def rolling_weighted_mean(series, window=200, min_periods=None):
     try:
         return series.ewm(span=window, min_periods=min_periods).mean()
     except Exception as e:  # noqa: F841
-        return pd.ewma(series, span=window, min_periods=min_periods)
+        return pd.Series(series).ewm(span=window, min_periods=min_periods).mean()
 
 
 # ---------------------------------------------
@@ -356,14 +453,15 @@ def rolling_vwap(bars, window=200, min_periods=None):
     """
     min_periods = window if min_periods is None else min_periods
 
-    typical = ((bars['high'] + bars['low'] + bars['close']) / 3)
-    volume = bars['volume']
+    typical = ((bars['high'] + bars['low'] + bars['close']) / 3).values
+    volume = bars['volume'].values
 
-    left = (volume * typical).rolling(window=window,
-                                      min_periods=min_periods).sum()
-    right = volume.rolling(window=window, min_periods=min_periods).sum()
+    left = numpy_rolling_sum(volume * typical, window, min_periods)
+    right = numpy_rolling_sum(volume, window, min_periods)
 
-    return pd.Series(index=bars.index, data=(left / right)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        res = left / right
+    return pd.Series(index=bars.index, data=res
                      ).replace([np.inf, -np.inf], float('NaN')).ffill()
 
 
@@ -589,8 +687,12 @@ def zlhma(series, window, min_periods=None):
 
 def zscore(bars, window=20, stds=1, col='close'):
     """ get zscore of price """
-    std = numpy_rolling_std(bars[col], window)
-    mean = numpy_rolling_mean(bars[col], window)
+    sums, sums_sq, references = numpy_rolling_window_sums(bars[col].values, window)
+    variance = (sums_sq - sums * sums / window) / (window - 1)
+    std = nans(len(bars))
+    std[window - 1:] = np.sqrt(np.where(variance < 0, 0., variance))
+    mean = nans(len(bars))
+    mean[window - 1:] = references + sums / window
     return (bars[col] - mean) / (std * stds)
 
 # ---------------------------------------------
@@ -604,7 +706,7 @@ def pvt(bars):
 
 
 def chopiness(bars, window=14):
-    atrsum = true_range(bars).rolling(window).sum()
+    atrsum = numpy_rolling_sum(true_range(bars).values, window)
     highs = bars['high'].rolling(window).max()
     lows = bars['low'].rolling(window).min()
     return 100 * np.log10(atrsum / (highs - lows)) / np.log10(window)
@@ -13,7 +13,7 @@ from pandas import DataFrame
 from cli.print_utils import print_info, print_error, print_warning
 # Files
 from modules.setup.config import ConfigModule
-from modules.stats.drawdown.drawdown import get_max_drawdown_ratio
+from modules.stats.drawdown.drawdown import get_drawdown_episodes
 from utils.utils import get_ohlcv_indicators, parse_timeframe
 
 # ======================================================================
@@ -63,10 +63,8 @@ class DataModule:
             bitcoin_df = df.get('BTC/USDT')
         else:
             pair, bitcoin_df = await self.get_pair_data('BTC/USDT', self.config.timeframe)
-        bitcoin_values = bitcoin_df[['close']].rename(columns={'close': 'value'})
-
-        bitcoin_drawdown = get_max_drawdown_ratio(bitcoin_values)
-        return bitcoin_drawdown
+        bitcoin_drawdown = get_drawdown_episodes(bitcoin_df['close'].to_numpy(), bitcoin_df.index.to_numpy())
+        return bitcoin_drawdown.max_drawdown_ratio
 
     async def load_historical_data(self, pairs, check_backtesting_period=True) -> dict:
         dataframes = await asyncio.gather(*[self.get_pair_data(pair, self.config.timeframe) if not isinstance(pair, tuple)
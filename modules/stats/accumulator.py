@@ -0,0 +1,178 @@
+# Libraries
+import abc
+from collections import defaultdict
+from datetime import timedelta
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Files
+from modules.stats.metrics.calendar import local_utc_offset_ms, week_id
+from modules.stats.trade import Trade
+
+# ======================================================================
+# StatsAccumulator is updated by the TradingModule while ticks pass, so
+# that the portfolio and per-coin results are available without rebuilding
+# dataframes after the backtest.
+#
+# © 2021 DemaTrading.ai
+# ======================================================================
+
+
+class TimestampedSeries(abc.ABC):
+    """
+    Base for online metrics over a {timestamp: value} series that is written several times per timestamp
+    (once per pair). Only the last value written for a timestamp is committed, like the dict it mirrors.
+    """
+
+    def __init__(self):
+        self.pending_time = None
+        self.pending_value = None
+
+    def observe(self, time: int, value: float) -> None:
+        if self.pending_time is not None and time != self.pending_time:
+            self.commit(self.pending_time, self.pending_value)
+        self.pending_time = time
+        self.pending_value = value
+
+    def flush(self) -> None:
+        if self.pending_time is not None:
+            self.commit(self.pending_time, self.pending_value)
+            self.pending_time = self.pending_value = None
+
+    @abc.abstractmethod
+    def commit(self, time: int, value: float) -> None:
+        """
+        Processes the last value written for a timestamp, timestamps are committed in increasing order
+        """
+
+
+class WeeklyBuckets(TimestampedSeries):
+    """
+    Keeps the first and last value per week. Weeks are the integer week ids of modules.stats.metrics.calendar,
+    which end on sunday like pandas' resample('W').
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.utc_offset_ms = None
+        self.buckets = {}
+
+    def commit(self, time: int, value: float) -> None:
+        if time == 0:  # starting capital, not part of any week
+            return
+        if self.utc_offset_ms is None:
+            self.utc_offset_ms = local_utc_offset_ms(time)
+        week = week_id(time, self.utc_offset_ms)
+        bucket = self.buckets.get(week)
+        if bucket is None:
+            self.buckets[week] = [value, value]
+        else:
+            bucket[1] = value
+
+    def weekly_ratios(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :return: consecutive week ids and the close / open ratio per week, NaN for weeks without values
+        """
+        self.flush()
+        if not self.buckets:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float64)
+        weeks = np.fromiter(self.buckets.keys(), dtype=np.int64, count=len(self.buckets))
+        ratios = np.array([close / open_ for open_, close in self.buckets.values()])
+        ids = np.arange(weeks.min(), weeks.max() + 1)
+        weekly = np.full(len(ids), np.nan)
+        weekly[weeks - ids[0]] = ratios
+        return ids, weekly
+
+
+class TradeCounters:
+    """
+    Counters over closed trades, in order of closing.
+    """
+
+    def __init__(self):
+        self.n_trades = 0
+        self.n_losing_trades = 0
+        self.n_consecutive_losing_trades = 0
+        self.max_consecutive_losing_trades = 0
+        self.best_trade_ratio = -np.inf
+        self.best_trade_pair = ""
+        self.worst_trade_ratio = np.inf
+        self.worst_trade_pair = ""
+        self.total_duration = timedelta(0)
+        self.longest_duration: Optional[timedelta] = None
+        self.shortest_duration: Optional[timedelta] = None
+
+    def add(self, trade: Trade) -> None:
+        self.n_trades += 1
+        if trade.profit_ratio <= 1:
+            self.n_losing_trades += 1
+            self.n_consecutive_losing_trades += 1
+            self.max_consecutive_losing_trades = max(self.max_consecutive_losing_trades,
+                                                     self.n_consecutive_losing_trades)
+        else:
+            self.n_consecutive_losing_trades = 0
+
+        if trade.profit_ratio > self.best_trade_ratio:
+            self.best_trade_ratio = trade.profit_ratio
+            self.best_trade_pair = trade.pair
+        if trade.profit_ratio < self.worst_trade_ratio:
+            self.worst_trade_ratio = trade.profit_ratio
+            self.worst_trade_pair = trade.pair
+
+        duration = trade.closed_at - trade.opened_at
+        self.total_duration += duration
+        if self.longest_duration is None or duration > self.longest_duration:
+            self.longest_duration = duration
+        if self.shortest_duration is None or duration < self.shortest_duration:
+            self.shortest_duration = duration
+
+    def trade_durations(self) -> tuple:
+        """
+        :return: average, longest and shortest trade duration
+        """
+        if self.n_trades == 0:
+            return timedelta(0), timedelta(0), timedelta(0)
+        return self.total_duration / self.n_trades, self.longest_duration, self.shortest_duration
+
+
+class PairCounters(TradeCounters):
+    """
+    Trade counters of a single pair, including its cumulative profit ratios and sell reasons.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.cum_profit_prct = 0
+        self.total_profit_ratio = 1.0
+        self.total_profit_amount = 0.0
+        self.sell_reasons = defaultdict(int)
+
+    def add(self, trade: Trade) -> None:
+        super().add(trade)
+        self.cum_profit_prct += (trade.profit_ratio - 1) * 100
+        self.total_profit_ratio *= trade.profit_ratio
+        self.total_profit_amount += trade.profit_dollar
+        self.sell_reasons[trade.sell_reason] += 1
+
+
+class StatsAccumulator:
+    """
+    Online statistics of a backtest. The TradingModule reports capital and closed trades while ticking, after
+    which the results are read in O(1) (weekly results in O(weeks)). Drawdowns are not tracked here, they
+    come from the drawdown episodes of modules.stats.drawdown.
+    """
+
+    def __init__(self, starting_capital: float):
+        self.weekly_capital = WeeklyBuckets()
+        self.trades = TradeCounters()
+        self.pairs = defaultdict(PairCounters)
+
+        self.on_capital(0, starting_capital)
+
+    def on_capital(self, time: int, capital: float) -> None:
+        self.weekly_capital.observe(time, capital)
+
+    def on_trade_closed(self, trade: Trade) -> None:
+        self.trades.add(trade)
+        self.pairs[trade.pair].add(trade)
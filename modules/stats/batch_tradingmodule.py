@@ -0,0 +1,153 @@
+from typing import Dict
+
+import numpy as np
+
+from modules.stats.tradingmodule_config import TradingModuleConfig
+
+DAY_SECONDS = 24 * 60 * 60
+
+
+class BatchResults:
+    """
+    Capital over time of K candidate parameter sets that were simulated together
+    """
+
+    def __init__(self, times: np.ndarray, capital: np.ndarray, n_trades: np.ndarray, starting_capital: float):
+        """
+        :param times: (time,) timestamps in ms
+        :param capital: (time x K) capital including open trades after every tick
+        :param n_trades: (K,) number of opened trades
+        """
+        self.times = times
+        self.capital = capital
+        self.n_trades = n_trades
+        self.starting_capital = starting_capital
+
+    def __len__(self) -> int:
+        return self.capital.shape[1]
+
+    @property
+    def end_capital(self) -> np.ndarray:
+        return self.capital[-1] if len(self.times) else np.full(len(self), self.starting_capital)
+
+    @property
+    def profit_ratio(self) -> np.ndarray:
+        return self.end_capital / self.starting_capital - 1
+
+    @property
+    def max_drawdown_ratio(self) -> np.ndarray:
+        """
+        :return: (K,) lowest capital relative to the highest capital before it, 1 without drawdown
+        """
+        if not len(self.times):
+            return np.ones(len(self))
+        peaks = np.fmax.accumulate(np.vstack([np.full(len(self), self.starting_capital), self.capital]))[1:]
+        return np.nanmin(np.minimum(self.capital / peaks, 1.), axis=0)
+
+
+class BatchTradingModule:
+    """
+    Counterpart of TradingModule that simulates K sets of buy and sell signals in one pass over the candles.
+    State that TradingModule keeps per trade (budget, open trades, realised profit) is kept as arrays over the
+    K candidates, and every tick applies the same arithmetic to all of them. Only the candidates are vectorized:
+    the simulation still loops in Python over every tick and every pair, because pairs are ticked in order, like
+    TradingModule, so trades compete for budget and max_open_trades in the same way. A batch costs about one
+    regular backtest, whatever K is.
+    Only the standard stoploss is supported, trailing and dynamic stoplosses depend on each trade's path.
+    """
+
+    def __init__(self, config: TradingModuleConfig):
+        if config.stoploss_type != "standard":
+            raise ValueError(f"Batched backtests only support the standard stoploss, not {config.stoploss_type}")
+        self.starting_capital = float(config.starting_capital)
+        self.fee = config.fee / 100
+        self.max_open_trades = int(config.max_open_trades)
+        self.spend_ratio = 1. / min(self.max_open_trades, len(config.pairs))
+        self.sl_ratio = 1 - (abs(float(config.stoploss)) / 100)
+        roi = sorted(config.roi.items(), key=lambda item: int(item[0]))
+        self.roi_default = config.roi['0']
+        self.roi_minutes = np.array([int(minutes) for minutes, _ in roi])
+        self.roi_percentages = np.array([value for _, value in roi], dtype=np.float64)
+
+    def get_roi_over_time(self, passed_ms: np.ndarray) -> np.ndarray:
+        # Like TradingModule, which reads timedelta.seconds, the minutes restart every day
+        passed_minutes = (passed_ms // 1000 % DAY_SECONDS) / 60
+        positions = np.searchsorted(self.roi_minutes, passed_minutes, side='right') - 1
+        return np.where(positions >= 0, self.roi_percentages[np.maximum(positions, 0)], self.roi_default)
+
+    def simulate(self, times: np.ndarray, candles: Dict[str, Dict[str, np.ndarray]],
+                 buy: Dict[str, np.ndarray], sell: Dict[str, np.ndarray]) -> BatchResults:
+        """
+        :param times: (time,) timestamps in ms, shared by all pairs
+        :param candles: open, high, low and close (time,) arrays per pair
+        :param buy: (time x K) buy signals per pair
+        :param sell: (time x K) sell signals per pair
+        """
+        pairs = list(candles)
+        n_times = len(times)
+        n_candidates = next(iter(buy.values())).shape[1] if buy else 0
+        shape = (len(pairs), n_candidates)
+
+        is_open = np.zeros(shape, dtype=bool)
+        amounts = np.zeros(shape)
+        starting_amounts = np.zeros(shape)
+        open_prices = np.ones(shape)
+        opened_at = np.zeros(shape, dtype=np.int64)
+        budget = np.full(n_candidates, self.starting_capital)
+        realised_profit = np.full(n_candidates, self.starting_capital)
+        n_open = np.zeros(n_candidates, dtype=np.int64)
+        n_trades = np.zeros(n_candidates, dtype=np.int64)
+        capital = np.empty((n_times, n_candidates))
+
+        closes = np.vstack([candles[pair]['close'] for pair in pairs]) if pairs else np.empty((0, n_times))
+        for t in range(n_times):
+            time = times[t]
+            for p, pair in enumerate(pairs):
+                pair_candles = candles[pair]
+                was_open = is_open[p].copy()
+                if was_open.any():
+                    closing, closed_capital = self.tick_open_trades(
+                        was_open, pair_candles['low'][t], pair_candles['high'][t], pair_candles['close'][t],
+                        sell[pair][t], time, amounts[p], starting_amounts[p], open_prices[p], opened_at[p])
+                    budget += np.where(closing, closed_capital, 0.)
+                    realised_profit += np.where(closing, closed_capital - starting_amounts[p], 0.)
+                    is_open[p] &= ~closing
+                    n_open -= closing
+
+                buying = ~was_open & (buy[pair][t] == 1) & (budget > 0) & (n_open < self.max_open_trades)
+                if buying.any():
+                    close = pair_candles['close'][t]
+                    spend_amount = np.minimum(self.spend_ratio * realised_profit, budget)
+                    amounts[p] = np.where(buying, (spend_amount - spend_amount * self.fee) / close, amounts[p])
+                    starting_amounts[p] = np.where(buying, spend_amount, starting_amounts[p])
+                    open_prices[p] = np.where(buying, close, open_prices[p])
+                    opened_at[p] = np.where(buying, time, opened_at[p])
+                    budget -= np.where(buying, spend_amount, 0.)
+                    is_open[p] |= buying
+                    n_open += buying
+                    n_trades += buying
+
+            open_capital = np.where(is_open, amounts * closes[:, t, None], 0.)
+            capital[t] = budget + open_capital.sum(axis=0)
+        return BatchResults(np.asarray(times), capital, n_trades, self.starting_capital)
+
+    def tick_open_trades(self, is_open: np.ndarray, low: float, high: float, close: float, sell: np.ndarray,
+                         time: int, amounts: np.ndarray, starting_amounts: np.ndarray, open_prices: np.ndarray,
+                         opened_at: np.ndarray) -> tuple:
+        """
+        :return: (K,) mask of the trades that close on this candle and their capital after the sell fee
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            stoploss_reached = is_open & ((low * amounts) / starting_amounts <= self.sl_ratio)
+            roi_percentages = self.get_roi_over_time(time - opened_at)
+            roi_reached = is_open & (((high / open_prices) - 1.) * 100 > roi_percentages)
+            sell_signal = is_open & (sell == 1) & ~stoploss_reached & ~roi_reached
+
+            current = np.select([stoploss_reached & ~roi_reached, roi_reached, sell_signal],
+                                [(self.sl_ratio * starting_amounts) / amounts,
+                                 open_prices * (1 + (roi_percentages / 100)), close], default=close)
+        trade_capital = amounts * current
+        closed_capital = trade_capital - trade_capital * self.fee
+        # Trades where both stoploss and ROI triggered are reset to their starting amount
+        closed_capital = np.where(stoploss_reached & roi_reached, starting_amounts, closed_capital)
+        return stoploss_reached | roi_reached | sell_signal, closed_capital
@@ -1,14 +1,123 @@
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
 import pandas as pd
 
 
-def get_max_drawdown_ratio(df: pd.DataFrame):
+@dataclass(frozen=True)
+class DrawdownEpisode:
+    peak: int
+    trough: int
+    recovery: Optional[int]  # None when the series did not recover
+    depth: float  # ratio trough / peak
+    duration: float  # from peak until recovery (or the end of the series), in units of the index
+
+
+class DrawdownEpisodes:
     """
-    @param df: with column["value"]
+    Every drawdown episode of an equity series, computed in a single vectorized pass. An episode starts at
+    a running peak, reaches its deepest point at the trough and ends when the peak is reached again.
+    Positions are translated to labels of `index` (e.g. timestamps), or are row numbers when no index is given.
+    NaN values are forward filled.
     """
-    df["drawdown_ratio"] = df["value"] / df["value"].cummax()
-    return df["drawdown_ratio"].min()
 
+    def __init__(self, values, index=None):
+        values = pd.Series(np.asarray(values, dtype=np.float64)).ffill().to_numpy()
+        self.values = values
+        self.index = np.arange(len(values)) if index is None else np.asarray(index)
+        self.running_peak = np.fmax.accumulate(values) if len(values) else values
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.ratios = values / self.running_peak
+
+        # Position where the running peak was first reached
+        n_rows = len(values)
+        rows = np.arange(n_rows)
+        previous_peak = np.concatenate([[-np.inf], self.running_peak[:-1]]) if n_rows else values
+        previous_peak[np.isnan(previous_peak)] = -np.inf
+        new_high = values > previous_peak
+        peak_positions = np.maximum.accumulate(np.where(new_high, rows, 0)) if n_rows else rows
+
+        # Episodes are runs of rows under water
+        under_water = self.ratios < 1
+        edges = np.diff(np.concatenate([[0], under_water.astype(np.int8), [0]]))
+        self.starts = np.flatnonzero(edges == 1)
+        self.ends = np.flatnonzero(edges == -1)  # exclusive, the recovery row
+        self.n_rows = n_rows
+        self.rows_under_water = int(under_water.sum())
+
+        if len(self.starts):
+            self.depths = np.minimum.reduceat(np.where(under_water, self.ratios, np.inf), self.starts)
+            episode_ids = np.cumsum(edges[:-1] == 1) - 1
+            at_trough = under_water & (self.ratios == self.depths[np.maximum(episode_ids, 0)])
+            _, first_rows = np.unique(episode_ids[at_trough], return_index=True)
+            self.troughs = rows[at_trough][first_rows]
+        else:
+            self.depths = np.array([], dtype=np.float64)
+            self.troughs = np.array([], dtype=np.int64)
+        self.peaks = peak_positions[self.starts]
+        self.recovered = self.ends < n_rows
+        self.durations = self.index[np.where(self.recovered, self.ends, n_rows - 1)] - self.index[self.peaks]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def max_drawdown_ratio(self) -> float:
+        if len(self):
+            return float(self.depths.min())
+        return 1.0 if np.any(~np.isnan(self.values)) else np.nan
+
+    def max_drawdown(self) -> dict:
+        """
+        :return: deepest drawdown ratio, with the labels of its peak ('from'), trough ('at') and
+        recovery ('to', 0 when not recovered)
+        """
+        if not len(self):
+            first_valid = self.index[np.argmax(~np.isnan(self.values))] if self.n_rows else 0
+            return {"drawdown": self.max_drawdown_ratio, "from": first_valid, "at": first_valid, "to": first_valid}
+        deepest = self.episode(int(np.argmin(self.depths)))
+        return {"drawdown": deepest.depth, "from": deepest.peak, "at": deepest.trough,
+                "to": deepest.recovery if deepest.recovery is not None else 0}
+
+    def episode(self, i: int) -> DrawdownEpisode:
+        return DrawdownEpisode(peak=self.index[self.peaks[i]],
+                               trough=self.index[self.troughs[i]],
+                               recovery=self.index[self.ends[i]] if self.recovered[i] else None,
+                               depth=float(self.depths[i]),
+                               duration=self.durations[i])
 
-def get_max_drawdown_ratio_series(series: pd.Series):
-    series = series / series.cummax()
-    return series.min()
+    @property
+    def episodes(self) -> List[DrawdownEpisode]:
+        return [self.episode(i) for i in range(len(self))]
+
+    def top(self, n: int) -> List[DrawdownEpisode]:
+        """
+        :return: the n deepest episodes, deepest first
+        """
+        return [self.episode(i) for i in np.argsort(self.depths, kind="stable")[:n]]
+
+    @property
+    def time_under_water(self) -> float:
+        """
+        :return: summed duration of all episodes, in units of the index
+        """
+        return self.durations.sum() if len(self) else 0
+
+    @property
+    def under_water_ratio(self) -> float:
+        """
+        :return: fraction of the rows that are below the running peak
+        """
+        return self.rows_under_water / self.n_rows if self.n_rows else 0.
+
+
+def get_drawdown_episodes(values, index=None) -> DrawdownEpisodes:
+    return DrawdownEpisodes(values, index)
+
+
+def get_max_drawdown_ratio(df: pd.DataFrame):
+    """
+    @param df: with column["value"]
+    """
+    return get_drawdown_episodes(df["value"].to_numpy()).max_drawdown_ratio
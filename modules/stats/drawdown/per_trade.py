@@ -1,38 +1,76 @@
+import numpy as np
 import pandas as pd
 
-from modules.stats.drawdown.drawdown import get_max_drawdown_ratio
-from modules.stats.trade import Trade
+from modules.stats.metrics.range_query import SparseTable, DrawdownTable
+from modules.stats.trade import Trade, SellReason
 
 
-def get_max_seen_drawdown_per_trade(signal_dict, trade: Trade, fee_percentage: float):
+class TradeExcursions:
+    """
+    Range queries over the candles of one pair, built once per pair and shared by all of its trades:
+    lowest low and highest high for the max adverse / favourable excursion (MAE / MFE), and the max
+    drawdown of the close for the intra-trade drawdown.
+    """
 
-    values = signal_dict.values()
-    df = pd.DataFrame(values).set_index("time")
+    def __init__(self, pair_frame: pd.DataFrame):
+        """
+        @param pair_frame: time-indexed frame of the pair (see PairFrames), is not modified
+        """
+        self.times = pair_frame.index.to_numpy()
+        self.close = pair_frame["close"].to_numpy(dtype=np.float64)
+        self.lows = SparseTable(pair_frame["low"].to_numpy(), np.minimum)
+        self.highs = SparseTable(pair_frame["high"].to_numpy(), np.maximum)
+        self.closes = SparseTable(self.close, np.minimum)
+        self.close_drawdowns = DrawdownTable(self.close)
 
-    # Copy first row to zero index to save asset value before applying fees
-    df = with_copied_initial_row(df)
+    def trade_rows(self, trades: [Trade]) -> tuple:
+        """
+        @return: row of the candle each trade opened at and of the candle it closed at (the last candle for
+        trades that are still open)
+        """
+        opened = np.array([int(trade.opened_at.timestamp() * 1000) for trade in trades], dtype=np.int64)
+        closed = np.array([int(trade.closed_at.timestamp() * 1000) if trade.closed_at is not None
+                           else self.times[-1] for trade in trades], dtype=np.int64)
+        open_rows = np.minimum(np.searchsorted(self.times, opened), len(self.times) - 1)
+        close_rows = np.maximum(np.minimum(np.searchsorted(self.times, closed), len(self.times) - 1), open_rows)
+        return open_rows, close_rows
 
-    opened_at_timestamp = int(trade.opened_at.timestamp() * 1000)
+    def get_excursions(self, trades: [Trade], fee_percentage: float) -> dict:
+        """
+        MAE and MFE are the lowest low and highest high of the candles after the opening candle, relative to
+        the open price. The max seen drawdown follows the close of the pair from the stake before the buy fee,
+        like the seen drawdowns of coins and the portfolio.
+        @return: arrays of mae, mfe and max_seen_drawdown ratios, in the order of trades
+        """
+        if not trades or len(self.times) == 0:
+            return {"mae": np.ones(len(trades)), "mfe": np.ones(len(trades)),
+                    "max_seen_drawdown": np.ones(len(trades))}
+        open_rows, close_rows = self.trade_rows(trades)
+        open_prices = self.close[open_rows]
 
-    apply_profit_ratio(df, opened_at_timestamp)
-    add_trade_fee(df, fee_percentage, opened_at_timestamp)
+        # Candles after the opening candle, trades that closed on their opening candle have no excursion
+        moved = close_rows > open_rows
+        starts = np.minimum(open_rows + 1, close_rows)
+        mae = np.where(moved, self.lows.query(starts, close_rows) / open_prices, 1.)
+        mfe = np.where(moved, self.highs.query(starts, close_rows) / open_prices, 1.)
 
-    df["value"] = df["profit_ratio"].cumprod()
+        # Drawdown within the trade, or from the stake to the lowest close after paying the buy fee
+        fee_ratio = 1 - fee_percentage / 100
+        max_seen_drawdown = np.minimum(self.close_drawdowns.query(open_rows, close_rows),
+                                       fee_ratio * self.closes.query(open_rows, close_rows) / open_prices)
+        return {"mae": mae, "mfe": mfe, "max_seen_drawdown": max_seen_drawdown}
 
-    return get_max_drawdown_ratio(df)
 
-
-def with_copied_initial_row(df) -> pd.DataFrame:
-    head = df.head(1).copy()
-    head.rename(index=lambda s: 0, inplace=True)
-    return pd.concat([head, df])
-
-
-def apply_profit_ratio(df, open_timestamp):
-    df.loc[open_timestamp:, "profit_ratio"] = (df["close"] / df["close"].shift(1))
-    df["profit_ratio"] = df["profit_ratio"].fillna(1)
-
-
-def add_trade_fee(df, fee_percentage, open):
-    fee_ratio = 1 - fee_percentage / 100
-    df.loc[open, "profit_ratio"] *= fee_ratio
+def apply_trade_excursions(pair_frame: pd.DataFrame, trades: [Trade], fee_percentage: float) -> None:
+    """
+    Stores mae_ratio, mfe_ratio and max_seen_drawdown on every trade of the pair
+    @param pair_frame: time-indexed frame of the pair (see PairFrames), is not modified
+    """
+    excursions = TradeExcursions(pair_frame).get_excursions(trades, fee_percentage)
+    for trade, mae, mfe, max_seen_drawdown in zip(trades, excursions["mae"], excursions["mfe"],
+                                                  excursions["max_seen_drawdown"]):
+        trade.mae_ratio = float(mae)
+        trade.mfe_ratio = float(mfe)
+        # Trades where both stoploss and ROI triggered had no impact on the results
+        if trade.sell_reason != SellReason.STOPLOSS_AND_ROI:
+            trade.max_seen_drawdown = float(max_seen_drawdown)
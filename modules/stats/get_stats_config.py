@@ -16,5 +16,6 @@ def get_stats_config(config: ConfigModule, btc_marketchange_ratio: float, btc_dr
         starting_capital=config.starting_capital,
         currency_symbol=config.currency_symbol,
         mainplot_indicators=config.mainplot_indicators,
-        subplot_indicators=config.subplot_indicators
+        subplot_indicators=config.subplot_indicators,
+        export_rolling_metrics=config.export_rolling_metrics
     )
\ No newline at end of file
@@ -0,0 +1,183 @@
+from datetime import datetime
+from typing import Tuple
+
+import numpy as np
+from pandas import DataFrame
+
+DAY_MS = 24 * 60 * 60 * 1000
+PERIODS = ('D', 'W', 'M')
+
+
+def local_utc_offset_ms(time_ms: int) -> int:
+    """
+    Offset of the local timezone at the given time. Calendar buckets use local days, like
+    datetime.fromtimestamp, but with a single offset (changes of daylight saving time are ignored).
+    """
+    offset = datetime.fromtimestamp(time_ms / 1000).astimezone().utcoffset()
+    return int(offset.total_seconds() * 1000) if offset is not None else 0
+
+
+def week_id(time_ms: int, utc_offset_ms: int) -> int:
+    """
+    Scalar counterpart of bucket_ids(..., 'W'), for use while ticking
+    """
+    return ((time_ms + utc_offset_ms) // DAY_MS + 3) // 7
+
+
+def bucket_ids(times_ms: np.ndarray, period: str, utc_offset_ms: int) -> np.ndarray:
+    """
+    Integer id of the calendar bucket of every timestamp, using integer arithmetic only.
+    Days are counted from 1970-01-01, weeks start on monday (1970-01-01 is a thursday) and months are
+    counted from 1970-01.
+    """
+    days = (np.asarray(times_ms, dtype=np.int64) + utc_offset_ms) // DAY_MS
+    if period == 'D':
+        return days
+    if period == 'W':
+        return (days + 3) // 7
+    if period == 'M':
+        return days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    raise ValueError(f"Unknown calendar period '{period}', expected one of {PERIODS}")
+
+
+def bucket_labels(ids: np.ndarray, period: str) -> np.ndarray:
+    """
+    :return: last day of every bucket, like the labels of pandas' resample (weeks end on sunday)
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    if period == 'D':
+        return ids.astype('datetime64[D]')
+    if period == 'W':
+        return (ids * 7 + 3).astype('datetime64[D]')
+    if period == 'M':
+        return (ids + 1).astype('datetime64[M]').astype('datetime64[D]') - np.timedelta64(1, 'D')
+    raise ValueError(f"Unknown calendar period '{period}', expected one of {PERIODS}")
+
+
+class CalendarIndex:
+    """
+    Maps a sorted time grid onto consecutive calendar buckets (days, weeks or months). It is computed once per
+    time grid and period, after which any number of series on that grid are aggregated per bucket with
+    numpy reductions. Buckets without rows (gaps in the data) are included and yield NaN.
+    """
+
+    def __init__(self, times_ms: np.ndarray, period: str = 'W', utc_offset_ms: int = None):
+        times_ms = np.asarray(times_ms, dtype=np.int64)
+        if utc_offset_ms is None:
+            utc_offset_ms = local_utc_offset_ms(int(times_ms[0])) if len(times_ms) else 0
+        self.period = period
+        self.utc_offset_ms = utc_offset_ms
+        self.n_rows = len(times_ms)
+
+        row_ids = bucket_ids(times_ms, period, utc_offset_ms)
+        self.starts = np.flatnonzero(np.diff(row_ids, prepend=row_ids[:1] - 1) != 0) if self.n_rows \
+            else np.array([], dtype=np.int64)
+        self.ends = np.append(self.starts[1:], self.n_rows)
+        present_ids = row_ids[self.starts]
+        self.ids = np.arange(present_ids[0], present_ids[-1] + 1) if len(present_ids) \
+            else np.array([], dtype=np.int64)
+        self.slots = present_ids - self.ids[0] if len(present_ids) else present_ids
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def labels(self) -> np.ndarray:
+        return bucket_labels(self.ids, self.period)
+
+    def scatter(self, per_present_bucket: np.ndarray) -> np.ndarray:
+        """
+        Places values of the non-empty buckets into the full bucket range, NaN for empty buckets
+        """
+        result = np.full((len(self),) + per_present_bucket.shape[1:], np.nan)
+        result[self.slots] = per_present_bucket
+        return result
+
+    def first_last_ratio(self, values: np.ndarray) -> np.ndarray:
+        """
+        Last valid value / first valid value per bucket, i.e. the close / open of pandas' resample().ohlc()
+        :param values: (time,) or (time x n) array on the time grid, NaN values are skipped
+        :return: (bucket,) or (bucket x n) array
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if len(self) == 0:
+            return np.full((0,) + values.shape[1:], np.nan)
+        rows = np.arange(self.n_rows).reshape((-1,) + (1,) * (values.ndim - 1))
+        valid = ~np.isnan(values)
+        last_valid = np.maximum.accumulate(np.where(valid, rows, -1), axis=0)
+        next_valid = np.minimum.accumulate(np.where(valid, rows, self.n_rows)[::-1], axis=0)[::-1]
+
+        first_rows = next_valid[self.starts]
+        last_rows = last_valid[self.ends - 1]
+        has_values = first_rows < self.ends.reshape((-1,) + (1,) * (values.ndim - 1))
+        first = np.take_along_axis(values, np.minimum(first_rows, self.n_rows - 1), axis=0)
+        last = np.take_along_axis(values, np.maximum(last_rows, 0), axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratios = np.where(has_values, last / first, np.nan)
+        return self.scatter(ratios)
+
+    def product(self, ratios: np.ndarray) -> np.ndarray:
+        """
+        Product of the ratios per bucket, NaN ratios count as 1
+        :param ratios: (time,) or (time x n) array on the time grid
+        """
+        ratios = np.asarray(ratios, dtype=np.float64)
+        if len(self) == 0:
+            return np.full((0,) + ratios.shape[1:], np.nan)
+        ratios = np.where(np.isnan(ratios), 1., ratios)
+        return self.scatter(np.multiply.reduceat(ratios, self.starts, axis=0))
+
+    def lookup(self, ids: np.ndarray, per_bucket: np.ndarray) -> np.ndarray:
+        """
+        :param ids: bucket ids, e.g. of another series of the same period
+        :param per_bucket: (bucket,) array of values on the buckets of this index
+        :return: the value for every given id, NaN for ids outside this index
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        result = np.full(len(ids), np.nan)
+        if len(self) == 0:
+            return result
+        positions = ids - self.ids[0]
+        inside = (positions >= 0) & (positions < len(self))
+        result[inside] = np.asarray(per_bucket)[positions[inside]]
+        return result
+
+    def bucket_span(self, per_bucket: np.ndarray) -> slice:
+        """
+        :return: slice from the first until the last bucket with a valid value, e.g. the period a pair was listed
+        """
+        valid = np.flatnonzero(~np.isnan(per_bucket))
+        return slice(valid[0], valid[-1] + 1) if len(valid) else slice(0, 0)
+
+
+def nanmean_columns(values: np.ndarray) -> np.ndarray:
+    """
+    :return: mean per row of a (bucket x n) array skipping NaN values, NaN for rows without values
+    """
+    valid = ~np.isnan(values)
+    counts = valid.sum(axis=1)
+    totals = np.where(valid, values, 0.).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(counts > 0, totals / counts, np.nan)
+
+
+def count_results(profit_ratios: np.ndarray, market_changes: np.ndarray) -> Tuple[int, int, int]:
+    """
+    A bucket is won when the profit ratio beats the market change, lost when it is lower and a draw otherwise
+    (including buckets without data)
+    :return: wins, draws, losses
+    """
+    wins = int(np.count_nonzero(profit_ratios > market_changes))
+    losses = int(np.count_nonzero(profit_ratios < market_changes))
+    return wins, len(profit_ratios) - wins - losses, losses
+
+
+def create_calendar_table(calendar: CalendarIndex, profit_ratios: np.ndarray,
+                          market_changes: np.ndarray) -> DataFrame:
+    """
+    :return: table with the profit ratio, market change and result (win / draw / loss) per bucket
+    """
+    results = np.where(profit_ratios > market_changes, 'win',
+                       np.where(profit_ratios < market_changes, 'loss', 'draw'))
+    return DataFrame({'profit_ratio': profit_ratios, 'market_change': market_changes, 'result': results},
+                     index=calendar.labels)
@@ -1,35 +1,47 @@
-import pandas as pd
-from pandas import DataFrame
+import numpy as np
 
-from modules.stats.drawdown.drawdown import get_max_drawdown_ratio, get_max_drawdown_ratio_series
-from utils.utils import get_ohlcv_indicators
+from modules.stats.drawdown.drawdown import get_drawdown_episodes
+from modules.stats.pair_frames import PairFrames
 
 
-def get_market_change(df, pairs: list, data_dict: dict) -> dict:
-    market_change = {}
-    total_change = 0
-    for pair in pairs:
-        first_valid_tick = df[pair]['close'].first_valid_index()
-        last_valid_tick = df[pair]['close'].last_valid_index()
+def get_market_change(pairs: list, pair_frames: PairFrames) -> dict:
+    """
+    Change between the first and last valid close of every pair, and the average over all pairs
+    """
+    closes = pair_frames.column_matrix("close", pairs)
+    coin_changes = np.full(len(pairs), np.nan)
+    if len(closes):
+        valid = ~np.isnan(closes)
+        columns = np.arange(closes.shape[1])
+        first_valid = valid.argmax(axis=0)
+        last_valid = len(closes) - 1 - valid[::-1].argmax(axis=0)
+        coin_changes = closes[last_valid, columns] / closes[first_valid, columns]
 
-        begin_value = data_dict[pair][first_valid_tick]['close']
-        end_value = data_dict[pair][last_valid_tick]['close']
-
-        coin_change = end_value / begin_value
-        market_change[pair] = coin_change
-        total_change += coin_change
-    market_change['all'] = total_change / len(pairs) if len(pairs) > 0 else 1
+    market_change = dict(zip(pairs, coin_changes.tolist()))
+    market_change['all'] = float(np.nanmean(coin_changes)) if np.any(~np.isnan(coin_changes)) else 1
     return market_change
 
 
-def get_market_drawdown(pairs: list, data_dict: dict) -> dict:
-    market_drawdown = {}
-    pairs_profit_ratios_sum = [0] * len(data_dict[pairs[0]])
-    for pair in pairs:
-        df = pd.DataFrame.from_dict(data_dict[pair], orient='index', columns=get_ohlcv_indicators())
-        closes = df["close"].dropna()
-        market_drawdown[pair] = get_max_drawdown_ratio_series(closes)
-        profit_ratios = closes / closes.iloc[0]
-        pairs_profit_ratios_sum = map(lambda x, y: x + y, pairs_profit_ratios_sum, profit_ratios)
-    market_drawdown['all'] = get_max_drawdown_ratio(DataFrame(pairs_profit_ratios_sum, columns=['value']))
+def get_market_drawdown(pairs: list, pair_frames: PairFrames) -> dict:
+    """
+    Max drawdown ratio of the close of every pair, and of an equally weighted portfolio of all pairs.
+    Pairs that list mid-period count as cash (ratio 1) until their first close, gaps are forward filled.
+    """
+    closes = pair_frames.column_matrix("close", pairs)
+    market_drawdown = {pair: get_drawdown_episodes(closes[:, column]).max_drawdown_ratio
+                       for column, pair in enumerate(pairs)}
+
+    # Profit ratio of every pair relative to its first valid close
+    valid = ~np.isnan(closes)
+    rows = np.arange(len(closes))[:, np.newaxis]
+    last_valid_row = np.maximum.accumulate(np.where(valid, rows, 0), axis=0)
+    filled_closes = np.take_along_axis(closes, last_valid_row, axis=0)
+    first_closes = closes[valid.argmax(axis=0), np.arange(closes.shape[1])]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        profit_ratios = filled_closes / first_closes
+    profit_ratios[np.isnan(profit_ratios)] = 1.
+
+    market_drawdown['all'] = get_drawdown_episodes(profit_ratios.sum(axis=1)).max_drawdown_ratio \
+        if len(closes) else np.nan
     return market_drawdown
+
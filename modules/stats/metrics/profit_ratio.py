@@ -4,15 +4,19 @@ import numpy as np
 from modules.stats.trade import Trade
 
 
-def get_seen_cum_profit_ratio_per_coin(signal_dict, closed_pair_trades: [Trade], fee_percentage: float):
-    df = pd.DataFrame(signal_dict.values()).set_index("time")
-    return get_profit_ratio(df, fee_percentage, closed_pair_trades)
+def get_seen_cum_profit_ratio_per_coin(pair_frame: pd.DataFrame, closed_pair_trades: [Trade], fee_percentage: float):
+    """
+    @param pair_frame: time-indexed frame of the pair (see PairFrames), is not modified
+    """
+    return get_profit_ratio(pair_frame, fee_percentage, closed_pair_trades)
 
 
-def get_realised_profit_ratio(signal_dict, closed_pair_trades: [Trade], fee_percentage: float):
-    df = pd.DataFrame(signal_dict.values()).set_index("time")
+def get_realised_profit_ratio(pair_frame: pd.DataFrame, closed_pair_trades: [Trade], fee_percentage: float):
+    """
+    @param pair_frame: time-indexed frame of the pair (see PairFrames), is not modified
+    """
     trade_timestamps = get_trade_timestamps(closed_pair_trades)
-    df = pd.concat([df, trade_timestamps], axis=1, join="inner")
+    df = pd.concat([pair_frame, trade_timestamps], axis=1, join="inner")
     return get_profit_ratio(df, fee_percentage, closed_pair_trades)
 
 
@@ -39,20 +43,48 @@ def map_trades_to_opened_closed_timestamps(closed_pair_trades):
 
 
 def apply_profit_ratio(df, trades_open_closed):
-    for open_timestamp, close in trades_open_closed:
-        # skip the first row of each trade
-        idx = np.searchsorted(df.index, open_timestamp)
-        open_timestamp = df.index[max(0, idx + 1)]
-
-        df.loc[open_timestamp: close, "profit_ratio"] = (df["close"] / df["close"].shift(1))
-    df["profit_ratio"] = df["profit_ratio"].fillna(1)
+    """
+    Sets the candle-to-candle close ratio on every row that is inside a trade (the first row of each trade
+    excluded, the closing row included) and 1 elsewhere, in a single pass over all trades.
+    """
+    index = df.index.to_numpy()
+    n_rows = len(index)
+    opened, closed = trades_to_arrays(trades_open_closed)
+
+    # Mark trade intervals [open + 1, close] and find the rows covered by one of them
+    starts = np.minimum(np.searchsorted(index, opened) + 1, n_rows)
+    ends = np.maximum(np.searchsorted(index, closed, side="right"), starts)
+    markers = np.zeros(n_rows + 1, dtype=np.int64)
+    np.add.at(markers, starts, 1)
+    np.add.at(markers, ends, -1)
+    in_trade = np.cumsum(markers[:-1]) > 0
+
+    close = df["close"].to_numpy(dtype=np.float64)
+    returns = np.full(n_rows, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns[1:] = close[1:] / close[:-1]
+
+    profit_ratio = np.where(in_trade, returns, 1.)
+    profit_ratio[np.isnan(profit_ratio)] = 1.
+    df["profit_ratio"] = profit_ratio
 
 
 def add_trade_fee(df, fee_percentage, trades_closed_opened):
     fee_ratio = 1 - fee_percentage / 100
-    for opened, closed in trades_closed_opened:
-        df.loc[opened, "profit_ratio"] *= fee_ratio
-        df.loc[closed, "profit_ratio"] *= fee_ratio
+    index = df.index.to_numpy()
+    opened, closed = trades_to_arrays(trades_closed_opened)
+    timestamps = np.concatenate([opened, closed])
+    positions = np.searchsorted(index, timestamps)
+    positions = positions[(positions < len(index)) & (index[np.minimum(positions, len(index) - 1)] == timestamps)]
+
+    profit_ratio = df["profit_ratio"].to_numpy(dtype=np.float64, copy=True)
+    np.multiply.at(profit_ratio, positions, fee_ratio)
+    df["profit_ratio"] = profit_ratio
+
+
+def trades_to_arrays(trades_open_closed) -> tuple:
+    trades = np.asarray(trades_open_closed, dtype=np.int64).reshape(-1, 2)
+    return trades[:, 0], trades[:, 1]
 
 
 def get_trade_timestamps(closed_pair_trades):
@@ -0,0 +1,80 @@
+import numpy as np
+
+
+def floor_log2(lengths: np.ndarray) -> np.ndarray:
+    return np.frexp(np.asarray(lengths, dtype=np.float64))[1] - 1
+
+
+class SparseTable:
+    """
+    Range minimum or maximum queries in O(1) after an O(n log n) build. Level k holds the reduction of every
+    block of 2^k values, and a range is covered by two (overlapping) blocks of the same level.
+    """
+
+    def __init__(self, values: np.ndarray, reduce: np.ufunc = np.minimum):
+        self.reduce = reduce
+        self.levels = [np.asarray(values, dtype=np.float64)]
+        width = 1
+        while width * 2 <= len(self.levels[0]):
+            previous = self.levels[-1]
+            self.levels.append(reduce(previous[:-width], previous[width:]))
+            width *= 2
+
+    def query(self, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """
+        :param starts: first row of every range
+        :param ends: last row of every range (inclusive), not before its start
+        :return: reduction of every range
+        """
+        starts, ends = np.asarray(starts), np.asarray(ends)
+        levels = floor_log2(ends - starts + 1)
+        result = np.empty(len(starts))
+        for level in np.unique(levels):
+            ranges = levels == level
+            values = self.levels[level]
+            result[ranges] = self.reduce(values[starts[ranges]], values[ends[ranges] - (1 << level) + 1])
+        return result
+
+
+class DrawdownTable:
+    """
+    Max drawdown ratio (trough / preceding peak) of any range of a positive series in O(log n) after an
+    O(n log n) build. Max drawdown is not idempotent, so a range is covered by disjoint blocks of decreasing
+    size, which are merged from left to right with their peak, trough and drawdown.
+    """
+
+    def __init__(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        self.peaks = [values]
+        self.troughs = [values]
+        self.drawdowns = [np.ones(len(values))]
+        width = 1
+        while width * 2 <= len(values):
+            peaks, troughs, drawdowns = self.peaks[-1], self.troughs[-1], self.drawdowns[-1]
+            self.peaks.append(np.maximum(peaks[:-width], peaks[width:]))
+            self.troughs.append(np.minimum(troughs[:-width], troughs[width:]))
+            self.drawdowns.append(np.minimum(np.minimum(drawdowns[:-width], drawdowns[width:]),
+                                             troughs[width:] / peaks[:-width]))
+            width *= 2
+
+    def query(self, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """
+        :param starts: first row of every range
+        :param ends: last row of every range (inclusive), not before its start
+        :return: max drawdown ratio of every range, 1 when the range does not draw down
+        """
+        positions = np.asarray(starts).copy()
+        remaining = np.asarray(ends) - positions + 1
+        peak = np.full(len(positions), -np.inf)
+        drawdown = np.ones(len(positions))
+        for level in range(len(self.peaks) - 1, -1, -1):
+            take = (remaining >> level) & 1 == 1
+            if not take.any():
+                continue
+            rows = positions[take]
+            block_drawdown = np.minimum(self.drawdowns[level][rows],
+                                        np.where(np.isinf(peak[take]), 1., self.troughs[level][rows] / peak[take]))
+            drawdown[take] = np.minimum(drawdown[take], block_drawdown)
+            peak[take] = np.maximum(peak[take], self.peaks[level][rows])
+            positions[take] += 1 << level
+        return drawdown
@@ -0,0 +1,142 @@
+from functools import cached_property
+
+import numpy as np
+
+from modules.stats.drawdown.drawdown import get_drawdown_episodes
+
+YEAR_MS = 365 * 24 * 60 * 60 * 1000
+
+
+class RiskMetrics:
+    """
+    Risk-adjusted performance metrics computed from the equity curve and the closed trades. Every metric
+    is computed on first access only, so cheap hyperopt objectives do not pay for the ones they do not read.
+    Ratios are annualized using the candle interval of the equity curve and a risk-free rate of 0.
+    """
+
+    def __init__(self, equity: np.ndarray, timestamps: np.ndarray, trade_profits: np.ndarray,
+                 trade_profit_ratios: np.ndarray):
+        self.equity = equity
+        self.timestamps = timestamps
+        self.trade_profits = trade_profits
+        self.trade_profit_ratios = trade_profit_ratios
+
+    @classmethod
+    def from_ledgers(cls, capital_per_timestamp: dict, trades: list) -> 'RiskMetrics':
+        """
+        :param capital_per_timestamp: capital per timestamp, with the starting capital at timestamp 0
+        :param trades: trades of the backtest, only closed trades are used
+        """
+        equity = np.fromiter(capital_per_timestamp.values(), dtype=np.float64, count=len(capital_per_timestamp))
+        timestamps = np.fromiter(capital_per_timestamp.keys(), dtype=np.int64, count=len(capital_per_timestamp))
+        closed_trades = [trade for trade in trades if trade.status == 'closed']
+        trade_profits = np.array([trade.profit_dollar for trade in closed_trades], dtype=np.float64)
+        trade_profit_ratios = np.array([trade.profit_ratio for trade in closed_trades], dtype=np.float64)
+        return cls(equity, timestamps, trade_profits, trade_profit_ratios)
+
+    @cached_property
+    def returns(self) -> np.ndarray:
+        """
+        :return: return per candle of the equity curve
+        """
+        if len(self.equity) < 2:
+            return np.array([], dtype=np.float64)
+        return self.equity[1:] / self.equity[:-1] - 1
+
+    @cached_property
+    def periods_per_year(self) -> float:
+        intervals = np.diff(self.timestamps[self.timestamps > 0])
+        if len(intervals) == 0:
+            return np.nan
+        return YEAR_MS / np.median(intervals)
+
+    @cached_property
+    def total_return(self) -> float:
+        if len(self.equity) < 2:
+            return 0.
+        return self.equity[-1] / self.equity[0] - 1
+
+    @cached_property
+    def annualized_return(self) -> float:
+        timestamps = self.timestamps[self.timestamps > 0]
+        if len(timestamps) < 2:
+            return np.nan
+        years = (timestamps[-1] - timestamps[0]) / YEAR_MS
+        if years <= 0:
+            return np.nan
+        return (1 + self.total_return) ** (1 / years) - 1
+
+    @cached_property
+    def volatility(self) -> float:
+        """
+        :return: annualized standard deviation of the candle returns
+        """
+        if len(self.returns) < 2:
+            return np.nan
+        return np.std(self.returns, ddof=1) * np.sqrt(self.periods_per_year)
+
+    @cached_property
+    def sharpe(self) -> float:
+        if len(self.returns) < 2:
+            return np.nan
+        std = np.std(self.returns, ddof=1)
+        if std == 0:
+            return np.nan
+        return np.mean(self.returns) / std * np.sqrt(self.periods_per_year)
+
+    @cached_property
+    def sortino(self) -> float:
+        if len(self.returns) < 2:
+            return np.nan
+        downside_deviation = np.sqrt(np.mean(np.minimum(self.returns, 0) ** 2))
+        if downside_deviation == 0:
+            return np.inf if np.mean(self.returns) > 0 else np.nan
+        return np.mean(self.returns) / downside_deviation * np.sqrt(self.periods_per_year)
+
+    @cached_property
+    def max_drawdown(self) -> float:
+        """
+        :return: deepest drawdown of the equity curve as a positive fraction, e.g. 0.2 for a 20% drawdown
+        """
+        return 1 - get_drawdown_episodes(self.equity).max_drawdown_ratio
+
+    @cached_property
+    def calmar(self) -> float:
+        if self.max_drawdown == 0:
+            return np.inf if self.annualized_return > 0 else np.nan
+        return self.annualized_return / self.max_drawdown
+
+    @cached_property
+    def profit_factor(self) -> float:
+        """
+        :return: gross profit / gross loss of the closed trades
+        """
+        gross_profit = self.trade_profits[self.trade_profits > 0].sum()
+        gross_loss = -self.trade_profits[self.trade_profits < 0].sum()
+        if gross_loss == 0:
+            return np.inf if gross_profit > 0 else np.nan
+        return gross_profit / gross_loss
+
+    @cached_property
+    def win_rate(self) -> float:
+        if len(self.trade_profits) == 0:
+            return np.nan
+        return np.count_nonzero(self.trade_profits > 0) / len(self.trade_profits)
+
+    @cached_property
+    def expectancy(self) -> float:
+        """
+        :return: expected profit per closed trade, in currency
+        """
+        if len(self.trade_profits) == 0:
+            return np.nan
+        return self.trade_profits.mean()
+
+    @cached_property
+    def expectancy_ratio(self) -> float:
+        """
+        :return: expected profit per closed trade, as a ratio of the trade's stake
+        """
+        if len(self.trade_profit_ratios) == 0:
+            return np.nan
+        return self.trade_profit_ratios.mean() - 1
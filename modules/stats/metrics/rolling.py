@@ -0,0 +1,154 @@
+from functools import cached_property
+
+import numpy as np
+from pandas import DataFrame
+
+from modules.stats.metrics.calendar import DAY_MS
+from modules.stats.metrics.range_query import SparseTable
+from modules.stats.metrics.risk import YEAR_MS
+
+ROLLING_WINDOWS = {'7d': 7 * DAY_MS, '30d': 30 * DAY_MS, '90d': 90 * DAY_MS}
+ROLLING_METRICS = ('return', 'volatility', 'sharpe', 'drawdown')
+
+
+def get_window_starts(timestamps: np.ndarray, window_ms: int) -> np.ndarray:
+    """
+    :return: for every row, the first row of the window [time - window_ms, time] ending at that row
+    """
+    return np.searchsorted(timestamps, timestamps - window_ms, side='left')
+
+
+def rolling_max(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """
+    Maximum of values[starts[i]:i + 1] for every row i, with vectorized range maximum queries on a SparseTable
+    """
+    if len(values) == 0:
+        return np.empty(0)
+    return SparseTable(values, np.maximum).query(starts, np.arange(len(values)))
+
+
+def window_sum(cumulative: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """
+    :param cumulative: cumulative sum with a leading 0, so cumulative[i + 1] is the sum of the first i + 1 values
+    :return: sum of values[starts[i] + 1:i + 1] for every row i, i.e. the candles that end inside the window
+    """
+    ends = np.arange(1, len(cumulative))
+    return cumulative[ends] - cumulative[starts + 1]
+
+
+class RollingMetrics:
+    """
+    Return, volatility, Sharpe ratio and drawdown of an equity curve over a sliding time window, computed for
+    every row: sums of candle returns come from cumulative sums and the peak of the window from a sparse table
+    of range maxima. Rows before the first full window are NaN. Like RiskMetrics, volatility and Sharpe are
+    annualized using the candle interval and a risk-free rate of 0, and drawdown is a positive fraction of
+    the peak within the window.
+    """
+
+    def __init__(self, equity: np.ndarray, timestamps: np.ndarray, window_ms: int):
+        self.equity = np.asarray(equity, dtype=np.float64)
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.window_ms = window_ms
+
+    @classmethod
+    def from_ledger(cls, capital_per_timestamp: dict, window_ms: int) -> 'RollingMetrics':
+        """
+        :param capital_per_timestamp: capital per timestamp, the starting capital at timestamp 0 is skipped
+        """
+        return cls(*ledger_to_arrays(capital_per_timestamp), window_ms)
+
+    @cached_property
+    def starts(self) -> np.ndarray:
+        return get_window_starts(self.timestamps, self.window_ms)
+
+    @cached_property
+    def full(self) -> np.ndarray:
+        """
+        :return: mask of the rows whose window lies completely inside the equity curve
+        """
+        if len(self.timestamps) == 0:
+            return np.zeros(0, dtype=bool)
+        return self.timestamps - self.window_ms >= self.timestamps[0]
+
+    @cached_property
+    def periods_per_year(self) -> float:
+        intervals = np.diff(self.timestamps)
+        return YEAR_MS / np.median(intervals) if len(intervals) else np.nan
+
+    @cached_property
+    def candle_returns(self) -> np.ndarray:
+        """
+        :return: return of every candle, 0 for the first row
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.concatenate([[0.], self.equity[1:] / self.equity[:-1] - 1]) if len(self.equity) \
+                else self.equity
+
+    @cached_property
+    def candle_moments(self) -> tuple:
+        """
+        :return: number of candle returns, their mean and sample standard deviation per window
+        """
+        returns = self.candle_returns
+        counts = np.arange(len(returns)) - self.starts
+        sums = window_sum(np.concatenate([[0.], np.cumsum(returns)]), self.starts)
+        squares = window_sum(np.concatenate([[0.], np.cumsum(returns ** 2)]), self.starts)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            means = sums / counts
+            variances = (squares - counts * means ** 2) / (counts - 1)
+        return counts, means, np.sqrt(np.maximum(variances, 0))
+
+    def only_full(self, values: np.ndarray) -> np.ndarray:
+        return np.where(self.full, values, np.nan)
+
+    @cached_property
+    def returns(self) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.only_full(self.equity / self.equity[self.starts] - 1)
+
+    @cached_property
+    def volatility(self) -> np.ndarray:
+        counts, _, stds = self.candle_moments
+        return self.only_full(np.where(counts > 1, stds * np.sqrt(self.periods_per_year), np.nan))
+
+    @cached_property
+    def sharpe(self) -> np.ndarray:
+        counts, means, stds = self.candle_moments
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sharpe = means / stds * np.sqrt(self.periods_per_year)
+        return self.only_full(np.where((counts > 1) & (stds > 0), sharpe, np.nan))
+
+    @cached_property
+    def drawdown(self) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.only_full(1 - self.equity / rolling_max(self.equity, self.starts))
+
+    def to_frame(self, suffix: str = '') -> DataFrame:
+        """
+        :return: one column per metric, indexed by timestamp
+        """
+        return DataFrame({f"{metric}{suffix}": getattr(self, 'returns' if metric == 'return' else metric)
+                          for metric in ROLLING_METRICS}, index=self.timestamps)
+
+
+def get_rolling_metrics(equity: np.ndarray, timestamps: np.ndarray, windows: dict = None) -> DataFrame:
+    """
+    :param windows: window name -> window length in ms, defaults to 7, 30 and 90 days
+    :return: every rolling metric for every window, in columns named like 'sharpe_30d'
+    """
+    windows = ROLLING_WINDOWS if windows is None else windows
+    frames = [RollingMetrics(equity, timestamps, window_ms).to_frame(f"_{name}") for name, window_ms in windows.items()]
+    return frames[0].join(frames[1:]) if len(frames) > 1 else frames[0]
+
+
+def get_rolling_metrics_for_portfolio(capital_per_timestamp: dict, windows: dict = None) -> DataFrame:
+    return get_rolling_metrics(*ledger_to_arrays(capital_per_timestamp), windows)
+
+
+def ledger_to_arrays(capital_per_timestamp: dict) -> tuple:
+    """
+    :return: equity and timestamps of the ledger, without the starting capital at timestamp 0
+    """
+    timestamps = np.fromiter(capital_per_timestamp.keys(), dtype=np.int64, count=len(capital_per_timestamp))
+    equity = np.fromiter(capital_per_timestamp.values(), dtype=np.float64, count=len(capital_per_timestamp))
+    return equity[timestamps > 0], timestamps[timestamps > 0]
@@ -1,65 +1,26 @@
-from datetime import datetime
-from pandas import DataFrame
-
-
-def get_winning_weeks_per_coin(signal_dict: dict, cum_profit_ratio):
-    # Create dataframes
-    ohlcv_df = DataFrame(signal_dict.values()).set_index("time")
-    cum_profit_ratio = cum_profit_ratio.iloc[1:]
-
-    # Refactor index of dataframes
-    datetime_index = [datetime.fromtimestamp(ms / 1000.0) for ms in ohlcv_df.index]
-    ohlcv_df.index = datetime_index
-    cum_profit_ratio.index = datetime_index
-
-    # Resample dataframes to one week
-    coin_close_price_weekly = ohlcv_df['close'].resample('W', origin='start').ohlc()
-    cum_profit_ratio_weekly = cum_profit_ratio['profit_ratio'].resample('W', origin='start').prod()
-
-    # Calculate market change
-    market_change_weekly = \
-        coin_close_price_weekly['close'] / coin_close_price_weekly['open']
-
-    # Define the winning weeks
-    wins = len(cum_profit_ratio_weekly[cum_profit_ratio_weekly > market_change_weekly])
-    losses = len(cum_profit_ratio_weekly[cum_profit_ratio_weekly < market_change_weekly])
-    draws = len(cum_profit_ratio_weekly) - wins - losses
-
-    return wins, draws, losses, market_change_weekly
-
-
-def get_winning_weeks_for_portfolio(capital_per_timestamp, market_change_weekly):
-    coins = list(market_change_weekly.keys())
-    market_change_weekly_first_coin = market_change_weekly[coins[0]]
-
-    if market_change_weekly_first_coin is not None:   # is None if no trades are made
-        # Combine market change of multiple coins into one dataframe
-        combined_market_change_df = DataFrame(market_change_weekly_first_coin, columns=[coins[0]])
-        for coin in coins[1:]:
-            combined_market_change_df[coin] = market_change_weekly[coin]
-
-        # Calculate average market change
-        combined_market_change_df['avg_market_change'] = combined_market_change_df.mean(axis=1)
-
-        # Create dataframe for capital per timestamp
-        capital_per_timestamp_df = DataFrame(capital_per_timestamp.values(),
-                                             index=capital_per_timestamp.keys(),
-                                             columns=['capital']).iloc[1:]
-
-        # Set index to datetime and resample to one week
-        capital_per_timestamp_df.index = \
-            [datetime.fromtimestamp(ms / 1000.0) for ms in capital_per_timestamp_df.index]
-        capital_per_timestamp_weekly = capital_per_timestamp_df['capital'].resample('W', origin='start').ohlc()
-
-        # Calculate market change
-        capital_per_timestamp_weekly['weekly_profit'] = \
-            capital_per_timestamp_weekly['close'] / capital_per_timestamp_weekly['open']
-
-        # Define the winning weeks
-        wins = len(capital_per_timestamp_weekly[capital_per_timestamp_weekly['weekly_profit'] >
-                                                combined_market_change_df['avg_market_change']])
-        losses = len(capital_per_timestamp_weekly[capital_per_timestamp_weekly['weekly_profit'] <
-                                                  combined_market_change_df['avg_market_change']])
-        draws = len(capital_per_timestamp_weekly) - wins - losses
-        return wins, draws, losses
-    return 0, 0, 0
+import numpy as np
+
+from modules.stats.metrics.calendar import CalendarIndex, count_results
+
+
+def get_winning_weeks_per_coin(calendar: CalendarIndex, profit_ratio: np.ndarray, market_change_weekly: np.ndarray):
+    """
+    @param calendar: weekly CalendarIndex of the time grid
+    @param profit_ratio: seen profit ratio of the coin per row of the time grid, NaN where the coin has no candle
+    @param market_change_weekly: close / open ratio of the coin per week of the calendar
+    @return: wins, draws and losses over the weeks the coin was listed
+    """
+    listed = calendar.bucket_span(market_change_weekly)
+    profit_ratio_weekly = calendar.product(profit_ratio)
+    return count_results(profit_ratio_weekly[listed], market_change_weekly[listed])
+
+
+def get_winning_weeks_for_portfolio(weeks: np.ndarray, weekly_profit: np.ndarray, calendar: CalendarIndex,
+                                    avg_market_change_weekly: np.ndarray):
+    """
+    Compares the weekly profit ratio of the portfolio with the average weekly market change of the coins
+    @param weeks: week ids of weekly_profit (see WeeklyBuckets.weekly_ratios)
+    @param weekly_profit: close / open ratio of the capital per week
+    @param avg_market_change_weekly: average market change per week of the calendar
+    """
+    return count_results(weekly_profit, calendar.lookup(weeks, avg_market_change_weekly))
@@ -0,0 +1,100 @@
+# Libraries
+from typing import Dict, Optional
+
+import numpy as np
+from pandas import DataFrame
+
+# Files
+from modules.public.pairs_data import PairsData
+
+# ======================================================================
+# PairFrames memoizes one time-indexed dataframe per pair, so that the
+# stats metrics share a single frame per pair instead of rebuilding it
+# from the signal dicts for every metric.
+#
+# © 2021 DemaTrading.ai
+# ======================================================================
+
+
+class PairFrames:
+    """
+    Read-only per-pair frames indexed by "time", built at most once per analysis. When the simulation's
+    own pair dataframes are passed they are reused, otherwise the frames are built from the signal dicts.
+    Metric functions must not modify the returned frames.
+    """
+
+    def __init__(self, frame_with_signals: PairsData, pair_dataframes: Optional[Dict[str, DataFrame]] = None):
+        self.frame_with_signals = frame_with_signals
+        self.pair_dataframes = pair_dataframes or {}
+        self.frames = {}
+        self.columns = {}
+        self.matrices = {}
+
+    def __getitem__(self, pair: str) -> DataFrame:
+        frame = self.frames.get(pair)
+        if frame is None:
+            frame = self.frames[pair] = self.build_frame(pair)
+        return frame
+
+    def __contains__(self, pair: str) -> bool:
+        return pair in self.frame_with_signals
+
+    def keys(self):
+        return self.frame_with_signals.keys()
+
+    def column(self, pair: str, column: str) -> np.ndarray:
+        """
+        :return: memoized numpy array of a column of the pair frame
+        """
+        key = (pair, column)
+        values = self.columns.get(key)
+        if values is None:
+            values = self.columns[key] = self[pair][column].to_numpy()
+        return values
+
+    def column_matrix(self, column: str, pairs: Optional[list] = None) -> np.ndarray:
+        """
+        Stacks a column of all pairs on a shared time axis (the union of the pair timestamps). Rows where a
+        pair has no candle, e.g. before it was listed, are NaN.
+        :return: memoized (time x pair) array, columns in the order of pairs
+        """
+        pairs = list(self.keys()) if pairs is None else list(pairs)
+        key = (column, tuple(pairs))
+        matrix = self.matrices.get(key)
+        if matrix is not None:
+            return matrix
+
+        times = self.time_grid(pairs)
+        if pairs and all(self[pair].index.equals(self[pairs[0]].index) for pair in pairs[1:]):
+            matrix = np.column_stack([self.column(pair, column).astype(np.float64) for pair in pairs])
+        else:
+            matrix = np.full((len(times), len(pairs)), np.nan)
+            for i, pair in enumerate(pairs):
+                matrix[np.searchsorted(times, self[pair].index.to_numpy()), i] = self.column(pair, column)
+        matrix.flags.writeable = False
+        self.matrices[key] = matrix
+        return matrix
+
+    def time_grid(self, pairs: Optional[list] = None) -> np.ndarray:
+        """
+        :return: memoized sorted union of the timestamps of the pairs, the time axis of column_matrix
+        """
+        pairs = list(self.keys()) if pairs is None else list(pairs)
+        key = ("time", tuple(pairs))
+        times = self.matrices.get(key)
+        if times is None:
+            indexes = [self[pair].index for pair in pairs]
+            if indexes and all(index.equals(indexes[0]) for index in indexes[1:]):
+                times = indexes[0].to_numpy()
+            else:
+                times = np.unique(np.concatenate([index.to_numpy() for index in indexes])) if indexes \
+                    else np.array([], dtype=np.int64)
+            self.matrices[key] = times
+        return times
+
+    def build_frame(self, pair: str) -> DataFrame:
+        signal_dict = self.frame_with_signals[pair]
+        dataframe = self.pair_dataframes.get(pair)
+        if dataframe is not None and "time" in dataframe.columns and len(dataframe) == len(signal_dict):
+            return dataframe.set_index("time")
+        return DataFrame(signal_dict.values()).set_index("time")
@@ -1,23 +1,25 @@
 from datetime import datetime, timedelta
+from functools import cached_property
+from typing import Callable, Optional
 
 from tqdm import tqdm
 import numpy as np
+from pandas import DataFrame
 from collections import defaultdict
 
 from cli.print_utils import print_info
 from modules.output.results import CoinInsights, MainResults, LeftOpenTradeResult
 from modules.public.pairs_data import PairsData
 from modules.public.trading_stats import TradingStats
-from modules.stats.drawdown.drawdown import get_max_drawdown_ratio
+from modules.stats.drawdown.drawdown import get_max_drawdown_ratio, DrawdownEpisodes
 from modules.stats.metrics.profit_ratio import get_seen_cum_profit_ratio_per_coin, get_realised_profit_ratio
-from modules.stats.drawdown.for_portfolio import get_max_seen_drawdown_for_portfolio, \
-    get_max_realised_drawdown_for_portfolio
-from modules.stats.drawdown.per_trade import get_max_seen_drawdown_per_trade
+from modules.stats.drawdown.for_portfolio import get_drawdown_episodes_for_portfolio
+from modules.stats.drawdown.per_trade import apply_trade_excursions
 from modules.stats.metrics.market_change import get_market_change, get_market_drawdown
-from modules.stats.metrics.trades import calculate_best_worst_trade, get_number_of_losing_trades, \
-    get_number_of_consecutive_losing_trades, calculate_trade_durations
-from modules.stats.metrics.winning_weeks import get_winning_weeks_per_coin, \
-    get_winning_weeks_for_portfolio
+from modules.stats.metrics.rolling import get_rolling_metrics, get_rolling_metrics_for_portfolio
+from modules.stats.metrics.calendar import CalendarIndex, PERIODS, create_calendar_table, nanmean_columns
+from modules.stats.metrics.winning_weeks import get_winning_weeks_per_coin, get_winning_weeks_for_portfolio
+from modules.stats.pair_frames import PairFrames
 from modules.stats.stats_config import StatsConfig
 from modules.stats.trade import Trade, SellReason
 from modules.stats.tradingmodule import TradingModule
@@ -35,54 +37,220 @@ class StatsModule:
         self.config = config
         self.trading_module = trading_module
         self.frame_with_signals = frame_with_signals
-
-    def analyze(self) -> TradingStats:
+        self.pair_frames = PairFrames(frame_with_signals, df)
+        self.calendars = {}
+        self.market_changes_per_bucket = {}
+        self.trade_excursions_computed = False
+
+    def tick_times(self) -> np.ndarray:
+        """
+        :return: timestamp of every tick, in the order in which analyze passes them
+        """
+        pairs = list(self.frame_with_signals.keys())
+        first_pair = self.frame_with_signals[pairs[0]] if pairs else {}
+        return np.array([tick_dict['time'] for tick_dict in first_pair.values()], dtype=np.int64)
+
+    def analyze(self, after_tick: Optional[Callable[[int], None]] = None) -> TradingStats:
+        """
+        :param after_tick: called with the row of every tick once all pairs have been ticked, e.g. to report
+        intermediate results. Exceptions it raises (like optuna.TrialPruned) stop the backtest.
+        """
         pairs = list(self.frame_with_signals.keys())
         ticks = list(self.frame_with_signals[pairs[0]].keys()) if pairs else []
         print_info("Backtesting")
-        for tick in ticks:
+        for row, tick in enumerate(ticks):
             for pair in pairs:
                 pair_dict = self.frame_with_signals[pair]
                 tick_dict = pair_dict[tick]
                 self.trading_module.tick(tick_dict, pair_dict)
+            if after_tick is not None:
+                after_tick(row)
 
-        market_change = get_market_change(self.df, pairs, self.frame_with_signals)
-        market_drawdown = get_market_drawdown(pairs, self.frame_with_signals)
-        return self.generate_backtesting_result(market_change, market_drawdown)
-
-    def generate_backtesting_result(self, market_change: dict, market_drawdown: dict) -> TradingStats:
-        coin_results, market_change_weekly = self.generate_coin_results(self.trading_module.closed_trades,
-                                                                        market_change,
-                                                                        market_drawdown)
-        best_trade_ratio, best_trade_pair, worst_trade_ratio, worst_trade_pair = \
-            calculate_best_worst_trade(self.trading_module.closed_trades)
-        open_trade_results = self.get_left_open_trades_results(self.trading_module.open_trades)
-
-        main_results = self.generate_main_results(
-            self.trading_module.open_trades,
-            self.trading_module.closed_trades,
-            self.trading_module.budget,
-            market_change,
-            market_drawdown,
-            best_trade_ratio,
-            best_trade_pair,
-            worst_trade_ratio,
-            worst_trade_pair,
-            market_change_weekly)
-        self.calculate_statistics_for_plots(self.trading_module.closed_trades, self.trading_module.open_trades)
+        return self.generate_backtesting_result()
 
+    def generate_backtesting_result(self) -> TradingStats:
+        """
+        All derived results are passed as loaders, so they are only computed when read. Intermediate results
+        (market change, per-coin statistics) are cached on this module and shared between the loaders.
+        """
         return TradingStats(
-            main_results=main_results,
-            coin_results=coin_results,
-            open_trade_results=open_trade_results,
+            main_results=self.generate_main_results_from_ledgers,
+            coin_results=lambda: self.coin_results,
+            open_trade_results=lambda: self.get_left_open_trades_results(self.trading_module.open_trades),
             frame_with_signals=self.frame_with_signals,
-            buypoints=self.buy_points,
-            sellpoints=self.sell_points,
+            buypoints=lambda: self.plot_points[0],
+            sellpoints=lambda: self.plot_points[1],
             df=self.df,
-            trades=self.trading_module.open_trades + self.trading_module.closed_trades,
-            capital_per_timestamp=self.trading_module.capital_per_timestamp
+            trades=self.trades,
+            capital_per_timestamp=self.trading_module.capital_per_timestamp,
+            drawdown_episodes=lambda: self.drawdown_episodes,
+            calendar_performance=self.generate_calendar_performance,
+            rolling_metrics=self.generate_rolling_metrics,
+            trade_excursions=self.generate_trade_excursions
         )
 
+    @cached_property
+    def drawdown_episodes(self) -> DrawdownEpisodes:
+        return get_drawdown_episodes_for_portfolio(self.trading_module.capital_per_timestamp)
+
+    @cached_property
+    def trades(self) -> list:
+        return self.trading_module.open_trades + self.trading_module.closed_trades
+
+    def compute_trade_excursions(self) -> list:
+        """
+        Stores MAE, MFE and the max seen drawdown on every trade, with one range query index per traded pair.
+        The excursions are only computed on the first call.
+        """
+        if not self.trade_excursions_computed:
+            for pair, pair_trades in group_by(self.trades, "pair").items():
+                apply_trade_excursions(self.pair_frames[pair], pair_trades, self.config.fee)
+            self.trade_excursions_computed = True
+        return self.trades
+
+    def generate_trade_excursions(self) -> DataFrame:
+        """
+        :return: pair, mae, mfe and max seen drawdown ratio of every trade, in the order of TradingStats.trades
+        """
+        return DataFrame([{"pair": trade.pair, "opened_at": trade.opened_at, "closed_at": trade.closed_at,
+                           "mae": trade.mae_ratio, "mfe": trade.mfe_ratio,
+                           "max_seen_drawdown": trade.max_seen_drawdown} for trade in self.compute_trade_excursions()],
+                         columns=["pair", "opened_at", "closed_at", "mae", "mfe", "max_seen_drawdown"])
+
+    @cached_property
+    def market_change(self) -> dict:
+        return get_market_change(list(self.frame_with_signals.keys()), self.pair_frames)
+
+    @cached_property
+    def market_drawdown(self) -> dict:
+        return get_market_drawdown(list(self.frame_with_signals.keys()), self.pair_frames)
+
+    @cached_property
+    def time_grid(self) -> np.ndarray:
+        return self.pair_frames.time_grid(list(self.frame_with_signals.keys()))
+
+    def calendar(self, period: str) -> CalendarIndex:
+        """
+        Bucket index of the time grid per calendar period, computed once and shared by all calendar results
+        """
+        calendar = self.calendars.get(period)
+        if calendar is None:
+            calendar = self.calendars[period] = CalendarIndex(self.time_grid, period)
+        return calendar
+
+    def market_change_per_bucket(self, period: str) -> np.ndarray:
+        """
+        :return: (bucket x pair) close / open ratio of every pair per calendar bucket
+        """
+        market_changes = self.market_changes_per_bucket.get(period)
+        if market_changes is None:
+            closes = self.pair_frames.column_matrix("close", list(self.frame_with_signals.keys()))
+            market_changes = self.market_changes_per_bucket[period] = self.calendar(period).first_last_ratio(closes)
+        return market_changes
+
+    @cached_property
+    def market_change_weekly(self) -> dict:
+        """
+        Weekly market change of the coins that have closed trades, None for the other coins
+        """
+        traded_pairs = {trade.pair for trade in self.trading_module.closed_trades}
+        market_changes = self.market_change_per_bucket('W')
+        return {pair: market_changes[:, i] if pair in traded_pairs else None
+                for i, pair in enumerate(self.frame_with_signals.keys())}
+
+    @cached_property
+    def seen_cum_profit_ratios(self) -> dict:
+        """
+        Seen cumulative profit ratio of every coin with closed trades
+        """
+        trades_per_coin = group_by(self.trading_module.closed_trades, "pair")
+        return {pair: get_seen_cum_profit_ratio_per_coin(self.pair_frames[pair], closed_pair_trades, self.config.fee)
+                for pair, closed_pair_trades in trades_per_coin.items()}
+
+    @cached_property
+    def seen_profit_ratio_matrix(self) -> np.ndarray:
+        """
+        :return: (time x pair) candle profit ratio of every coin on the time grid, NaN for coins without trades
+        """
+        pairs = list(self.frame_with_signals.keys())
+        matrix = np.full((len(self.time_grid), len(pairs)), np.nan)
+        for i, pair in enumerate(pairs):
+            seen_df = self.seen_cum_profit_ratios.get(pair)
+            if seen_df is not None:
+                rows = np.searchsorted(self.time_grid, self.pair_frames[pair].index.to_numpy())
+                matrix[rows, i] = seen_df['profit_ratio'].iloc[1:].to_numpy()
+        return matrix
+
+    @cached_property
+    def capital_on_time_grid(self) -> np.ndarray:
+        """
+        :return: capital per row of the time grid, NaN where no capital was recorded
+        """
+        capital_per_timestamp = self.trading_module.capital_per_timestamp
+        times = np.fromiter(capital_per_timestamp.keys(), dtype=np.int64, count=len(capital_per_timestamp))
+        capital = np.fromiter(capital_per_timestamp.values(), dtype=np.float64, count=len(capital_per_timestamp))
+        grid = self.time_grid
+        result = np.full(len(grid), np.nan)
+        if len(grid):
+            rows = np.minimum(np.searchsorted(grid, times), len(grid) - 1)
+            on_grid = grid[rows] == times
+            result[rows[on_grid]] = capital[on_grid]
+        return result
+
+    def generate_calendar_performance(self) -> dict:
+        """
+        :return: per period ('D', 'W', 'M') a table of the profit ratio, market change and result per bucket,
+        for the portfolio ('all') and every pair (over the buckets the pair was listed)
+        """
+        pairs = list(self.frame_with_signals.keys())
+        performance = {}
+        for period in PERIODS:
+            calendar = self.calendar(period)
+            market_changes = self.market_change_per_bucket(period)
+            profit_ratios = calendar.product(self.seen_profit_ratio_matrix)
+            tables = {'all': create_calendar_table(calendar, calendar.first_last_ratio(self.capital_on_time_grid),
+                                                   nanmean_columns(market_changes))}
+            for i, pair in enumerate(pairs):
+                listed = calendar.bucket_span(market_changes[:, i])
+                tables[pair] = create_calendar_table(calendar, profit_ratios[:, i], market_changes[:, i]).iloc[listed]
+            performance[period] = tables
+        return performance
+
+    def generate_rolling_metrics(self) -> dict:
+        """
+        :return: rolling 7, 30 and 90 day metrics of the portfolio ('all') and of every coin with closed trades,
+        the latter from the seen cumulative profit ratio of the coin
+        """
+        rolling_metrics = {'all': get_rolling_metrics_for_portfolio(self.trading_module.capital_per_timestamp)}
+        for pair, seen_df in self.seen_cum_profit_ratios.items():
+            value = seen_df['value'].iloc[1:]
+            rolling_metrics[pair] = get_rolling_metrics(value.to_numpy(), value.index.to_numpy())
+        return rolling_metrics
+
+    @cached_property
+    def coin_results(self) -> list:
+        return self.generate_coin_results(self.trading_module.closed_trades, self.market_change,
+                                          self.market_drawdown)[0]
+
+    @cached_property
+    def plot_points(self) -> tuple:
+        self.calculate_statistics_for_plots(self.trading_module.closed_trades, self.trading_module.open_trades)
+        return self.buy_points, self.sell_points
+
+    def generate_main_results_from_ledgers(self) -> MainResults:
+        trade_counters = self.trading_module.stats_accumulator.trades
+        return self.generate_main_results(
+            self.trading_module.open_trades,
+            self.trading_module.closed_trades,
+            self.trading_module.budget,
+            self.market_change,
+            self.market_drawdown,
+            trade_counters.best_trade_ratio,
+            trade_counters.best_trade_pair,
+            trade_counters.worst_trade_ratio,
+            trade_counters.worst_trade_pair,
+            self.market_change_weekly)
+
     def generate_main_results(self, open_trades: [Trade], closed_trades: [Trade], budget: float,
                               market_change: dict, market_drawdown: dict, best_trade_ratio: float,
                               best_trade_pair: str, worst_trade_ratio: float,
@@ -91,22 +259,27 @@ class StatsModule:
         budget += calculate_worth_of_open_trades(open_trades)
         overall_profit_percentage = ((budget - self.config.starting_capital) / self.config.starting_capital) * 100
 
-        # Find max seen and realised drawdown
-        max_realised_drawdown = get_max_realised_drawdown_for_portfolio(
-            self.trading_module.realised_profits_per_timestamp
-        )
-        max_seen_drawdown = get_max_seen_drawdown_for_portfolio(
-            self.trading_module.capital_per_timestamp
-        )
+        # Max seen and realised drawdown of the portfolio, from the same episodes as TradingStats.drawdown_episodes
+        accumulator = self.trading_module.stats_accumulator
+        max_realised_drawdown = get_drawdown_episodes_for_portfolio(
+            self.trading_module.realised_profits_per_timestamp).max_drawdown_ratio
+        max_seen_drawdown = self.drawdown_episodes.max_drawdown()
 
         # Find amount of winning, draw and losing weeks for portfolio
-        win_weeks, draw_weeks, loss_weeks = get_winning_weeks_for_portfolio(
-            self.trading_module.capital_per_timestamp,
-            market_change_weekly
-        )
+        traded_market_changes = [change for change in market_change_weekly.values() if change is not None]
+        if traded_market_changes:
+            weeks, weekly_profit = accumulator.weekly_capital.weekly_ratios()
+            win_weeks, draw_weeks, loss_weeks = get_winning_weeks_for_portfolio(
+                weeks,
+                weekly_profit,
+                self.calendar('W'),
+                nanmean_columns(np.column_stack(traded_market_changes))
+            )
+        else:  # no trades are made
+            win_weeks, draw_weeks, loss_weeks = 0, 0, 0
 
-        nr_losing_trades = get_number_of_losing_trades(closed_trades)
-        nr_consecutive_losing_trades = get_number_of_consecutive_losing_trades(closed_trades)
+        nr_losing_trades = accumulator.trades.n_losing_trades
+        nr_consecutive_losing_trades = accumulator.trades.max_consecutive_losing_trades
 
         best_trade_profit_percentage = (best_trade_ratio - 1) * 100 \
             if best_trade_ratio != -np.inf else 0
@@ -114,7 +287,7 @@ class StatsModule:
             if worst_trade_ratio != np.inf else 0
 
         avg_trade_duration, longest_trade_duration, shortest_trade_duration = \
-            calculate_trade_durations(closed_trades)
+            accumulator.trades.trade_durations()
 
         tested_from = datetime.fromtimestamp(self.config.backtesting_from / 1000)
         tested_to = datetime.fromtimestamp(self.config.backtesting_to / 1000)
@@ -210,65 +383,45 @@ class StatsModule:
                 "loss_weeks": 0
             } for pair in self.frame_with_signals.keys()
         }
-        market_change_weekly = {pair: None for pair in self.frame_with_signals.keys()}
+        market_change_weekly = self.market_change_weekly
         trades_per_coin = group_by(closed_trades, "pair")
+        pair_columns = {pair: i for i, pair in enumerate(self.frame_with_signals.keys())}
 
         print_info("Calculating statistics")
         for key, closed_pair_trades in trades_per_coin.items():
             # Calculate max seen drawdown ratio
-            seen_cum_profit_ratio_df = get_seen_cum_profit_ratio_per_coin(
-                self.frame_with_signals[key],
-                closed_pair_trades,
-                self.config.fee
-            )
+            seen_cum_profit_ratio_df = self.seen_cum_profit_ratios[key]
             per_coin_stats[key]["max_seen_ratio"] = get_max_drawdown_ratio(seen_cum_profit_ratio_df)
 
             # Calculate max realised drawdown ratio
             realised_cum_profit_ratio_df = get_realised_profit_ratio(
-                self.frame_with_signals[key],
+                self.pair_frames[key],
                 closed_pair_trades,
                 self.config.fee,
             )
             per_coin_stats[key]["max_realised_ratio"] = \
                 get_max_drawdown_ratio(realised_cum_profit_ratio_df)
 
-            # Find avg, longest and shortest trade durations
-            per_coin_stats[key]["avg_trade_duration"], \
-            per_coin_stats[key]["longest_trade_duration"], \
-            per_coin_stats[key]["shortest_trade_duration"] = \
-                calculate_trade_durations(closed_pair_trades)
-
             # Find winning, draw and losing weeks for current coin
             per_coin_stats[key]["win_weeks"], \
             per_coin_stats[key]["draw_weeks"], \
-            per_coin_stats[key]["loss_weeks"], \
-            market_change_weekly[key] = get_winning_weeks_per_coin(
-                self.frame_with_signals[key],
-                seen_cum_profit_ratio_df
+            per_coin_stats[key]["loss_weeks"] = get_winning_weeks_per_coin(
+                self.calendar('W'),
+                self.seen_profit_ratio_matrix[:, pair_columns[key]],
+                market_change_weekly[key]
             )
 
-            for trade in closed_pair_trades:
-                # Update average profit
-                per_coin_stats[key]['cum_profit_prct'] += (trade.profit_ratio - 1) * 100
-
-                # Update total profit percentage and amount
-                per_coin_stats[key]['total_profit_ratio'] = \
-                    per_coin_stats[key]['total_profit_ratio'] * trade.profit_ratio
-
-                # Update profit and amount of trades
-                per_coin_stats[key]['total_profit_amount'] += trade.profit_dollar
-                per_coin_stats[key]['amount_of_trades'] += 1
-                per_coin_stats[key]['sell_reasons'][trade.sell_reason] += 1
-
-                # Check for max realised drawdown
-                if per_coin_stats[key]['drawdown_ratio'] < per_coin_stats[key]['max_realised_ratio']:
-                    per_coin_stats[key]['max_realised_ratio'] = per_coin_stats[key]['drawdown_ratio']
-
-                # Sum total times
-                if per_coin_stats[key]['total_duration'] is None:
-                    per_coin_stats[key]['total_duration'] = trade.closed_at - trade.opened_at
-                else:
-                    per_coin_stats[key]['total_duration'] += trade.closed_at - trade.opened_at
+            # Cumulative profits, sell reasons and durations are tracked while ticking
+            pair_counters = self.trading_module.stats_accumulator.pairs[key]
+            per_coin_stats[key]['cum_profit_prct'] = pair_counters.cum_profit_prct
+            per_coin_stats[key]['total_profit_ratio'] = pair_counters.total_profit_ratio
+            per_coin_stats[key]['total_profit_amount'] = pair_counters.total_profit_amount
+            per_coin_stats[key]['amount_of_trades'] = pair_counters.n_trades
+            per_coin_stats[key]['sell_reasons'] = pair_counters.sell_reasons
+            per_coin_stats[key]['total_duration'] = pair_counters.total_duration
+            per_coin_stats[key]["avg_trade_duration"], \
+            per_coin_stats[key]["longest_trade_duration"], \
+            per_coin_stats[key]["shortest_trade_duration"] = pair_counters.trade_durations()
         return per_coin_stats, market_change_weekly
 
     def calculate_statistics_for_plots(self, closed_trades, open_trades):
@@ -287,18 +440,13 @@ class StatsModule:
 
     def get_left_open_trades_results(self, open_trades: [Trade]) -> list:
         left_open_trade_stats = []
+        self.compute_trade_excursions()
         for trade in open_trades:
-            max_seen_drawdown = get_max_seen_drawdown_per_trade(
-                self.frame_with_signals[trade.pair],
-                trade,
-                self.config.fee
-            )
             left_open_trade_results = LeftOpenTradeResult(pair=trade.pair,
                                                           curr_profit_percentage=(trade.profit_ratio - 1) * 100,
                                                           curr_profit=trade.profit_dollar,
-                                                          max_seen_drawdown=(max_seen_drawdown - 1) * 100,
+                                                          max_seen_drawdown=(trade.max_seen_drawdown - 1) * 100,
                                                           opened_at=trade.opened_at)
 
             left_open_trade_stats.append(left_open_trade_results)
         return left_open_trade_stats
-
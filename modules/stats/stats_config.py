@@ -17,3 +17,4 @@ class StatsConfig:
     plots: bool
     starting_capital: float
     currency_symbol: Literal["USDT"]
+    export_rolling_metrics: bool = False
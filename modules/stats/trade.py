@@ -1,7 +1,7 @@
 # Libraries
 from datetime import datetime
 from enum import Enum
-from typing import Any
+from typing import Any, Optional
 
 import numpy as np
 
@@ -27,6 +27,8 @@ class SellReason(Enum):
 
 class Trade:
     max_seen_drawdown: float
+    mae_ratio: Optional[float]
+    mfe_ratio: Optional[float]
     closed_at: Any
     sell_reason: SellReason
 
@@ -43,6 +45,8 @@ class Trade:
 
         # Calculations for trade worth
         self.max_seen_drawdown = 1.0  # ratio
+        self.mae_ratio = None  # max adverse / favourable excursion, set after the backtest
+        self.mfe_ratio = None
         self.starting_amount = spend_amount
         self.capital = spend_amount - (spend_amount * fee)  # apply fee
         self.capital_per_timestamp = {}
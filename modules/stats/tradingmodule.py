@@ -4,6 +4,7 @@ from typing import Optional
 
 # Files
 from cli.print_utils import print_info, print_warning
+from modules.stats.accumulator import StatsAccumulator
 from modules.stats.trade import SellReason, Trade
 from modules.stats.tradingmodule_config import TradingModuleConfig
 
@@ -40,6 +41,7 @@ class TradingModule:
         self.lowest_total_capital_open_trades = {}
         self.highest_total_capital_open_trades = {}
         self.total_fee_paid = 0
+        self.stats_accumulator = StatsAccumulator(self.budget)
 
     def tick(self, ohlcv: dict, data_dict: dict) -> None:
         trade = self.find_open_trade(ohlcv['pair'])
@@ -92,6 +94,7 @@ class TradingModule:
         self.open_trades.remove(trade)
         self.closed_trades.append(trade)
         self.update_realised_profit(trade)
+        self.stats_accumulator.on_trade_closed(trade)
 
     def open_trade(self, ohlcv: dict, data_dict: dict) -> None:
         if self.budget <= 0:
@@ -190,7 +193,9 @@ class TradingModule:
     def update_capital_per_timestamp(self, ohlcv: dict) -> None:
         self.capital_per_timestamp[ohlcv['time']] = \
             self.budget_per_timestamp[ohlcv['time']] + self.total_capital_open_trades.get(ohlcv['time'], 0)
+        self.stats_accumulator.on_capital(ohlcv['time'], self.capital_per_timestamp[ohlcv['time']])
 
     def update_realised_profit(self, trade: Trade) -> None:
         self.realised_profit += trade.profit_dollar
-        self.realised_profits_per_timestamp[int(datetime.timestamp(trade.closed_at)*1000)] = self.realised_profit
+        closed_at = int(datetime.timestamp(trade.closed_at) * 1000)
+        self.realised_profits_per_timestamp[closed_at] = self.realised_profit
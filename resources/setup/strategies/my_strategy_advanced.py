@@ -35,9 +35,9 @@ class MyStrategyAdvanced(Strategy):
         add_btc_data = additional_pairs['BTC/USDT']
         # Add your indicators like usual
         add_btc_data['rsi'] = ta.RSI(add_btc_data, timeperiod=14)
-        # Finally merge the additional btc data with the standard dataframe.
+        # Finally merge the additional btc data with the standard dataframe, only joining the columns you use.
         # The new column will have the following format: ['<column>_<pair>_<timeframe>']
-        dataframe = self.join_additional_data(dataframe, add_btc_data, self.timeframe, "4h")
+        dataframe = self.join_additional_data(dataframe, add_btc_data, self.timeframe, "4h", columns=["rsi"])
 
         # RSI - Relative Strength Index
         dataframe['rsi'] = ta.RSI(dataframe, timeperiod=14)
@@ -0,0 +1,139 @@
+from types import SimpleNamespace
+
+import numpy as np
+import optuna
+import pandas as pd
+import pytest
+from optuna.distributions import UniformDistribution
+
+from backtesting.strategy import Strategy
+from modules.algo.backtesting import BackTesting
+from modules.algo.hyperopt.batch import BatchBacktest, has_batch_signals_hook, optimize_in_batches
+from modules.setup.config.load_strategy import check_hyperopt_batch_size
+from modules.stats.tradingmodule import TradingModule
+from modules.stats.tradingmodule_config import TradingModuleConfig
+
+PAIRS = ["AAA/EUR", "BBB/EUR"]
+CANDLE_MS = 60 * 60 * 1000
+
+
+class ThresholdStrategy(Strategy):
+    buy_below = 0.98
+    sell_above = 1.02
+
+    def generate_indicators(self, dataframe):
+        dataframe["ratio"] = dataframe["close"] / dataframe["close"].rolling(10, min_periods=1).mean()
+        return dataframe
+
+    def buy_signal(self, dataframe):
+        dataframe["buy"] = (dataframe["ratio"] < self.buy_below).astype(int)
+        return dataframe
+
+    def sell_signal(self, dataframe):
+        dataframe["sell"] = (dataframe["ratio"] > self.sell_above).astype(int)
+        return dataframe
+
+    def batch_signals(self, dataframe, parameters):
+        ratio = dataframe["ratio"].to_numpy()[:, None]
+        return ratio < parameters["buy_below"], ratio > parameters["sell_above"]
+
+
+def create_frames(n_times=300) -> dict:
+    rng = np.random.default_rng(5)
+    frames = {}
+    times = 1609459200000 + np.arange(n_times, dtype=np.int64) * CANDLE_MS
+    for pair in PAIRS:
+        close = 100 * np.cumprod(1 + rng.normal(0, 0.01, n_times))
+        close[50:53] = np.nan  # missing ticks
+        frames[pair] = pd.DataFrame({"time": times, "open": close, "high": close * 1.01, "low": close * 0.99,
+                                     "close": close, "volume": 1., "pair": pair}, index=times)
+    return frames
+
+
+def create_configs():
+    config = SimpleNamespace(starting_capital=1000, currency_symbol="EUR", backtesting_from=0, backtesting_to=0,
+                             stoploss_type="standard", stoploss=5, plots=False)
+    trading_module_config = TradingModuleConfig(fee=0.25, max_open_trades=2, pairs=PAIRS, roi={"0": 4, "120": 2},
+                                                starting_capital=1000., stoploss=5, stoploss_type="standard")
+    return config, trading_module_config
+
+
+def run_single(strategy, frames, config, trading_module_config) -> float:
+    _, frame_with_signals = BackTesting(frames, config, strategy, {}).start_backtesting()
+    trading_module = TradingModule(trading_module_config)
+    for tick in frame_with_signals[PAIRS[0]]:
+        for pair in PAIRS:
+            trading_module.tick(frame_with_signals[pair][tick], frame_with_signals[pair])
+    return trading_module.capital_per_timestamp[max(trading_module.capital_per_timestamp)]
+
+
+def test_batch_backtest_equals_single_backtests():
+    """Given K threshold pairs, the batched end capital should equal a regular backtest of every pair"""
+    # Arrange
+    frames = create_frames()
+    config, trading_module_config = create_configs()
+    strategy = ThresholdStrategy()
+    parameters = {"buy_below": np.array([0.97, 0.98, 0.99, 1.0]), "sell_above": np.array([1.01, 1.02, 1.0, 1.03])}
+    indicators = BackTesting(frames, config, strategy, {}).populate_indicators()
+
+    # Act
+    results = BatchBacktest(strategy, frames, indicators, trading_module_config).run(parameters)
+
+    # Assert
+    for k in range(4):
+        single = ThresholdStrategy()
+        single.buy_below, single.sell_above = parameters["buy_below"][k], parameters["sell_above"][k]
+        assert np.isclose(results.end_capital[k], run_single(single, frames, config, trading_module_config))
+    assert has_batch_signals_hook(strategy)
+    assert not has_batch_signals_hook(Strategy)
+
+
+def test_optimize_in_batches_tells_every_trial():
+    """Given a batch size of 8, every asked trial should be evaluated in batches and told back"""
+    # Arrange
+    study = optuna.create_study(sampler=optuna.samplers.RandomSampler(seed=1))
+    search_space = {"x": UniformDistribution(0., 10.)}
+    batch_sizes = []
+
+    def evaluate_batch(params: list) -> tuple:
+        batch_sizes.append(len(params))
+        return np.array([(trial_params["x"] - 3) ** 2 for trial_params in params]), [{}] * len(params)
+
+    # Act
+    optimize_in_batches(study, search_space, 20, 8, evaluate_batch)
+
+    # Assert
+    assert batch_sizes == [8, 8, 4]
+    assert len(study.trials) == 20
+    assert all(trial.value == (trial.params["x"] - 3) ** 2 for trial in study.trials)
+
+
+def test_batch_size_requires_batch_signals():
+    """Given a batch size above 1, a strategy without batch_signals should be refused as a configuration error"""
+    # Arrange
+    class SignalStrategy(ThresholdStrategy):
+        batch_signals = Strategy.batch_signals
+
+    # Act
+    check_hyperopt_batch_size(ThresholdStrategy(), 8)
+    check_hyperopt_batch_size(SignalStrategy(), 1)
+
+    # Assert
+    with pytest.raises(SystemExit):
+        check_hyperopt_batch_size(SignalStrategy(), 8)
+
+
+def test_default_batch_signals_give_no_signals():
+    """Given a strategy without batch_signals, the default of the base Strategy should give no buy or sell signals"""
+    # Arrange
+    class SignalStrategy(ThresholdStrategy):
+        batch_signals = Strategy.batch_signals
+
+    dataframe = pd.DataFrame({"ratio": np.linspace(0.9, 1.1, 5)})
+
+    # Act
+    buy, sell = SignalStrategy().batch_signals(dataframe, {"buy_below": np.array([0.95, 0.98, 1.])})
+
+    # Assert
+    assert buy.shape == sell.shape == (5, 3)
+    assert not buy.any() and not sell.any()
@@ -0,0 +1,97 @@
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+from optuna.distributions import CategoricalDistribution, IntUniformDistribution, DiscreteUniformDistribution
+from optuna.trial import FixedTrial
+
+from backtest_runner import BacktestRunner
+from modules.algo.hyperopt.engine_space import EngineSearchSpace
+from modules.algo.hyperopt.hyperopt_strategy import set_trial
+from test.stats.stats_test_utils import StatsFixture, OHLCV_INDICATORS
+
+ENGINE_SPACE = {"stoploss": {"low": 2, "high": 20, "step": 0.5},
+                "stoploss-type": {"options": ["standard", "trailing"]},
+                "max-open-trades": {"low": 1, "high": 3},
+                "roi": {"0": {"low": 50, "high": 150, "step": 10}}}
+
+
+class CountingAlgoModule:
+    def __init__(self, fixture: StatsFixture):
+        self.frame_with_signals = fixture.frame_with_signals
+        self.df = {pair: pd.DataFrame.from_dict(frame, orient='index', columns=OHLCV_INDICATORS)
+                   for pair, frame in fixture.frame_with_signals.items()}
+        self.runs = 0
+
+    def run(self):
+        self.runs += 1
+        return self.df, self.frame_with_signals
+
+
+def create_runner(engine_space: dict) -> BacktestRunner:
+    fixture = StatsFixture(['COIN/BASE'])
+    fixture.frame_with_signals['COIN/BASE'].test_scenario_up_100_one_trade()
+    trading = fixture.trading_module_config
+    config = SimpleNamespace(fee=trading.fee, max_open_trades=trading.max_open_trades, pairs=trading.pairs,
+                             roi=trading.roi, starting_capital=trading.starting_capital, stoploss=trading.stoploss,
+                             stoploss_type=trading.stoploss_type, hyperopt_engine_space=engine_space,
+                             hyperopt_pruner="none", hyperopt_directions=["minimize"])
+    strategy = SimpleNamespace(trial=None)
+    return BacktestRunner(config, None, CountingAlgoModule(fixture), {}, strategy, fixture.stats_config)
+
+
+def test_engine_search_space_distributions():
+    """Given a search space per engine setting, every setting should become an engine parameter"""
+    # Act
+    space = EngineSearchSpace(ENGINE_SPACE)
+
+    # Assert
+    assert space.distributions == {
+        "engine-stoploss": DiscreteUniformDistribution(2., 20., 0.5),
+        "engine-stoploss-type": CategoricalDistribution(["standard", "trailing"]),
+        "engine-max-open-trades": IntUniformDistribution(1, 3),
+        "engine-roi-0": DiscreteUniformDistribution(50., 150., 10.)}
+
+
+@pytest.mark.parametrize("config", [{"fee": {"low": 0, "high": 1}}, {"stoploss": {"low": 1}},
+                                    {"stoploss-type": {"options": ["dynamic"]}}])
+def test_invalid_engine_search_space(config):
+    """Given unknown settings, incomplete ranges or a dynamic stoploss, the search space should be refused"""
+    with pytest.raises(ValueError):
+        EngineSearchSpace(config)
+
+
+def test_apply_engine_settings():
+    """Given engine parameters of a trial, copies of the configs should hold the trial's settings"""
+    # Arrange
+    fixture = StatsFixture(['COIN/BASE'])
+    space = EngineSearchSpace(ENGINE_SPACE)
+    trial = FixedTrial({"engine-stoploss": 5., "engine-stoploss-type": "trailing", "engine-max-open-trades": 2,
+                        "engine-roi-0": 60.})
+
+    # Act
+    trading_config, stats_config = space.apply(space.suggest(trial), fixture.trading_module_config,
+                                               fixture.stats_config)
+
+    # Assert
+    assert (trading_config.stoploss, trading_config.stoploss_type, trading_config.max_open_trades) == \
+           (5., "trailing", 2)
+    assert trading_config.roi == {"0": 60.}
+    assert (stats_config.stoploss, stats_config.max_open_trades) == (5., 2)
+    assert fixture.trading_module_config.roi == {"0": 9999999999}
+
+
+def test_trials_with_only_engine_settings_reuse_signals():
+    """Given trials that only vary engine settings, signals should be populated once and results differ"""
+    # Arrange
+    runner = create_runner({"roi": {"0": {"low": 10, "high": 200, "step": 10}}})
+
+    # Act
+    capitals = []
+    for roi in (20., 200.):
+        set_trial(runner.strategy, FixedTrial({"engine-roi-0": roi}))
+        capitals.append(runner.run_backtest(runner.strategy.trial).main_results.end_capital)
+
+    # Assert
+    assert runner.algo_module.runs == 1
+    assert capitals[0] < capitals[1]
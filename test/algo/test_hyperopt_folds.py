@@ -0,0 +1,119 @@
+import os
+from functools import partial
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+from optuna.trial import FixedTrial
+
+from backtest_runner import BacktestRunner
+from modules.algo.hyperopt.folds import get_fold_ranges, aggregate, slice_signals, map_folds, \
+    create_fold_pool
+from test.stats.stats_test_utils import StatsFixture, OHLCV_INDICATORS
+
+
+class SignalsAlgoModule:
+    def __init__(self, fixture: StatsFixture):
+        self.frame_with_signals = fixture.frame_with_signals
+        self.df = {pair: pd.DataFrame.from_dict(frame, orient='index', columns=OHLCV_INDICATORS)
+                   for pair, frame in fixture.frame_with_signals.items()}
+
+    def run(self):
+        return self.df, self.frame_with_signals
+
+
+def create_runner(n_folds: int, fold_type: str = "purged", aggregation: str = "mean") -> BacktestRunner:
+    fixture = StatsFixture(['COIN/BASE'])
+    frame = fixture.frame_with_signals['COIN/BASE']
+    frame.test_scenario_up_100_one_trade()  # fold 1: +96%
+    frame.add_entry(open=2, high=2, low=2, close=2)
+    frame.add_entry(open=2, high=2, low=2, close=2, buy=1)
+    frame.add_entry(open=1, high=1, low=1, close=1, sell=1)  # fold 2: -50%
+    frame.add_entry(open=1, high=1, low=1, close=1)
+    trading = fixture.trading_module_config
+    config = SimpleNamespace(fee=trading.fee, max_open_trades=trading.max_open_trades, pairs=trading.pairs,
+                             roi=trading.roi, starting_capital=trading.starting_capital, stoploss=trading.stoploss,
+                             stoploss_type=trading.stoploss_type, hyperopt_engine_space={},
+                             hyperopt_pruner="none", hyperopt_directions=["minimize"], hyperopt_folds=n_folds,
+                             hyperopt_fold_type=fold_type, hyperopt_fold_purge=0,
+                             hyperopt_fold_aggregation=aggregation)
+    strategy = SimpleNamespace(trial=None, loss_function=lambda stats: -stats.main_results.end_capital)
+    return BacktestRunner(config, None, SignalsAlgoModule(fixture), {}, strategy, fixture.stats_config)
+
+
+def test_fold_ranges():
+    """Given 10 candles and 3 folds, walk-forward folds should be anchored and purged folds separated"""
+    # Arrange
+    times = np.arange(10) * 100
+
+    # Act
+    walk_forward = get_fold_ranges(times, 3, "walk-forward")
+    purged = get_fold_ranges(times, 3, "purged", purge=1)
+
+    # Assert
+    assert walk_forward == [(0, 200), (0, 600), (0, 900)]
+    assert purged == [(0, 100), (400, 500), (800, 900)]
+    with pytest.raises(ValueError):
+        get_fold_ranges(times, 3, "purged", purge=2)
+
+
+def test_aggregate_fold_values():
+    """Given the losses of three folds, the trial value should be their mean, median or worst value"""
+    # Arrange
+    values = [1., 4., 2.]
+
+    # Act & Assert
+    assert aggregate(values, "mean") == pytest.approx(7 / 3)
+    assert aggregate(values, "median") == 2.
+    assert aggregate(values, "worst") == 4.
+    assert aggregate([(1., 5.), (3., 2.)], "worst", ["minimize", "maximize"]) == (3., 2.)
+
+
+def test_slice_signals():
+    """Given a time range, only the ticks within the range should be kept for every pair"""
+    # Arrange
+    frame = pd.DataFrame({"close": [1., 2., 3., 4.]}, index=[10, 20, 30, 40])
+    signals = {"COIN/BASE": {10: {"close": 1.}, 20: {"close": 2.}, 30: {"close": 3.}, 40: {"close": 4.}}}
+
+    # Act
+    frames, sliced = slice_signals({"COIN/BASE": frame}, signals, 20, 30)
+
+    # Assert
+    assert frames["COIN/BASE"].index.tolist() == [20, 30]
+    assert list(sliced["COIN/BASE"]) == [20, 30]
+
+
+def sum_of_fold(data: np.ndarray, fold: int) -> tuple:
+    return float(data[fold::4].sum()), os.getpid()
+
+
+def test_map_folds_on_pool_equals_serial():
+    """Given a fold pool, the folds should equal a serial evaluation and every trial should reuse its processes"""
+    # Arrange
+    evaluate = partial(sum_of_fold, np.arange(100.))
+
+    # Act
+    with create_fold_pool(4) as pool:
+        first_trial = map_folds(evaluate, 4, pool)
+        second_trial = map_folds(evaluate, 4, pool)
+        processes = set(pool._processes)
+    serial = map_folds(evaluate, 4)
+
+    # Assert
+    assert [value for value, _ in first_trial] == [value for value, _ in serial]
+    assert {pid for _, pid in first_trial + second_trial} <= processes
+    assert os.getpid() not in processes
+
+
+@pytest.mark.parametrize("aggregation, expected", [("mean", -(196.02 + 49.005) / 2), ("worst", -49.005)])
+def test_cross_validated_trial(aggregation, expected):
+    """Given a winning and a losing fold, the trial value should aggregate the loss of both folds"""
+    # Arrange
+    runner = create_runner(n_folds=2, aggregation=aggregation)
+
+    # Act
+    value = runner.run_hyperopt_iteration(FixedTrial({}))
+
+    # Assert
+    assert value == pytest.approx(expected)
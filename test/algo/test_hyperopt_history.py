@@ -0,0 +1,171 @@
+import sys
+
+import numpy as np
+import optuna
+import pandas as pd
+import pytest
+from optuna.distributions import CategoricalDistribution, IntUniformDistribution, UniformDistribution
+from optuna.trial import FixedTrial, TrialState
+
+from modules.algo.hyperopt.history import HistoryWriter, load_history, parameter_importance, sensitivity, \
+    trial_to_row, get_batch_metrics, create_history_writer, METRICS_ATTR
+from modules.algo.hyperopt.study import optimize
+from modules.stats.batch_tradingmodule import BatchResults
+from test.algo.test_hyperopt_folds import create_runner
+
+try:
+    import pyarrow
+except ImportError:  # not installed, or built against another numpy version
+    pyarrow = None
+
+SEARCH_SPACE = {'x': IntUniformDistribution(0, 9), 'y': UniformDistribution(0., 1.),
+                'side': CategoricalDistribution(['long', 'short'])}
+
+
+def objective(trial) -> float:
+    if trial.params['x'] == 0:
+        raise optuna.TrialPruned()
+    trial.set_user_attr(METRICS_ATTR, {'n_trades': float(trial.params['x'])})
+    return (trial.params['x'] - 3) ** 2 + trial.params['y']
+
+
+def create_history(n_trials: int = 200) -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    x = rng.integers(0, 10, n_trials)
+    y = rng.random(n_trials)
+    return pd.DataFrame({'number': np.arange(n_trials), 'state': 'COMPLETE', 'value': (x - 3) ** 2 + y,
+                         'params_x': x, 'params_y': y})
+
+
+def test_optimize_calls_callbacks_with_finished_trials():
+    """Given a callback, it should receive every finished trial, including pruned and duplicate trials"""
+    # Arrange
+    study = optuna.create_study(sampler=optuna.samplers.RandomSampler(seed=1))
+    finished = []
+
+    # Act
+    optimize(study, {'x': IntUniformDistribution(0, 3), 'y': CategoricalDistribution([0.])}, 12, objective,
+             callbacks=[lambda _, trial: finished.append(trial)])
+
+    # Assert
+    assert [trial.number for trial in finished] == list(range(12))
+    assert all(trial.state in (TrialState.COMPLETE, TrialState.PRUNED) for trial in finished)
+    assert any('duplicate_of' in trial.user_attrs for trial in finished)
+
+
+def test_trial_to_row():
+    """Given a finished trial, its row should hold the state, value, typed parameters and headline metrics"""
+    # Arrange
+    study = optuna.create_study()
+    asked = study.ask(SEARCH_SPACE)
+    asked.set_user_attr(METRICS_ATTR, {'n_trades': 4.})
+    study.tell(asked, 1.5)
+    trial = study.trials[0]
+
+    # Act
+    row = trial_to_row(trial, ['value'], {'x': 'int', 'y': 'float', 'side': 'string'})
+
+    # Assert
+    assert row['number'] == 0
+    assert row['state'] == 'COMPLETE'
+    assert row['value'] == 1.5
+    assert row['params_x'] == trial.params['x']
+    assert row['params_side'] in ('long', 'short')
+    assert row['n_trades'] == 4.
+    assert row['end_capital'] is None
+    assert row['duration'] >= 0
+
+
+def test_cross_validated_trial_metrics():
+    """Given two folds, the headline metrics of the trial should be the means over the folds"""
+    # Arrange
+    runner = create_runner(n_folds=2)
+    trial = FixedTrial({})
+
+    # Act
+    runner.run_hyperopt_iteration(trial)
+
+    # Assert
+    assert trial.user_attrs[METRICS_ATTR]['n_trades'] == 1.
+    assert trial.user_attrs[METRICS_ATTR]['end_capital'] == pytest.approx((196.02 + 49.005) / 2)
+
+
+def test_batch_metrics():
+    """Given the results of a batch, every candidate should get its own metrics"""
+    # Arrange
+    capital = np.array([[100., 100.], [80., 110.], [120., 105.]])
+    results = BatchResults(np.arange(3), capital, np.array([2, 1]), 100.)
+
+    # Act
+    metrics = get_batch_metrics(results)
+
+    # Assert
+    assert metrics[0] == {'end_capital': 120., 'overall_profit_percentage': pytest.approx(20.),
+                          'max_seen_drawdown': pytest.approx(-20.), 'n_trades': 2.}
+    assert metrics[1]['max_seen_drawdown'] == pytest.approx((105 / 110 - 1) * 100)
+
+
+def test_parameter_importance():
+    """Given an objective that mostly depends on x, x should be the most important parameter"""
+    # Arrange
+    history = create_history()
+
+    # Act
+    importance = parameter_importance(history)
+
+    # Assert
+    assert list(importance.index) == ['x', 'y']
+    assert importance['x'] > 0.9
+    assert importance['y'] < 0.1
+
+
+def test_sensitivity():
+    """Given a parameter with few values, the objective should be summarised per value of the parameter"""
+    # Arrange
+    history = create_history()
+    history.loc[0, 'state'] = 'PRUNED'
+
+    # Act
+    summary = sensitivity(history, 'x')
+
+    # Assert
+    assert list(summary.columns) == ['count', 'mean', 'median', 'min', 'max']
+    assert summary['count'].sum() == len(history) - 1
+    assert summary['mean'].idxmin() == 3
+
+
+def test_hyperopt_runs_without_history_when_pyarrow_is_missing(monkeypatch, tmp_path):
+    """Given hyperopt-history without an importable pyarrow, the history should be disabled and trials still run"""
+    # Arrange
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    runner = create_runner(n_folds=1)
+    runner.module.__dict__.update(hyperopt_history=True, hyperopt_trials=2, hyperopt_timeout=0, hyperopt_workers=1,
+                                  hyperopt_batch_size=1)
+    study = optuna.create_study()
+
+    # Act
+    writer = create_history_writer(study, SEARCH_SPACE, str(tmp_path))
+    runner.run_hyperopt(study)
+
+    # Assert
+    assert writer is None
+    assert len(study.trials) == 2
+    assert METRICS_ATTR in study.trials[0].user_attrs
+
+
+@pytest.mark.skipif(pyarrow is None, reason="pyarrow is not importable")
+def test_history_writer_round_trip(tmp_path):
+    """Given a study run with a history writer, the history should hold a row for every trial"""
+    # Arrange
+    study = optuna.create_study(sampler=optuna.samplers.RandomSampler(seed=1))
+
+    # Act
+    with HistoryWriter(study, SEARCH_SPACE, str(tmp_path), flush_every=4) as history:
+        optimize(study, SEARCH_SPACE, 10, objective, callbacks=[history])
+    loaded = load_history(str(tmp_path / f"{study.study_name}-trials"))
+
+    # Assert
+    assert list(loaded['number']) == list(range(10))
+    assert set(loaded['params_side']) <= {'long', 'short'}
+    completed = loaded[loaded['state'] == 'COMPLETE']
+    assert (completed['n_trades'] == completed['params_x']).all()
@@ -0,0 +1,121 @@
+import pickle
+
+import pytest
+from optuna.trial import FixedTrial
+
+from backtesting.strategy import Strategy
+from modules.algo.hyperopt.hyperopt_strategy import inject_hyperopt_parameters, set_trial, get_search_space
+from modules.algo.hyperopt.parameter_snapshot import ParameterSnapshot
+from modules.algo.hyperopt.parameters.integer_parameter import IntegerParameter
+from modules.public.hyperopt_parameter import integer_parameter, float_parameter, categorical_parameter
+
+
+class ParameterStrategy(Strategy):
+    buy_rsi = integer_parameter(30, 10, 50)
+    stoploss_ratio = float_parameter(0.9, 0.5, 1., 0.1)
+    side = categorical_parameter("long", ["long", "short"])
+
+    def generate_indicators(self, dataframe):
+        return dataframe
+
+
+class CountingTrial(FixedTrial):
+    def __init__(self, params: dict):
+        super().__init__(params)
+        self.suggestions = 0
+
+    def suggest_int(self, name, low, high, step=1, log=False):
+        self.suggestions += 1
+        return super().suggest_int(name, low, high, step=step, log=log)
+
+
+def test_injected_strategy_has_default_parameters():
+    """Given a strategy without trial, every parameter should hold its default value"""
+    # Arrange
+    strategy = ParameterStrategy()
+
+    # Act
+    inject_hyperopt_parameters(strategy)
+
+    # Assert
+    assert strategy.parameters == {"buy_rsi": 30, "stoploss_ratio": 0.9, "side": "long"}
+    assert (strategy.buy_rsi, strategy.stoploss_ratio, strategy.side) == (30, 0.9, "long")
+
+
+def test_set_trial_resolves_every_parameter_type():
+    """Given a trial, integer, float and categorical parameters should take the values of the trial"""
+    # Arrange
+    strategy = ParameterStrategy()
+
+    # Act
+    set_trial(strategy, FixedTrial({"buy_rsi": 20, "stoploss_ratio": 0.7, "side": "short"}))
+
+    # Assert
+    assert (strategy.buy_rsi, strategy.stoploss_ratio, strategy.side) == (20, 0.7, "short")
+    assert strategy.trial.params == {"buy_rsi": 20, "stoploss_ratio": 0.7, "side": "short"}
+
+
+def test_parameters_are_resolved_once_per_trial():
+    """Given repeated reads of a parameter, the trial should only be asked for it once"""
+    # Arrange
+    strategy = ParameterStrategy()
+    trial = CountingTrial({"buy_rsi": 20, "stoploss_ratio": 0.7, "side": "short"})
+
+    # Act
+    set_trial(strategy, trial)
+    values = [strategy.buy_rsi for _ in range(100)]
+
+    # Assert
+    assert values == [20] * 100
+    assert trial.suggestions == 1
+
+
+def test_instances_do_not_share_parameters():
+    """Given two instances with different trials, each should keep its own values and the class is unchanged"""
+    # Arrange
+    first, second = ParameterStrategy(), ParameterStrategy()
+
+    # Act
+    set_trial(first, FixedTrial({"buy_rsi": 11, "stoploss_ratio": 0.5, "side": "short"}))
+    set_trial(second, FixedTrial({"buy_rsi": 49, "stoploss_ratio": 1., "side": "long"}))
+
+    # Assert
+    assert (first.buy_rsi, second.buy_rsi) == (11, 49)
+    assert isinstance(ParameterStrategy.__dict__["buy_rsi"], IntegerParameter)
+    assert set(get_search_space(first)) == {"buy_rsi", "stoploss_ratio", "side"}
+
+
+def test_parameters_are_not_stored_on_the_instance():
+    """Given several trials, parameter values should only live in the snapshot and follow the current trial"""
+    # Arrange
+    strategy = ParameterStrategy()
+    set_trial(strategy, FixedTrial({"buy_rsi": 11, "stoploss_ratio": 0.5, "side": "short"}))
+
+    # Act
+    set_trial(strategy, None)
+
+    # Assert
+    assert strategy.buy_rsi == 30
+    assert not {"buy_rsi", "stoploss_ratio", "side"} & set(vars(strategy))
+    assert get_search_space(strategy)["buy_rsi"].low == 10
+    assert ParameterStrategy().side == "long"
+
+
+def test_parameter_snapshot_is_immutable_and_hashable():
+    """Given snapshots with the same values, they should be equal, hash alike, pickle and refuse changes"""
+    # Arrange
+    snapshot = ParameterSnapshot({"a": 1, "b": "x"})
+
+    # Act
+    same = ParameterSnapshot({"b": "x", "a": 1})
+    restored = pickle.loads(pickle.dumps(snapshot))
+
+    # Assert
+    assert snapshot == same and hash(snapshot) == hash(same)
+    assert restored == snapshot and hash(restored) == hash(snapshot)
+    assert snapshot != ParameterSnapshot({"a": 2, "b": "x"})
+    assert {snapshot: "cached"}[same] == "cached"
+    with pytest.raises(TypeError):
+        snapshot["a"] = 2
+    with pytest.raises(AttributeError):
+        snapshot._values = {}
@@ -0,0 +1,125 @@
+import numpy as np
+import optuna
+import pytest
+from optuna.distributions import IntUniformDistribution
+from optuna.trial import TrialState
+
+from backtesting.strategy import Strategy
+from modules.algo.hyperopt.hyperopt_strategy import set_trial
+from modules.algo.hyperopt.pruning import Checkpoints, get_checkpoint_rows, create_pruner
+from modules.algo.hyperopt.study import optimize
+from test.algo.test_hyperopt_folds import create_runner
+from test.stats.stats_test_utils import StatsFixture
+
+DAY_MS = 24 * 3600 * 1000
+
+
+class RecordingTrial:
+    def __init__(self, prune_at_step: int = None):
+        self.reports = []
+        self.prune_at_step = prune_at_step
+
+    def report(self, value: float, step: int) -> None:
+        self.reports.append((step, value))
+
+    def should_prune(self) -> bool:
+        return self.prune_at_step is not None and self.reports[-1][0] >= self.prune_at_step
+
+
+def create_fixture(n_candles: int = 10) -> StatsFixture:
+    fixture = StatsFixture(['COIN/BASE'])
+    for i in range(n_candles):
+        fixture.frame_with_signals['COIN/BASE'].add_entry(open=1, high=1, low=1, close=1, buy=int(i == 0))
+    return fixture
+
+
+def test_checkpoint_rows():
+    """Given candles or months as interval, checkpoints should follow every interval but the last row"""
+    # Arrange
+    times = 1609459200000 + np.arange(90) * DAY_MS  # 2021-01-01 until 2021-03-31
+
+    # Act
+    every_candles = get_checkpoint_rows(times, "30")
+    every_month = get_checkpoint_rows(times, "month")
+
+    # Assert
+    assert list(every_candles) == [29, 59]
+    assert len(every_month) == 2
+    assert all(np.diff(times.astype('datetime64[ms]').astype('datetime64[M]'))[every_month] > np.timedelta64(0))
+
+
+def test_analyze_reports_checkpoints():
+    """Given a checkpoint every 3 candles, the backtest should report the loss after candle 3, 6 and 9"""
+    # Arrange
+    fixture = create_fixture()
+    trial = RecordingTrial()
+    stats_module = fixture.create()
+    checkpoints = Checkpoints(trial, "3", lambda: 0.5)
+
+    # Act
+    checkpoints.start(stats_module.tick_times())
+    stats_module.analyze(checkpoints.after_row)
+
+    # Assert
+    assert trial.reports == [(1, 0.5), (2, 0.5), (3, 0.5)]
+
+
+def test_analyze_stops_pruned_trial():
+    """Given a pruner that rejects the trial at the second checkpoint, the backtest should stop there"""
+    # Arrange
+    fixture = create_fixture()
+    trial = RecordingTrial(prune_at_step=2)
+    stats_module = fixture.create()
+    checkpoints = Checkpoints(trial, "3", lambda: 0.5)
+
+    # Act
+    checkpoints.start(stats_module.tick_times())
+    with pytest.raises(optuna.TrialPruned):
+        stats_module.analyze(checkpoints.after_row)
+
+    # Assert
+    assert len(trial.reports) == 2
+    assert max(stats_module.trading_module.capital_per_timestamp) == 6
+
+
+def test_optimize_marks_pruned_trials():
+    """Given an objective that is pruned, optimize should store the trial as pruned and continue"""
+    # Arrange
+    study = optuna.create_study(pruner=create_pruner("median"))
+
+    def objective(trial) -> float:
+        trial.report(trial.params['x'], 1)
+        if trial.params['x'] > 2:
+            raise optuna.TrialPruned()
+        return trial.params['x']
+
+    # Act
+    optimize(study, {'x': IntUniformDistribution(0, 4)}, 20, objective)
+
+    # Assert
+    states = {trial.state for trial in study.trials}
+    assert TrialState.PRUNED in states
+    assert len(study.trials) == 20
+    assert study.best_value <= 2
+
+
+
+def report_intermediate_losses(direction: str) -> list:
+    runner = create_runner(n_folds=1)
+    runner.module.__dict__.update(hyperopt_pruner="median", hyperopt_checkpoint="1", hyperopt_directions=[direction])
+    runner.strategy.intermediate_loss = lambda capital, start: Strategy.intermediate_loss(None, capital, start)
+    trial = RecordingTrial()
+    set_trial(runner.strategy, trial)
+    runner.run_backtest(trial)
+    return [value for _, value in trial.reports]
+
+
+def test_intermediate_loss_follows_study_direction():
+    """Given a maximizing study, the lower-is-better intermediate loss should be reported negated"""
+    # Act
+    minimized = report_intermediate_losses("minimize")
+    maximized = report_intermediate_losses("maximize")
+
+    # Assert
+    assert min(minimized) < 0 < max(minimized)
+    assert maximized == pytest.approx([-loss for loss in minimized])
@@ -0,0 +1,83 @@
+import time
+
+import numpy as np
+import optuna
+import pytest
+from optuna.distributions import IntUniformDistribution, CategoricalDistribution, DiscreteUniformDistribution, \
+    UniformDistribution
+
+from modules.algo.hyperopt.samplers import create_sampler, SAMPLERS
+from modules.algo.hyperopt.study import optimize
+
+SEARCH_SPACE = {'x': IntUniformDistribution(0, 3), 'y': CategoricalDistribution(['a', 'b']),
+                'z': DiscreteUniformDistribution(0., 1., 0.5)}
+
+
+def objective(trial) -> float:
+    return trial.params['x'] + (trial.params['y'] == 'b') + trial.params['z']
+
+
+@pytest.mark.parametrize('name', [name for name in SAMPLERS if name != 'nsga2'])
+def test_samplers_find_minimum(name):
+    """Given a small stepped search space, every single-objective sampler should find the minimum"""
+    # Arrange
+    study = optuna.create_study(sampler=create_sampler(name, SEARCH_SPACE, seed=1))
+
+    # Act
+    optimize(study, SEARCH_SPACE, 80, objective)
+
+    # Assert
+    assert study.best_value == 0
+
+
+def test_qmc_sampler_spreads_trials_evenly():
+    """Given 16 quasi-random trials on [0, 1), no gap between neighbouring values should exceed 3/32"""
+    # Arrange
+    search_space = {'u': UniformDistribution(0., 1.)}
+    study = optuna.create_study(sampler=create_sampler('qmc', search_space, seed=3))
+    same_seed = optuna.create_study(sampler=create_sampler('qmc', search_space, seed=3))
+
+    # Act
+    optimize(study, search_space, 16, lambda trial: trial.params['u'])
+    optimize(same_seed, search_space, 16, lambda trial: trial.params['u'])
+
+    # Assert
+    values = np.sort([trial.params['u'] for trial in study.trials])
+    gaps = np.diff(np.concatenate([values, [values[0] + 1]]))
+    assert gaps.max() <= 3 / 32 + 1e-9
+    assert [trial.params for trial in study.trials] == [trial.params for trial in same_seed.trials]
+
+
+def test_grid_sampler_stops_when_exhausted():
+    """Given a grid of 24 points, the grid sampler should stop after evaluating every point once"""
+    # Arrange
+    study = optuna.create_study(sampler=create_sampler('grid', SEARCH_SPACE))
+
+    # Act
+    optimize(study, SEARCH_SPACE, 100, objective)
+
+    # Assert
+    assert len(study.trials) == 24
+    assert len({tuple(sorted(trial.params.items())) for trial in study.trials}) == 24
+
+
+def test_grid_sampler_needs_steps():
+    """Given a continuous parameter, the grid sampler should not be created"""
+    with pytest.raises(ValueError):
+        create_sampler('grid', {'x': UniformDistribution(0, 1)})
+
+
+def test_timeout_stops_asking():
+    """Given a timeout shorter than the trials, optimize should stop asking new trials after the timeout"""
+    # Arrange
+    study = optuna.create_study(sampler=create_sampler('random', SEARCH_SPACE, seed=1))
+
+    def slow_objective(trial) -> float:
+        time.sleep(0.05)
+        return objective(trial)
+
+    # Act
+    optimize(study, SEARCH_SPACE, 1000, slow_objective, timeout=0.2)
+
+    # Assert
+    assert 1 <= len(study.trials) < 20
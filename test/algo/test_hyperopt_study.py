@@ -0,0 +1,129 @@
+import json
+
+import optuna
+from optuna.distributions import IntUniformDistribution
+
+from modules.algo.hyperopt.study import load_or_create_study, optimize, export_best_trials, get_storage_url, \
+    resolve_storage_url, print_best_trials
+
+SEARCH_SPACE = {'x': IntUniformDistribution(0, 4), 'y': IntUniformDistribution(0, 4)}
+
+
+class CountingObjective:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, trial) -> float:
+        self.calls += 1
+        return (trial.params['x'] - 2) ** 2 + trial.params['y']
+
+
+def test_resume_study_appends_trials(tmp_path):
+    """Given a stored study, loading it by name again should resume it and append new trials"""
+    # Arrange
+    storage_url = get_storage_url(str(tmp_path))
+    study = load_or_create_study('resume', storage_url)
+    optimize(study, SEARCH_SPACE, 3, CountingObjective())
+
+    # Act
+    resumed = load_or_create_study('resume', storage_url)
+    optimize(resumed, SEARCH_SPACE, 2, CountingObjective())
+
+    # Assert
+    assert len(resumed.trials) == 5
+    assert [trial.number for trial in resumed.trials] == [0, 1, 2, 3, 4]
+
+
+def test_study_without_storage_stays_in_memory():
+    """Given no storage and no study to resume, the study should be kept in memory"""
+    # Arrange
+    storage_url = resolve_storage_url("", "")
+
+    # Act
+    study = load_or_create_study('memory', storage_url)
+
+    # Assert
+    assert storage_url == ""
+    assert isinstance(study._storage, optuna.storages.InMemoryStorage)
+    assert resolve_storage_url("postgresql://host/db", "named") == "postgresql://host/db"
+
+
+def test_duplicate_parameters_are_not_simulated_again():
+    """Given a search space smaller than the number of trials, every parameter set should be simulated once"""
+    # Arrange
+    study = optuna.create_study(study_name='duplicates')
+    objective = CountingObjective()
+
+    # Act
+    optimize(study, SEARCH_SPACE, 60, objective)
+
+    # Assert
+    unique = {tuple(sorted(trial.params.items())) for trial in study.trials}
+    duplicates = [trial for trial in study.trials if 'duplicate_of' in trial.user_attrs]
+    assert len(study.trials) == 60
+    assert objective.calls == len(unique)
+    assert len(duplicates) == 60 - len(unique)
+    for trial in duplicates:
+        assert trial.value == study.trials[trial.user_attrs['duplicate_of']].value
+
+
+def test_export_best_trials(tmp_path):
+    """Given a finished study, the best trial should be written to <study>-best.json"""
+    # Arrange
+    study = optuna.create_study(study_name='export')
+    optimize(study, SEARCH_SPACE, 10, CountingObjective())
+
+    # Act
+    path = export_best_trials(study, str(tmp_path))
+
+    # Assert
+    with open(path) as f:
+        exported = json.load(f)
+    assert path.endswith('export-best.json')
+    assert exported['best_trials'] == [{'number': study.best_trial.number, 'values': [study.best_value],
+                                        'params': study.best_params}]
+    assert exported['n_trials'] == 10
+
+
+def test_study_without_completed_trials(tmp_path, capsys):
+    """Given a study of which every trial was pruned, reporting should not fail and export no best trials"""
+    # Arrange
+    study = optuna.create_study(study_name='pruned')
+
+    def objective(trial):
+        raise optuna.TrialPruned()
+
+    optimize(study, SEARCH_SPACE, 3, objective)
+
+    # Act
+    print_best_trials(study)
+    path = export_best_trials(study, str(tmp_path))
+
+    # Assert
+    assert "no completed trials" in capsys.readouterr().out
+    with open(path) as f:
+        exported = json.load(f)
+    assert exported['best_trials'] == []
+    assert exported['n_trials'] == 3
+
+
+def test_multi_objective_study_exports_pareto_front(tmp_path):
+    """Given two conflicting objectives, the export should hold the non-dominated trials only"""
+    # Arrange
+    study = optuna.create_study(study_name='pareto', directions=['minimize', 'minimize'])
+
+    def objective(trial):
+        return trial.params['x'], 4 - trial.params['x'] + trial.params['y']
+
+    # Act
+    optimize(study, SEARCH_SPACE, 30, objective)
+    path = export_best_trials(study, str(tmp_path))
+
+    # Assert
+    with open(path) as f:
+        exported = json.load(f)
+    assert exported['directions'] == ['minimize', 'minimize']
+    assert exported['best_trials']
+    for best in exported['best_trials']:
+        assert not any(all(a <= b for a, b in zip(trial.values, best['values'])) and trial.values != best['values']
+                       for trial in study.trials)
@@ -0,0 +1,68 @@
+import numpy as np
+import optuna
+import pandas as pd
+import pytest
+
+from modules.algo.hyperopt.study import load_or_create_study, get_storage_url
+from modules.algo.hyperopt.worker import get_data_fingerprint, check_data_fingerprint, get_worker_study_name, \
+    FINGERPRINT_ATTRIBUTE
+
+
+def create_frames(close_offset: float = 0.) -> dict:
+    times = np.arange(20, dtype=np.int64) * 60000
+    frame = pd.DataFrame({'open': np.arange(20.), 'high': np.arange(20.) + 1, 'low': np.arange(20.) - 1,
+                          'close': np.arange(20.) + close_offset, 'volume': 1., 'pair': 'COIN/BASE'}, index=times)
+    return {'COIN/BASE': frame}
+
+
+def test_fingerprint_ignores_strategy_columns():
+    """Given the same candles with populated indicators, the fingerprint should not change"""
+    # Arrange
+    frames = create_frames()
+    populated = create_frames()
+    populated['COIN/BASE']['ema'] = 1.
+    populated['COIN/BASE']['buy'] = 0
+
+    # Act
+    fingerprint = get_data_fingerprint(frames)
+    populated_fingerprint = get_data_fingerprint(populated)
+
+    # Assert
+    assert fingerprint == populated_fingerprint
+    assert fingerprint != get_data_fingerprint(create_frames(close_offset=.5))
+
+
+def test_worker_with_different_data_cannot_join_study(tmp_path):
+    """Given a study created on one data cache, a worker with other candles should refuse to start"""
+    # Arrange
+    storage_url = get_storage_url(str(tmp_path))
+    fingerprint = get_data_fingerprint(create_frames())
+    other_fingerprint = get_data_fingerprint(create_frames(close_offset=.5))
+    study = load_or_create_study('shared', storage_url, {FINGERPRINT_ATTRIBUTE: fingerprint})
+
+    # Act
+    joined = load_or_create_study('shared', storage_url, {FINGERPRINT_ATTRIBUTE: other_fingerprint})
+
+    # Assert
+    check_data_fingerprint(study, fingerprint)
+    with pytest.raises(Exception, match='does not match'):
+        check_data_fingerprint(joined, other_fingerprint)
+    assert joined.user_attrs[FINGERPRINT_ATTRIBUTE] == fingerprint
+
+
+def test_study_without_fingerprint_is_refused():
+    """Given a study that was created without a fingerprint, a worker should not record its own and start"""
+    # Arrange
+    study = optuna.create_study(study_name='unchecked')
+
+    # Act & Assert
+    with pytest.raises(Exception, match='no data fingerprint'):
+        check_data_fingerprint(study, get_data_fingerprint(create_frames()), timeout=0)
+    assert FINGERPRINT_ATTRIBUTE not in study.user_attrs
+
+
+def test_worker_needs_study_name():
+    """Given no study name, a worker should not generate one as it could not meet the other workers"""
+    with pytest.raises(Exception):
+        get_worker_study_name("")
+    assert get_worker_study_name("shared") == "shared"
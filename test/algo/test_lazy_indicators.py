@@ -0,0 +1,115 @@
+import pandas as pd
+import pytest
+
+from modules.algo.indicators.lazy_resolver import LazyIndicatorResolver
+from modules.public.indicator import indicator
+
+
+class LazyStrategy:
+
+    def __init__(self):
+        self.calls = []
+
+    @indicator(cached=True)
+    def double(self, dataframe):
+        self.calls.append("double")
+        return dataframe["close"] * 2
+
+    @indicator("double", cached=True)
+    def quadruple(self, dataframe):
+        self.calls.append("quadruple")
+        return dataframe["double"] * 2
+
+    @indicator()
+    def unused(self, dataframe):
+        self.calls.append("unused")
+        return dataframe["close"] * 0
+
+    @indicator()
+    def uncached(self, dataframe):
+        self.calls.append("uncached")
+        return dataframe["close"] + 1
+
+    @staticmethod
+    def buy_signal(dataframe):
+        dataframe.loc[dataframe["quadruple"] > 4, "buy"] = 1
+        return dataframe
+
+    @staticmethod
+    def sell_signal(dataframe):
+        dataframe.loc[dataframe["uncached"] > 3, "sell"] = 1
+        return dataframe
+
+
+def create_frame():
+    return pd.DataFrame({"close": [1., 2., 3.], "buy": [0, 0, 0], "sell": [0, 0, 0]})
+
+
+def run_signals(resolver, strategy, pair="COIN/BASE"):
+    frame = resolver.prepare(pair, create_frame())
+    frame = resolver.call(pair, strategy.buy_signal, frame)
+    return resolver.call(pair, strategy.sell_signal, frame)
+
+
+def test_only_consumed_indicators_are_computed():
+    """Given lazy indicators, only the ones read by signals (and their dependencies) should be computed"""
+    # Arrange
+    strategy = LazyStrategy()
+    resolver = LazyIndicatorResolver(strategy)
+
+    # Act
+    frame = run_signals(resolver, strategy)
+
+    # Assert
+    assert "unused" not in strategy.calls
+    assert "unused" not in frame.columns
+    assert list(frame["buy"]) == [0, 1, 1]
+    assert list(frame["sell"]) == [0, 0, 1]
+
+
+def test_cached_indicators_are_computed_once_per_pair():
+    """Given repeated runs, cached indicators should be computed once per pair, uncached ones every run"""
+    # Arrange
+    strategy = LazyStrategy()
+    resolver = LazyIndicatorResolver(strategy)
+
+    # Act
+    run_signals(resolver, strategy)
+    run_signals(resolver, strategy)
+    run_signals(resolver, strategy, pair="COIN2/BASE")
+
+    # Assert
+    assert strategy.calls.count("double") == 2
+    assert strategy.calls.count("quadruple") == 2
+    assert strategy.calls.count("uncached") == 3
+
+
+def test_requested_plot_indicators_are_computed():
+    """Given plot indicators, registered lazy indicators should be computed up front"""
+    # Arrange
+    strategy = LazyStrategy()
+    resolver = LazyIndicatorResolver(strategy)
+
+    # Act
+    frame = resolver.prepare("COIN/BASE", create_frame(), ["unused", "volume"])
+
+    # Assert
+    assert "unused" in frame.columns
+    assert "volume" not in frame.columns
+
+
+def test_key_errors_of_other_columns_are_raised():
+    """Given a signal that reads a column that is no lazy indicator, its KeyError should be raised without retry"""
+    # Arrange
+    strategy = LazyStrategy()
+    resolver = LazyIndicatorResolver(strategy)
+    calls = []
+
+    def buy_signal(dataframe):
+        calls.append(1)
+        return dataframe["missing"]
+
+    # Act & Assert
+    with pytest.raises(KeyError, match="missing"):
+        resolver.call("COIN/BASE", buy_signal, create_frame())
+    assert calls == [1]
@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting.strategy import Strategy
+from modules.algo.backtesting import BackTesting
+from modules.algo.indicators.panel import OHLCVPanel, has_panel_hook
+
+
+class PanelStrategy(Strategy):
+
+    def generate_panel_indicators(self, panel):
+        return {"close_sum": np.nancumsum(panel.close, axis=0)}
+
+    def generate_indicators(self, dataframe):
+        dataframe["double_sum"] = dataframe["close_sum"] * 2
+        return dataframe
+
+    def buy_signal(self, dataframe):
+        dataframe["buy"] = 0
+        return dataframe
+
+    def sell_signal(self, dataframe):
+        dataframe["sell"] = 0
+        return dataframe
+
+
+class PlainStrategy(PanelStrategy):
+    generate_panel_indicators = Strategy.generate_panel_indicators
+
+
+def create_frame(times, close):
+    close = np.asarray(close, dtype=float)
+    return pd.DataFrame({"time": times, "open": close, "high": close, "low": close, "close": close,
+                         "volume": np.ones(len(close))}, index=pd.Index(times, name="index"))
+
+
+def create_config():
+    return SimpleNamespace(starting_capital=1000, currency_symbol="EUR", backtesting_from=0, backtesting_to=0,
+                           stoploss_type="standard", stoploss=-5, plots=False)
+
+
+def test_panel_aligns_pairs_on_shared_time_axis():
+    """Given pairs with different candles, the panel should stack them on the union of timestamps"""
+    # Arrange
+    frames = {"AAA/EUR": create_frame([0, 1, 2, 3], [1, 2, 3, 4]), "BBB/EUR": create_frame([2, 3], [10, 20])}
+
+    # Act
+    panel = OHLCVPanel.from_pair_frames(frames)
+
+    # Assert
+    assert panel.shape == (4, 2)
+    assert np.array_equal(panel.close[:, 0], [1, 2, 3, 4])
+    assert np.array_equal(panel.close[:, 1], [np.nan, np.nan, 10, 20], equal_nan=True)
+    assert not panel.close.flags.writeable
+
+
+def test_scatter_returns_pair_frames_on_original_index():
+    """Given (time x pair) indicator arrays, scatter should split them per pair on each pair's own index"""
+    # Arrange
+    frames = {"AAA/EUR": create_frame([0, 1, 2, 3], [1, 2, 3, 4]), "BBB/EUR": create_frame([2, 3], [10, 20])}
+    panel = OHLCVPanel.from_pair_frames(frames)
+
+    # Act
+    per_pair = panel.scatter({"double": panel.close * 2})
+
+    # Assert
+    assert per_pair["AAA/EUR"]["double"].tolist() == [2, 4, 6, 8]
+    assert per_pair["BBB/EUR"]["double"].tolist() == [20, 40]
+    assert per_pair["BBB/EUR"].index.tolist() == [2, 3]
+    with pytest.raises(ValueError):
+        panel.scatter({"wrong": np.zeros(3)})
+
+
+def test_panel_indicators_are_available_in_generate_indicators():
+    """Given a strategy with the panel hook, its columns should be populated before generate_indicators"""
+    # Arrange
+    frames = {"AAA/EUR": create_frame([0, 1, 2], [1, 2, 3]), "BBB/EUR": create_frame([0, 1, 2], [5, 5, 5])}
+    strategy = PanelStrategy()
+    backtesting = BackTesting(frames, create_config(), strategy, {},
+                              ohlcv_panel=OHLCVPanel.from_pair_frames(frames))
+
+    # Act
+    data_dict = backtesting.populate_signals()
+
+    # Assert
+    assert has_panel_hook(strategy)
+    assert not has_panel_hook(PlainStrategy())
+    assert [row["double_sum"] for row in data_dict["AAA/EUR"].values()] == [2, 6, 12]
+    assert [row["double_sum"] for row in data_dict["BBB/EUR"].values()] == [10, 20, 30]
@@ -0,0 +1,97 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+import optuna
+import pandas as pd
+from optuna.distributions import IntUniformDistribution, UniformDistribution
+
+from modules.algo.hyperopt.parallel import optimize_in_pool
+from modules.algo.hyperopt.shared_data import SharedFrames, SharedFramesDescriptor
+
+
+def create_frames() -> dict:
+    frames = {}
+    for i, pair in enumerate(['COIN/BASE', 'COIN2/BASE']):
+        times = np.arange(50, dtype=np.int64) * 60000
+        frame = pd.DataFrame({'time': times, 'open': np.arange(50.) + i, 'high': np.arange(50.) + i + 1,
+                              'low': np.arange(50.) + i - 1, 'close': np.arange(50.) + i, 'volume': 1.,
+                              'pair': pair, 'buy': np.nan, 'sell': np.nan}, index=times)
+        frame.index.name = 'index'
+        frames[pair] = frame
+    return frames
+
+
+def sum_of_closes(descriptor: SharedFramesDescriptor) -> dict:
+    shared = SharedFrames.attach(descriptor)
+    sums = {pair: frame['close'].sum() for pair, frame in shared.frames().items()}
+    shared.close()
+    return sums
+
+
+offset = 0
+
+
+def init_worker(value: int) -> None:
+    global offset
+    offset = value
+
+
+def quadratic(params: dict) -> tuple:
+    return (params['x'] - 3) ** 2 + params['y'] + offset, {'offset': offset}
+
+
+def test_shared_frames_round_trip():
+    """Given frames in shared memory, an attached process should rebuild identical frames"""
+    # Arrange
+    frames = create_frames()
+    shared = SharedFrames.create(frames)
+
+    # Act
+    attached = SharedFrames.attach(shared.descriptor)
+    rebuilt = attached.frames()
+
+    # Assert
+    for pair, frame in frames.items():
+        pd.testing.assert_frame_equal(rebuilt[pair], frame)
+        layout = attached.descriptor.layouts[pair]
+        for block in layout.blocks:
+            values = attached.block_array(layout, block)
+            assert all(np.shares_memory(rebuilt[pair][column].to_numpy(), values) for column in block.columns)
+        assert np.shares_memory(rebuilt[pair].index.to_numpy(), attached.index_array(layout))
+        assert not rebuilt[pair]['close'].to_numpy().flags.writeable
+    del rebuilt
+    attached.close()
+    shared.unlink()
+
+
+def test_shared_frames_in_spawned_process():
+    """Given frames in shared memory, a spawned worker should read them without receiving the data"""
+    # Arrange
+    frames = create_frames()
+    shared = SharedFrames.create(frames)
+
+    # Act
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        sums = pool.submit(sum_of_closes, shared.descriptor).result()
+    shared.unlink()
+
+    # Assert
+    assert sums == {pair: frame['close'].sum() for pair, frame in frames.items()}
+
+
+def test_optimize_in_pool():
+    """Given a pool of workers, every trial should be evaluated by an initialized worker and told to the study"""
+    # Arrange
+    study = optuna.create_study(sampler=optuna.samplers.RandomSampler(seed=1))
+    search_space = {'x': IntUniformDistribution(0, 6), 'y': UniformDistribution(0, 1)}
+
+    # Act
+    optimize_in_pool(study, search_space, n_trials=8, n_workers=2, initializer=init_worker, initargs=(10,),
+                     evaluate=quadratic)
+
+    # Assert
+    assert len(study.trials) == 8
+    for trial in study.trials:
+        assert trial.value == (trial.params['x'] - 3) ** 2 + trial.params['y'] + 10
+        assert trial.user_attrs == {'offset': 10}
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+from modules.algo.indicators import streaming
+from modules.setup.config import qtpylib_methods as qtpylib
+
+SEED_LENGTH = 100
+
+
+def create_bars(length=600, seed=1) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, length)))
+    return pd.DataFrame({
+        'high': close * (1 + rng.uniform(0, 0.01, length)),
+        'low': close * (1 - rng.uniform(0, 0.01, length)),
+        'close': close,
+        'volume': rng.uniform(1, 100, length)
+    })
+
+
+def stream_prices(indicator, series: pd.Series) -> list:
+    """Seed on the first candles, then update candle by candle"""
+    indicator.seed(series.iloc[:SEED_LENGTH])
+    return [indicator.update(price) for price in series.iloc[SEED_LENGTH:]]
+
+
+def stream_bars(indicator, bars: pd.DataFrame) -> list:
+    indicator.seed(bars.iloc[:SEED_LENGTH])
+    return [indicator.update_candle(row) for row in bars.iloc[SEED_LENGTH:].to_dict('records')]
+
+
+def assert_parity(streamed, batch):
+    assert np.allclose(np.asarray(streamed, dtype=float), np.asarray(batch, dtype=float)[SEED_LENGTH:],
+                       rtol=1e-9, equal_nan=True)
+
+
+def test_ema_sma_parity():
+    """Given a seeded EMA and SMA, bar-by-bar values should equal the batch versions"""
+    close = create_bars()['close']
+
+    assert_parity(stream_prices(streaming.EMA(21), close), qtpylib.wma(close, 21))
+    assert_parity(stream_prices(streaming.SMA(21), close), qtpylib.sma(close, 21))
+
+
+def test_rsi_parity():
+    """Given a seeded RSI, bar-by-bar values should equal the batch version"""
+    close = create_bars()['close']
+
+    assert_parity(stream_prices(streaming.RSI(14), close), qtpylib.rsi(close, 14))
+
+
+def test_rsi_seeded_with_short_history():
+    """Given less history than the RSI seed needs, values should match once enough prices are seen"""
+    close = create_bars()['close']
+    indicator = streaming.RSI(14).seed(close.iloc[:5])
+
+    streamed = [indicator.update(price) for price in close.iloc[5:]]
+
+    assert np.allclose(streamed[20:], qtpylib.rsi(close, 14).iloc[25:])
+
+
+def test_atr_parity():
+    """Given a seeded ATR, bar-by-bar values should equal the batch version"""
+    bars = create_bars()
+
+    assert_parity(stream_bars(streaming.ATR(14), bars), qtpylib.atr(bars, 14))
+    assert_parity(stream_bars(streaming.ATR(14, exp=True), bars), qtpylib.atr(bars, 14, exp=True))
+
+
+def test_macd_parity():
+    """Given a seeded MACD, bar-by-bar values should equal the batch version"""
+    close = create_bars()['close']
+    batch = qtpylib.macd(close, 12, 26, 9)
+
+    streamed = pd.DataFrame(stream_prices(streaming.MACD(12, 26, 9), close))
+
+    assert_parity(streamed['macd'], batch['macd'])
+    assert_parity(streamed['signal'], batch['signal'])
+    assert_parity(streamed['histogram'], batch['histogram'])
+
+
+def test_bollinger_bands_parity():
+    """Given seeded Bollinger bands, bar-by-bar values should equal the batch version"""
+    close = create_bars()['close']
+    batch = qtpylib.bollinger_bands(close, 20, 2)
+
+    streamed = pd.DataFrame(stream_prices(streaming.BollingerBands(20, 2), close))
+
+    for column in ['upper', 'mid', 'lower']:
+        assert_parity(streamed[column], batch[column])
+
+
+def test_vwap_parity():
+    """Given a seeded VWAP, bar-by-bar values should equal the batch version"""
+    bars = create_bars()
+
+    assert_parity(stream_bars(streaming.VWAP(), bars), qtpylib.vwap(bars))
+
+
+def test_stochastic_parity():
+    """Given a seeded stochastic, bar-by-bar values should equal the batch version"""
+    bars = create_bars()
+
+    for fast, columns in [(True, ['fast_k', 'fast_d']), (False, ['slow_k', 'slow_d'])]:
+        batch = qtpylib.stoch(bars, 14, 3, 3, fast=fast)
+        streamed = pd.DataFrame(stream_bars(streaming.Stochastic(14, 3, 3, fast=fast), bars))
+
+        assert_parity(streamed['k'], batch[columns[0]])
+        assert_parity(streamed['d'], batch[columns[1]])
+
+
+def test_window_mean_evicts_nan_and_infinite_values():
+    """Given NaN and infinite values, the mean should be NaN or infinite only while they are in the window"""
+    values = [1., np.nan, 2., 3., 4., np.inf, 5., 6., 7., -np.inf, np.inf, 8., 9., 10.]
+    window_mean = streaming.WindowMean(3)
+
+    means = [window_mean.add(value) for value in values]
+
+    expected = [np.nan, np.nan, np.nan, np.nan, 3., np.inf, np.inf, np.inf, 6., -np.inf, np.nan, np.nan, np.inf, 9.]
+    np.testing.assert_array_equal(means, expected)
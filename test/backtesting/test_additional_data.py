@@ -0,0 +1,120 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from backtesting.additional_data import AdditionalDataJoiner
+
+MINUTE = 60 * 1000
+HOUR = 60 * MINUTE
+
+
+def create_frame(pair: str, start: int, end: int, step: int, closes=None) -> pd.DataFrame:
+    times = np.arange(start, end, step)
+    closes = np.arange(len(times), dtype=float) if closes is None else closes
+    return pd.DataFrame({'time': times, 'close': closes, 'pair': pair}, index=times)
+
+
+def test_join_uses_only_closed_candles():
+    """Given a 1h additional pair, a 15m candle should only see the last closed 1h candle"""
+    # Arrange
+    dataframe = create_frame('COIN/BASE', 0, 3 * HOUR, 15 * MINUTE)
+    additional = create_frame('BTC/BASE', 0, 3 * HOUR, HOUR)
+
+    # Act
+    joined = AdditionalDataJoiner().join(dataframe, additional, '15m', '1h')
+
+    # Assert
+    closes = joined['close_BTC/BASE_1h'].to_numpy()
+    assert np.isnan(closes[:3]).all()
+    assert list(closes[3:7]) == [0., 0., 0., 0.]
+    assert list(closes[7:11]) == [1., 1., 1., 1.]
+    assert list(joined.index) == list(dataframe.index)
+
+
+def test_join_without_ffill_only_fills_matching_candles():
+    """Given ffill disabled, only the candle at which an additional candle closes should be filled"""
+    # Arrange
+    dataframe = create_frame('COIN/BASE', 0, 2 * HOUR, 15 * MINUTE)
+    additional = create_frame('BTC/BASE', 0, 2 * HOUR, HOUR)
+
+    # Act
+    joined = AdditionalDataJoiner().join(dataframe, additional, '15m', '1h', ffill=False)
+
+    # Assert
+    closes = joined['close_BTC/BASE_1h'].to_numpy()
+    assert closes[3] == 0.
+    assert closes[7] == 1.
+    assert np.isnan(np.delete(closes, [3, 7])).all()
+
+
+def test_join_only_requested_columns_and_keeps_own_columns():
+    """Given requested columns, only these should be joined and own NaN values should not be filled"""
+    # Arrange
+    dataframe = create_frame('COIN/BASE', 0, 2 * HOUR, 15 * MINUTE)
+    dataframe.loc[dataframe.index[5], 'close'] = np.nan
+    additional = create_frame('BTC/BASE', 0, 2 * HOUR, HOUR)
+    additional['rsi'] = [30., 40.]
+
+    # Act
+    joined = AdditionalDataJoiner().join(dataframe, additional, '15m', '1h', columns=['rsi'])
+
+    # Assert
+    assert 'rsi_BTC/BASE_1h' in joined.columns
+    assert 'close_BTC/BASE_1h' not in joined.columns
+    assert math.isnan(joined['close'].iloc[5])
+
+
+def test_mapping_is_reused_for_pairs_with_same_time_grid():
+    """Given two pairs on the same time grid, the position mapping should be built once"""
+    # Arrange
+    joiner = AdditionalDataJoiner()
+    additional = create_frame('BTC/BASE', 0, 2 * HOUR, HOUR)
+
+    # Act
+    joiner.join(create_frame('COIN/BASE', 0, 2 * HOUR, 15 * MINUTE), additional, '15m', '1h')
+    first_mapping = list(joiner.mappings.values())[0]
+    joiner.join(create_frame('COIN2/BASE', 0, 2 * HOUR, 15 * MINUTE), additional, '15m', '1h')
+
+    # Assert
+    assert len(joiner.mappings) == 1
+    assert list(joiner.mappings.values())[0] is first_mapping
+
+
+def test_join_returns_new_frame_and_keys_mapping_on_time_range():
+    """Given a join, the caller's frame should be unchanged and another time range should get its own mapping"""
+    # Arrange
+    joiner = AdditionalDataJoiner()
+    dataframe = create_frame('COIN/BASE', 0, 2 * HOUR, 15 * MINUTE)
+    additional = create_frame('BTC/BASE', 0, 2 * HOUR, HOUR)
+
+    # Act
+    joined = joiner.join(dataframe, additional, '15m', '1h')
+    longer = joiner.join(create_frame('COIN/BASE', 0, 3 * HOUR, 15 * MINUTE), additional, '15m', '1h')
+
+    # Assert
+    assert 'close_BTC/BASE_1h' in joined.columns
+    assert list(dataframe.columns) == ['time', 'close', 'pair']
+    assert len(joiner.mappings) == 2
+    assert list(longer['close_BTC/BASE_1h'].to_numpy()[-4:]) == [1., 1., 1., 1.]
+
+
+def test_pairs_with_gaps_in_other_places_get_their_own_mapping():
+    """Given two pairs of equal length and end points with gaps in other places, each should see its own candles"""
+    # Arrange
+    joiner = AdditionalDataJoiner()
+    additional = create_frame('BTC/BASE', 0, 4 * HOUR, HOUR)
+    first = create_frame('COIN/BASE', 0, 4 * HOUR, 15 * MINUTE).drop(index=2 * 15 * MINUTE)
+    second = create_frame('COIN2/BASE', 0, 4 * HOUR, 15 * MINUTE).drop(index=12 * 15 * MINUTE)
+
+    # Act
+    joiner.join(first, additional, '15m', '1h')
+    joined = joiner.join(second, additional, '15m', '1h')
+    fresh = AdditionalDataJoiner().join(second, additional, '15m', '1h')
+
+    # Assert
+    assert len(joiner.mappings) == 2
+    assert np.array_equal(joined['close_BTC/BASE_1h'].to_numpy(), fresh['close_BTC/BASE_1h'].to_numpy(),
+                          equal_nan=True)
+    assert np.isnan(joined.loc[30 * MINUTE, 'close_BTC/BASE_1h'])
+    assert joined.loc[90 * MINUTE, 'close_BTC/BASE_1h'] == 0.
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+from modules.setup.config import qtpylib_methods as qtpylib
+
+
+def create_bars(length=2000, seed=0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.002, length)))
+    high = close * (1 + rng.uniform(0, 0.01, length))
+    low = close * (1 - rng.uniform(0, 0.01, length))
+    return pd.DataFrame({
+        'open': np.concatenate(([close[0]], close[:-1])),
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': rng.uniform(1, 100, length)
+    })
+
+
+def strided_rolling(data, window, reduction):
+    return np.concatenate((np.full(window - 1, np.nan),
+                           reduction(qtpylib.numpy_rolling_window(data, window), axis=-1)))
+
+
+def test_numpy_rolling_mean_std_match_strided_windows():
+    """Given a long series with a gap, the O(n) rolling mean/std should match the per-window reductions"""
+    # Arrange
+    close = create_bars()['close'].values.copy()
+    close[500] = np.nan
+
+    for window in [2, 14, 200]:
+        # Act
+        mean = qtpylib.numpy_rolling_mean(close, window)
+        std = qtpylib.numpy_rolling_std(close, window)
+
+        # Assert
+        expected_std = strided_rolling(close, window, lambda x, axis: np.std(x, axis=axis, ddof=1))
+        assert np.allclose(mean, strided_rolling(close, window, np.mean), rtol=1e-12, equal_nan=True)
+        assert np.allclose(std, expected_std, rtol=1e-6, atol=1e-6, equal_nan=True)
+
+
+def test_rolling_vwap_matches_pandas_rolling():
+    """Given min periods smaller than the window, rolling vwap should match the pandas implementation"""
+    # Arrange
+    bars = create_bars()
+    typical = (bars['high'] + bars['low'] + bars['close']) / 3
+    left = (bars['volume'] * typical).rolling(window=50, min_periods=10).sum()
+    right = bars['volume'].rolling(window=50, min_periods=10).sum()
+    expected = (left / right).ffill()
+
+    # Act
+    result = qtpylib.rolling_vwap(bars, window=50, min_periods=10)
+
+    # Assert
+    assert np.allclose(result, expected, rtol=1e-10, equal_nan=True)
+
+
+def test_true_range_and_chopiness_match_pandas():
+    """Given bars, true range and chopiness should match the pandas implementations"""
+    # Arrange
+    bars = create_bars()
+    expected_tr = pd.DataFrame({
+        "hl": bars['high'] - bars['low'],
+        "hc": abs(bars['high'] - bars['close'].shift(1)),
+        "lc": abs(bars['low'] - bars['close'].shift(1))
+    }).max(axis=1)
+    expected_chop = 100 * np.log10(expected_tr.rolling(14).sum() /
+                                   (bars['high'].rolling(14).max() - bars['low'].rolling(14).min())) / np.log10(14)
+
+    # Act
+    tr = qtpylib.true_range(bars)
+    chop = qtpylib.chopiness(bars, 14)
+
+    # Assert
+    assert np.allclose(tr, expected_tr)
+    assert np.allclose(chop, expected_chop, equal_nan=True)
+
+
+def test_zscore_matches_pandas_rolling():
+    """Given bars, zscore should match pandas rolling mean and std"""
+    # Arrange
+    bars = create_bars()
+    expected = (bars['close'] - bars['close'].rolling(20).mean()) / bars['close'].rolling(20).std()
+
+    # Act
+    result = qtpylib.zscore(bars, window=20)
+
+    # Assert
+    assert np.allclose(result, expected, rtol=1e-6, equal_nan=True)
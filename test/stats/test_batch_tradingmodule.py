@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from modules.stats.batch_tradingmodule import BatchTradingModule
+from modules.stats.tradingmodule import TradingModule
+from modules.stats.tradingmodule_config import TradingModuleConfig
+
+PAIRS = ['COIN/BASE', 'COIN2/BASE', 'COIN3/BASE']
+START_MS = 1609459200000
+CANDLE_MS = 15 * 60 * 1000
+
+
+def create_config(stoploss_type="standard", max_open_trades=2) -> TradingModuleConfig:
+    return TradingModuleConfig(fee=0.25, max_open_trades=max_open_trades, pairs=PAIRS,
+                               roi={"0": 6, "60": 3, "240": 1.5}, starting_capital=1000., stoploss=4,
+                               stoploss_type=stoploss_type)
+
+
+def create_candles(n_times: int, seed: int) -> dict:
+    rng = np.random.default_rng(seed)
+    candles = {}
+    for pair in PAIRS:
+        close = 100 * np.cumprod(1 + rng.normal(0, 0.01, n_times))
+        open_ = np.append(close[:1], close[:-1])
+        candles[pair] = {'open': open_, 'close': close,
+                         'high': np.maximum(open_, close) * (1 + rng.uniform(0, 0.02, n_times)),
+                         'low': np.minimum(open_, close) * (1 - rng.uniform(0, 0.02, n_times))}
+    return candles
+
+
+def run_trading_module(config: TradingModuleConfig, times, candles, buy, sell, k: int) -> list:
+    trading_module = TradingModule(config)
+    for t, time in enumerate(times):
+        for pair in PAIRS:
+            ohlcv = {'time': int(time), 'pair': pair, 'buy': int(buy[pair][t, k]), 'sell': int(sell[pair][t, k]),
+                     **{column: candles[pair][column][t] for column in ('open', 'high', 'low', 'close')}}
+            trading_module.tick(ohlcv, {})
+    return [trading_module.capital_per_timestamp[int(time)] for time in times]
+
+
+@pytest.mark.parametrize('max_open_trades', [1, 2, 5])
+def test_batch_equals_trading_module(max_open_trades):
+    """Given K random signal sets, every simulated capital curve should equal the one of TradingModule"""
+    # Arrange
+    n_times, n_candidates = 400, 6
+    rng = np.random.default_rng(3)
+    times = START_MS + np.arange(n_times, dtype=np.int64) * CANDLE_MS
+    candles = create_candles(n_times, seed=max_open_trades)
+    buy = {pair: rng.random((n_times, n_candidates)) < 0.05 for pair in PAIRS}
+    sell = {pair: rng.random((n_times, n_candidates)) < 0.05 for pair in PAIRS}
+    config = create_config(max_open_trades=max_open_trades)
+
+    # Act
+    results = BatchTradingModule(config).simulate(times, candles, buy, sell)
+
+    # Assert
+    for k in range(n_candidates):
+        expected = run_trading_module(config, times, candles, buy, sell, k)
+        assert np.allclose(results.capital[:, k], expected, rtol=1e-12)
+    assert (results.n_trades > 0).all()
+
+
+def test_batch_results_metrics():
+    """Given a capital curve, profit and max drawdown ratio should follow from the first and lowest points"""
+    # Arrange
+    times = START_MS + np.arange(4) * CANDLE_MS
+    buy = {pair: np.zeros((4, 2), dtype=bool) for pair in PAIRS}
+    buy['COIN/BASE'][0] = True
+    candles = {pair: {column: np.array([100., 80., 120., 110.]) for column in ('open', 'high', 'low', 'close')}
+               for pair in PAIRS}
+    config = TradingModuleConfig(fee=0, max_open_trades=1, pairs=PAIRS, roi={"0": 1000}, starting_capital=100.,
+                                 stoploss=100, stoploss_type="standard")
+
+    # Act
+    results = BatchTradingModule(config).simulate(times, candles, buy, {pair: np.zeros_like(buy[pair]) for pair in PAIRS})
+
+    # Assert
+    assert np.allclose(results.profit_ratio, [0.1, 0.1])
+    assert np.allclose(results.max_drawdown_ratio, [0.8, 0.8])
+
+
+def test_batch_needs_standard_stoploss():
+    """Given a trailing stoploss, which depends on every trade's path, the batched engine should not be used"""
+    with pytest.raises(ValueError):
+        BatchTradingModule(create_config(stoploss_type="trailing"))
@@ -0,0 +1,114 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.stats.metrics.calendar import CalendarIndex, bucket_ids, bucket_labels, count_results
+from test.stats.stats_test_utils import StatsFixture
+
+HOUR_MS = 3600 * 1000
+
+
+def create_series(length=3000, seed=5) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    values = 100 * np.cumprod(1 + rng.normal(0, 0.01, length))
+    times = 1609459200000 + np.arange(length) * HOUR_MS
+    return pd.Series(values, index=times)
+
+
+def resample(series: pd.Series, period: str):
+    """Reference implementation, with the local datetimes used by the original weekly results"""
+    local = pd.Series(series.to_numpy(), index=[datetime.fromtimestamp(ms / 1000) for ms in series.index])
+    return local.resample(period, origin='start')
+
+
+@pytest.mark.parametrize("period", ['D', 'W', 'M'])
+def test_first_last_ratio_equals_resample(period):
+    """Given a series with a gap, the ratio per bucket should equal the close / open of pandas' resample"""
+    # Arrange
+    series = create_series()
+    series = series.drop(series.index[500:800])
+    ohlc = resample(series, period).ohlc()
+
+    # Act
+    calendar = CalendarIndex(series.index.to_numpy(), period)
+    ratios = calendar.first_last_ratio(series.to_numpy())
+
+    # Assert
+    assert np.array_equal(calendar.labels, ohlc.index.to_numpy().astype('datetime64[D]'))
+    assert np.allclose(ratios, (ohlc['close'] / ohlc['open']).to_numpy(), equal_nan=True)
+
+
+@pytest.mark.parametrize("period", ['D', 'W', 'M'])
+def test_product_equals_resample(period):
+    """Given ratios per candle, the product per bucket should equal pandas' resample().prod()"""
+    # Arrange
+    series = create_series()
+    ratios = (series / series.shift(1)).fillna(1)
+
+    # Act
+    products = CalendarIndex(series.index.to_numpy(), period).product(ratios.to_numpy())
+
+    # Assert
+    assert np.allclose(products, resample(ratios, period).prod().to_numpy())
+
+
+def test_matrix_equals_columns():
+    """Given a (time x pair) matrix with missing values, every column should equal the single series result"""
+    # Arrange
+    series = create_series()
+    matrix = np.column_stack([series.to_numpy(), series.to_numpy()[::-1]])
+    matrix[:100, 1] = np.nan
+    calendar = CalendarIndex(series.index.to_numpy(), 'W')
+
+    # Act
+    ratios = calendar.first_last_ratio(matrix)
+
+    # Assert
+    assert np.allclose(ratios[:, 0], calendar.first_last_ratio(matrix[:, 0]))
+    assert np.allclose(ratios[:, 1], calendar.first_last_ratio(matrix[:, 1]), equal_nan=True)
+
+
+def test_bucket_ids_and_labels():
+    """Weeks should start on monday and be labelled with their sunday, months with their last day"""
+    # Arrange
+    sunday, monday = np.datetime64('2021-01-03', 'ms'), np.datetime64('2021-01-04', 'ms')
+    times = np.array([sunday, monday]).astype(np.int64)
+
+    # Act
+    weeks = bucket_ids(times, 'W', 0)
+    months = bucket_ids(times, 'M', 0)
+
+    # Assert
+    assert weeks[1] == weeks[0] + 1
+    assert list(bucket_labels(weeks, 'W').astype(str)) == ['2021-01-03', '2021-01-10']
+    assert list(bucket_labels(months, 'M').astype(str)) == ['2021-01-31', '2021-01-31']
+
+
+def test_count_results_counts_missing_buckets_as_draw():
+    """A bucket without data should count as a draw"""
+    # Act
+    results = count_results(np.array([1.1, 0.9, 1.0, np.nan]), np.array([1.0, 1.0, 1.0, np.nan]))
+
+    # Assert
+    assert results == (1, 2, 1)
+
+
+def test_calendar_performance():
+    """Given a backtest, the calendar tables should be available per period for the portfolio and every pair"""
+    # Arrange
+    fixture = StatsFixture(['COIN/BASE', 'COIN2/BASE'])
+    fixture.frame_with_signals['COIN/BASE'].test_scenario_up_100_one_trade_down_20()
+    fixture.frame_with_signals['COIN2/BASE'].test_scenario_down_40_one_trade_up_80()
+    stats = fixture.create().analyze()
+
+    # Act
+    weekly = stats.calendar_performance['W']
+
+    # Assert
+    assert set(stats.calendar_performance) == {'D', 'W', 'M'}
+    assert set(weekly) == {'all', 'COIN/BASE', 'COIN2/BASE'}
+    assert list(weekly['COIN/BASE']['result']) == ['win']
+    assert list(weekly['COIN2/BASE']['result']) == ['loss']
+    assert list(weekly['all']['result']) == ['loss']
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.stats.drawdown.drawdown import get_drawdown_episodes, DrawdownEpisode
+from modules.stats.drawdown.for_portfolio import get_drawdown_episodes_for_portfolio
+
+HOUR_MS = 3600 * 1000
+
+
+def pandas_max_seen_drawdown(values, index) -> dict:
+    """Reference implementation: cummax and label based slices"""
+    df = pd.DataFrame({"value": values}, index=index)
+    df["drawdown"] = df["value"] / df["value"].cummax()
+    at = df["drawdown"].idxmin()
+    after = df.loc[at:]
+    recovered = after.loc[after["drawdown"] == 1]
+    return {"drawdown": df["drawdown"].min(), "from": df.loc[:at].value.idxmax(), "at": at,
+            "to": recovered.index[0] if len(recovered) > 0 else 0}
+
+
+def test_all_episodes_are_found():
+    """Given two drawdowns of which the last one does not recover, both episodes should be returned"""
+    # Arrange
+    values = [100, 110, 99, 88, 110, 120, 120, 60, 90]
+    index = [0, 10, 20, 30, 40, 50, 60, 70, 80]
+
+    # Act
+    episodes = get_drawdown_episodes(values, index)
+
+    # Assert
+    assert episodes.episodes == [DrawdownEpisode(peak=10, trough=30, recovery=40, depth=0.8, duration=30),
+                                 DrawdownEpisode(peak=50, trough=70, recovery=None, depth=0.5, duration=30)]
+    assert episodes.top(1) == [episodes.episodes[1]]
+    assert episodes.time_under_water == 60
+    assert episodes.under_water_ratio == 4 / 9
+    assert episodes.max_drawdown() == {"drawdown": 0.5, "from": 50, "at": 70, "to": 0}
+
+
+def test_no_drawdown():
+    """Given a rising series, there should be no episodes and a drawdown ratio of 1"""
+    # Act
+    episodes = get_drawdown_episodes([1., 2., np.nan, 3.])
+
+    # Assert
+    assert len(episodes) == 0
+    assert episodes.max_drawdown() == {"drawdown": 1.0, "from": 0, "at": 0, "to": 0}
+
+
+def test_max_drawdown_equals_pandas_reference():
+    """Given random equity curves, the deepest episode should equal the cummax based reference"""
+    rng = np.random.default_rng(11)
+    for _ in range(20):
+        # Arrange
+        values = 100 * np.cumprod(1 + rng.normal(0, 0.02, 300))
+        index = np.arange(300) * 60000
+
+        # Act
+        max_drawdown = get_drawdown_episodes(values, index).max_drawdown()
+
+        # Assert
+        assert max_drawdown == pandas_max_seen_drawdown(values, index)
+
+
+def test_portfolio_drawdown_equals_stored_drawdown():
+    """Given a capital series, the max seen drawdown should equal the stored output of the dataframe drawdown"""
+    # Arrange
+    rng = np.random.default_rng(3)
+    capital = 100 * np.cumprod(1 + rng.normal(0, 0.01, 2000))
+    times = 1609459200000 + np.arange(2000) * HOUR_MS
+    capital_per_timestamp = {0: 100., **{int(time): value for time, value in zip(times, capital)}}
+
+    # Act
+    episodes = get_drawdown_episodes_for_portfolio(capital_per_timestamp)
+
+    # Assert
+    assert episodes.max_drawdown() == {"drawdown": pytest.approx(0.6813926276084821), "from": 1615593600000,
+                                       "at": 1616454000000, "to": 0}
+    assert episodes.max_drawdown_ratio == pytest.approx(0.6813926276084821)
+
+
+def test_portfolio_drawdown_with_recovery():
+    """Given a series that recovers, the drawdown should start at the peak and recover at the first new peak"""
+    # Arrange
+    capital_per_timestamp = {0: 100., 1: 120., 2: 90., 3: 130., 4: 125.}
+
+    # Act
+    episodes = get_drawdown_episodes_for_portfolio(capital_per_timestamp)
+
+    # Assert
+    assert episodes.max_drawdown() == {"drawdown": 0.75, "from": 1, "at": 2, "to": 3}
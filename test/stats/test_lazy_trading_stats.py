@@ -0,0 +1,72 @@
+import gc
+import pickle
+import weakref
+
+from test.stats.stats_test_utils import StatsFixture
+
+
+def create_stats():
+    fixture = StatsFixture(['COIN/BASE', 'COIN2/BASE'])
+    fixture.frame_with_signals['COIN/BASE'].test_scenario_up_100_one_trade()
+    fixture.frame_with_signals['COIN2/BASE'].test_scenario_flat_no_trades()
+    stats_module = fixture.create()
+    return stats_module, stats_module.analyze()
+
+
+def test_results_are_computed_on_access():
+    """Given a finished backtest, derived results should only be computed when read"""
+    # Arrange
+    stats_module, stats = create_stats()
+
+    # Act
+    end_capital = stats.main_results.end_capital
+
+    # Assert
+    assert end_capital == 148.01
+    assert stats.is_loaded('main_results')
+    assert not stats.is_loaded('coin_results')
+    assert not stats.is_loaded('open_trade_results')
+    assert not stats.is_loaded('buypoints')
+    assert 'coin_results' not in vars(stats_module)
+
+
+def test_results_are_computed_once():
+    """Given a result that is read twice, the same object should be returned"""
+    # Arrange
+    _, stats = create_stats()
+
+    # Act / Assert
+    assert stats.coin_results is stats.coin_results
+    assert [coin.n_trades for coin in stats.coin_results] == [1, 0]
+
+
+def test_loaders_are_resolved_before_pickling():
+    """Given unresolved results, the pickled state should contain the results instead of their loaders"""
+    # Arrange
+    _, stats = create_stats()
+
+    # Act
+    state = stats.__getstate__()
+
+    # Assert
+    assert state['_loaders'] == {}
+    assert state['main_results'].end_capital == 148.01
+    assert list(state['buypoints']) == ['COIN/BASE', 'COIN2/BASE']
+    pickle.dumps(state['coin_results'])
+
+
+def test_resolved_loaders_release_the_stats_module():
+    """Given results that are all read, the stats module should no longer be kept alive by their loaders"""
+    # Arrange
+    stats_module, stats = create_stats()
+    module_reference = weakref.ref(stats_module)
+
+    # Act
+    stats.__getstate__()
+    del stats_module
+    gc.collect()
+
+    # Assert
+    assert module_reference() is None
+    assert stats.main_results.end_capital == 148.01
+    assert all(trade.max_seen_drawdown is not None for trade in stats.trades)
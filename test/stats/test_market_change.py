@@ -0,0 +1,48 @@
+import math
+
+import numpy as np
+
+from modules.stats.metrics.market_change import get_market_change, get_market_drawdown
+from modules.stats.pair_frames import PairFrames
+
+
+def create_signals(closes: dict, start_time: int = 1) -> dict:
+    return {time: {'time': time, 'close': close} for time, close in enumerate(closes, start=start_time)}
+
+
+def test_market_change_and_drawdown_per_pair():
+    """Given aligned pairs, market change and drawdown should follow each pair's closes"""
+    # Arrange
+    pair_frames = PairFrames({'AAA/EUR': create_signals([2., 4., 1., 3.]),
+                              'BBB/EUR': create_signals([1., 1., 2., 2.])})
+
+    # Act
+    market_change = get_market_change(['AAA/EUR', 'BBB/EUR'], pair_frames)
+    market_drawdown = get_market_drawdown(['AAA/EUR', 'BBB/EUR'], pair_frames)
+
+    # Assert
+    assert market_change == {'AAA/EUR': 1.5, 'BBB/EUR': 2.0, 'all': 1.75}
+    assert market_drawdown['AAA/EUR'] == 0.25
+    assert market_drawdown['BBB/EUR'] == 1.0
+    # Summed profit ratios: 2, 3, 2.5, 3.5
+    assert math.isclose(market_drawdown['all'], 2.5 / 3)
+
+
+def test_pair_listed_mid_period():
+    """Given a pair that lists mid-period, it should count as unchanged until its first close"""
+    # Arrange
+    signals = {'AAA/EUR': create_signals([1., 1., 1., 1.]),
+               'NEW/EUR': create_signals([4., 2.], start_time=3)}
+    pair_frames = PairFrames(signals)
+
+    # Act
+    market_change = get_market_change(list(signals), pair_frames)
+    market_drawdown = get_market_drawdown(list(signals), pair_frames)
+
+    # Assert
+    assert pair_frames.column_matrix("close").shape == (4, 2)
+    assert np.isnan(pair_frames.column_matrix("close")[0, 1])
+    assert market_change['NEW/EUR'] == 0.5
+    assert market_drawdown['NEW/EUR'] == 0.5
+    # Summed profit ratios: 2, 2, 2, 1.5
+    assert market_drawdown['all'] == 0.75
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from modules.stats.pair_frames import PairFrames
+from test.utils.signal_frame import MockPairFrame
+from utils.utils import get_ohlcv_indicators
+
+
+def create_frame_with_signals():
+    frame_with_signals = MockPairFrame(['COIN/BASE'])
+    frame_with_signals['COIN/BASE'].test_scenario_up_100_one_trade()
+    return frame_with_signals
+
+
+def test_frames_are_built_once_per_pair():
+    """Given a pair that is requested multiple times, the same frame should be returned"""
+    # Arrange
+    pair_frames = PairFrames(create_frame_with_signals())
+
+    # Act
+    frame = pair_frames['COIN/BASE']
+
+    # Assert
+    assert pair_frames['COIN/BASE'] is frame
+    assert frame.index.name == "time"
+    assert pair_frames.column('COIN/BASE', 'close') is pair_frames.column('COIN/BASE', 'close')
+
+
+def test_simulation_dataframes_are_reused():
+    """Given the simulation's pair dataframes, the frames should equal the ones built from the signal dicts"""
+    # Arrange
+    frame_with_signals = create_frame_with_signals()
+    dataframes = {pair: pd.DataFrame.from_dict(signals, orient='index', columns=get_ohlcv_indicators())
+                  for pair, signals in frame_with_signals.items()}
+
+    # Act
+    from_dataframes = PairFrames(frame_with_signals, dataframes)['COIN/BASE']
+    from_dicts = PairFrames(frame_with_signals)['COIN/BASE']
+
+    # Assert
+    pd.testing.assert_series_equal(from_dataframes['close'], from_dicts['close'])
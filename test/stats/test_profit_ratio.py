@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from modules.stats.metrics.profit_ratio import apply_profit_ratio, add_trade_fee, with_copied_initial_row
+
+FEE_PERCENTAGE = 0.25
+
+
+def create_frame(length=500, seed=5) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, length))
+    close[rng.choice(length, 10, replace=False)] = np.nan
+    times = 1000 + np.arange(length) * 60
+    return with_copied_initial_row(pd.DataFrame({"close": close}, index=pd.Index(times, name="time")))
+
+
+def create_trades(df, n_trades=40, seed=5) -> list:
+    rng = np.random.default_rng(seed)
+    bounds = np.sort(rng.choice(np.arange(1, len(df)), n_trades * 2, replace=False))
+    return [(int(df.index[opened]), int(df.index[closed])) for opened, closed in bounds.reshape(-1, 2)]
+
+
+def loop_profit_ratio(df, trades):
+    """Reference implementation: label based slice assignment per trade"""
+    for open_timestamp, close in trades:
+        idx = np.searchsorted(df.index, open_timestamp)
+        open_timestamp = df.index[max(0, idx + 1)]
+        df.loc[open_timestamp: close, "profit_ratio"] = (df["close"] / df["close"].shift(1))
+    df["profit_ratio"] = df["profit_ratio"].fillna(1)
+    fee_ratio = 1 - FEE_PERCENTAGE / 100
+    for opened, closed in trades:
+        df.loc[opened, "profit_ratio"] *= fee_ratio
+        df.loc[closed, "profit_ratio"] *= fee_ratio
+    return df
+
+
+def test_vectorized_profit_ratio_equals_loop():
+    """Given many trades, the vectorized profit ratio should equal the per-trade slice assignment"""
+    # Arrange
+    df = create_frame()
+    trades = create_trades(df)
+    expected = loop_profit_ratio(df.copy(), trades)
+
+    # Act
+    apply_profit_ratio(df, trades)
+    add_trade_fee(df, FEE_PERCENTAGE, trades)
+
+    # Assert
+    assert np.allclose(df["profit_ratio"], expected["profit_ratio"])
+
+
+def test_profit_ratio_without_trades():
+    """Given no trades, the profit ratio should be 1 everywhere"""
+    # Arrange
+    df = create_frame()
+
+    # Act
+    apply_profit_ratio(df, [])
+    add_trade_fee(df, FEE_PERCENTAGE, [])
+
+    # Assert
+    assert (df["profit_ratio"] == 1).all()
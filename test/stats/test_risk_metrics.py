@@ -0,0 +1,57 @@
+import math
+
+import numpy as np
+
+from modules.stats.metrics.risk import RiskMetrics, YEAR_MS
+from test.stats.stats_test_utils import StatsFixture
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+
+def create_metrics(equity, trade_profits=(), trade_profit_ratios=()):
+    timestamps = np.concatenate([[0], 1 + np.arange(len(equity) - 1) * DAY_MS])
+    return RiskMetrics(np.asarray(equity, dtype=float), timestamps, np.asarray(trade_profits, dtype=float),
+                       np.asarray(trade_profit_ratios, dtype=float))
+
+
+def test_return_based_metrics():
+    """Given an equity curve, sharpe, sortino and calmar should follow their definitions"""
+    # Arrange
+    metrics = create_metrics([100., 110., 99., 108.9, 119.79])
+    returns = np.array([0.1, -0.1, 0.1, 0.1])
+
+    # Act / Assert
+    assert np.allclose(metrics.returns, returns)
+    assert math.isclose(metrics.periods_per_year, 365)
+    assert math.isclose(metrics.sharpe, returns.mean() / returns.std(ddof=1) * math.sqrt(365))
+    assert math.isclose(metrics.sortino, returns.mean() / math.sqrt(0.01 / 4) * math.sqrt(365))
+    assert math.isclose(metrics.max_drawdown, 0.1)
+    years = 3 * DAY_MS / YEAR_MS
+    assert math.isclose(metrics.calmar, (1.1979 ** (1 / years) - 1) / 0.1)
+
+
+def test_trade_based_metrics():
+    """Given closed trades, profit factor and expectancy should follow their definitions"""
+    # Arrange
+    metrics = create_metrics([100., 100.], trade_profits=[10., -5., 5.], trade_profit_ratios=[1.1, 0.95, 1.05])
+
+    # Act / Assert
+    assert metrics.profit_factor == 3
+    assert math.isclose(metrics.expectancy, 10 / 3)
+    assert math.isclose(metrics.expectancy_ratio, 1 / 30)
+    assert math.isclose(metrics.win_rate, 2 / 3)
+
+
+def test_risk_metrics_are_lazy_on_trading_stats():
+    """Given backtest results, risk metrics should only be computed when accessed, and once"""
+    # Arrange
+    fixture = StatsFixture(['COIN/BASE'])
+    fixture.frame_with_signals['COIN/BASE'].test_scenario_up_100_one_trade()
+
+    # Act
+    stats = fixture.create().analyze()
+
+    # Assert
+    assert 'risk_metrics' not in vars(stats)
+    assert stats.risk_metrics is stats.risk_metrics
+    assert stats.risk_metrics.profit_factor == np.inf
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+from modules.stats.metrics.risk import YEAR_MS
+from modules.stats.metrics.rolling import RollingMetrics, get_rolling_metrics, rolling_max, get_window_starts, \
+    get_rolling_metrics_for_portfolio
+from test.stats.stats_test_utils import StatsFixture
+
+HOUR_MS = 3600 * 1000
+WEEK_MS = 7 * 24 * HOUR_MS
+
+
+def create_equity(length=2000, seed=7) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    equity = 100 * np.cumprod(1 + rng.normal(0, 0.01, length))
+    return pd.Series(equity, index=pd.to_datetime(1609459200000 + np.arange(length) * HOUR_MS, unit='ms'))
+
+
+def create_metrics(equity: pd.Series) -> RollingMetrics:
+    return RollingMetrics(equity.to_numpy(), equity.index.asi8 // 10 ** 6, WEEK_MS)
+
+
+def test_rolling_return_and_drawdown_equal_pandas():
+    """Given an hourly equity curve, the rolling return and drawdown should equal pandas' rolling window"""
+    # Arrange
+    equity = create_equity()
+    full = equity.index >= equity.index[0] + pd.Timedelta('7D')
+
+    # Act
+    metrics = create_metrics(equity)
+
+    # Assert
+    expected_return = equity / equity.shift(7 * 24) - 1
+    expected_drawdown = 1 - equity / equity.rolling('7D', closed='both').max()
+    assert np.allclose(metrics.returns[full], expected_return[full])
+    assert np.allclose(metrics.drawdown[full], expected_drawdown[full])
+    assert np.isnan(metrics.returns[~full]).all()
+
+
+def test_rolling_volatility_and_sharpe_equal_pandas():
+    """Given an hourly equity curve, volatility and Sharpe should equal pandas' rolling std and mean"""
+    # Arrange
+    equity = create_equity()
+    full = equity.index >= equity.index[0] + pd.Timedelta('7D')
+    returns = equity.pct_change().fillna(0)
+    periods_per_year = YEAR_MS / HOUR_MS
+
+    # Act
+    metrics = create_metrics(equity)
+
+    # Assert
+    std = returns.rolling('7D').std()
+    mean = returns.rolling('7D').mean()
+    assert np.allclose(metrics.volatility[full], std[full] * np.sqrt(periods_per_year))
+    assert np.allclose(metrics.sharpe[full], (mean / std)[full] * np.sqrt(periods_per_year))
+
+
+def test_rolling_max_with_irregular_windows():
+    """Given timestamps with gaps, the rolling maximum should equal a brute force maximum per window"""
+    # Arrange
+    rng = np.random.default_rng(1)
+    timestamps = np.cumsum(rng.integers(1, 10, 500))
+    values = rng.normal(0, 1, 500)
+    starts = get_window_starts(timestamps, 25)
+
+    # Act
+    maxima = rolling_max(values, starts)
+
+    # Assert
+    assert np.array_equal(maxima, [values[start:i + 1].max() for i, start in enumerate(starts)])
+
+
+def test_rolling_metrics_columns():
+    """Every metric should be exported for every window"""
+    # Arrange
+    equity = create_equity(length=100)
+
+    # Act
+    windows = {'1d': 24 * HOUR_MS, '2d': 48 * HOUR_MS}
+    frame = get_rolling_metrics(equity.to_numpy(), equity.index.asi8 // 10 ** 6, windows)
+
+    # Assert
+    assert list(frame.columns) == ['return_1d', 'volatility_1d', 'sharpe_1d', 'drawdown_1d',
+                                   'return_2d', 'volatility_2d', 'sharpe_2d', 'drawdown_2d']
+    assert len(frame) == 100
+
+
+def test_rolling_metrics_of_backtest():
+    """Given a backtest, rolling metrics should exist for the portfolio and every coin with trades"""
+    # Arrange
+    fixture = StatsFixture(['COIN/BASE', 'COIN2/BASE'])
+    fixture.frame_with_signals['COIN/BASE'].test_scenario_up_100_one_trade()
+    fixture.frame_with_signals['COIN2/BASE'].test_scenario_flat_no_trades()
+    stats = fixture.create().analyze()
+
+    # Act
+    rolling_metrics = stats.rolling_metrics
+
+    # Assert
+    assert set(rolling_metrics) == {'all', 'COIN/BASE'}
+    assert rolling_metrics['all'].index.equals(
+        get_rolling_metrics_for_portfolio(stats.capital_per_timestamp).index)
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from modules.stats.accumulator import WeeklyBuckets, TimestampedSeries
+from modules.stats.metrics.calendar import bucket_labels
+
+HOUR_MS = 3600 * 1000
+
+
+def create_capital_per_timestamp(length=2000, seed=3) -> dict:
+    rng = np.random.default_rng(seed)
+    capital = 100 * np.cumprod(1 + rng.normal(0, 0.01, length))
+    times = 1609459200000 + np.arange(length) * HOUR_MS
+    return {0: 100., **{int(time): value for time, value in zip(times, capital)}}
+
+
+def observe_per_pair(series, capital_per_timestamp: dict) -> None:
+    """Mimics the tick loop, where every pair overwrites the value of the current timestamp"""
+    for time, value in capital_per_timestamp.items():
+        series.observe(time, value * 0.5)
+        series.observe(time, value)
+
+
+def test_weekly_buckets_equal_stored_resample():
+    """Given a capital series, the weekly buckets should equal the stored output of pandas' weekly resample"""
+    # Arrange
+    capital_per_timestamp = create_capital_per_timestamp(500)
+    buckets = WeeklyBuckets()
+    buckets.utc_offset_ms = 0
+
+    # Act
+    observe_per_pair(buckets, capital_per_timestamp)
+    weeks, ratios = buckets.weekly_ratios()
+
+    # Assert
+    assert list(bucket_labels(weeks, 'W').astype(str)) == ['2021-01-03', '2021-01-10', '2021-01-17', '2021-01-24']
+    assert np.allclose(ratios, [0.9134309644422779, 1.046186022541718, 1.1740758958839452, 1.0960931783667012])
+
+
+def test_timestamped_series_requires_commit():
+    """Given a series without commit, it should not be instantiable"""
+    # Arrange
+    class IncompleteSeries(TimestampedSeries):
+        pass
+
+    # Act & Assert
+    with pytest.raises(TypeError):
+        IncompleteSeries()
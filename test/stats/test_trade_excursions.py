@@ -0,0 +1,83 @@
+import math
+
+import numpy as np
+
+from modules.stats.drawdown.drawdown import get_drawdown_episodes
+from modules.stats.metrics.range_query import SparseTable, DrawdownTable
+from test.stats.stats_test_utils import StatsFixture
+
+
+def create_ranges(n_rows=300, n_ranges=200, seed=11):
+    rng = np.random.default_rng(seed)
+    values = 100 * np.cumprod(1 + rng.normal(0, 0.02, n_rows))
+    starts = rng.integers(0, n_rows, n_ranges)
+    ends = np.minimum(starts + rng.integers(0, 80, n_ranges), n_rows - 1)
+    return values, starts, ends
+
+
+def test_sparse_table_equals_brute_force():
+    """Given random ranges, the sparse table should return the min and max of every range"""
+    # Arrange
+    values, starts, ends = create_ranges()
+
+    # Act
+    minima = SparseTable(values, np.minimum).query(starts, ends)
+    maxima = SparseTable(values, np.maximum).query(starts, ends)
+
+    # Assert
+    assert np.array_equal(minima, [values[start:end + 1].min() for start, end in zip(starts, ends)])
+    assert np.array_equal(maxima, [values[start:end + 1].max() for start, end in zip(starts, ends)])
+
+
+def test_drawdown_table_equals_drawdown_engine():
+    """Given random ranges, the drawdown table should return the max drawdown ratio of every range"""
+    # Arrange
+    values, starts, ends = create_ranges()
+
+    # Act
+    drawdowns = DrawdownTable(values).query(starts, ends)
+
+    # Assert
+    expected = [get_drawdown_episodes(values[start:end + 1]).max_drawdown_ratio for start, end in zip(starts, ends)]
+    assert np.allclose(drawdowns, expected)
+
+
+def test_excursions_of_closed_trade():
+    """Given a closed trade, MAE and MFE should be the lowest low and highest high relative to the open price"""
+    # Arrange
+    fixture = StatsFixture(['COIN/BASE'])
+    fixture.frame_with_signals['COIN/BASE'] \
+        .add_entry(open=2, high=2, low=2, close=2, volume=1, buy=1, sell=0) \
+        .add_entry(open=2, high=3, low=1.5, close=2.5, volume=1, buy=0, sell=0) \
+        .add_entry(open=2.5, high=5, low=2.5, close=4, volume=1, buy=0, sell=1) \
+        .add_entry(open=4, high=9, low=0.5, close=1, volume=1, buy=0, sell=0)
+
+    # Act
+    stats = fixture.create().analyze()
+    excursions = stats.trade_excursions
+
+    # Assert
+    trade = stats.trades[0]
+    assert trade.status == 'closed'
+    assert math.isclose(trade.mae_ratio, 0.75)
+    assert math.isclose(trade.mfe_ratio, 2.5)
+    assert math.isclose(trade.max_seen_drawdown, 0.99)
+    assert excursions[['mae', 'mfe']].values.tolist() == [[0.75, 2.5]]
+
+
+def test_intra_trade_drawdown_of_open_trade():
+    """Given an open trade that rises and falls, the max seen drawdown should run from its peak close"""
+    # Arrange
+    fixture = StatsFixture(['COIN/BASE'])
+    fixture.frame_with_signals['COIN/BASE'] \
+        .add_entry(open=2, high=2, low=2, close=2, volume=1, buy=1, sell=0) \
+        .add_entry(open=2, high=4, low=2, close=4, volume=1, buy=0, sell=0) \
+        .add_entry(open=4, high=4, low=3, close=3, volume=1, buy=0, sell=0)
+
+    # Act
+    stats = fixture.create().analyze()
+
+    # Assert
+    assert math.isclose(stats.open_trade_results[0].max_seen_drawdown, -25)
+    assert math.isclose(stats.trades[0].mae_ratio, 1)
+    assert math.isclose(stats.trades[0].mfe_ratio, 2)